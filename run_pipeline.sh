@@ -32,6 +32,7 @@ SKIP_GRAPHDB=false
 GRAPHDB_URL="http://localhost:7200"
 GRAPHDB_REPO="cmc-stagegate"
 DRY_RUN=true
+LOCAL_GRAPHDB=false
 
 # Help function
 show_help() {
@@ -48,12 +49,14 @@ show_help() {
     echo "  -u, --graphdb-url    GraphDB URL (default: http://localhost:7200)"
     echo "  -r, --repository     GraphDB repository name (default: cmc-stagegate)"
     echo "  --no-dry-run         Actually upload to GraphDB (default: dry run only)"
+    echo "  -l, --local-graphdb  Serve the combined TTL from a local GraphDB stand-in on the --graphdb-url port"
     echo ""
     echo "Examples:"
     echo "  $0                   # Run ETL and validation only"
     echo "  $0 --all             # Run everything including GraphDB"
     echo "  $0 -g --no-dry-run   # Include GraphDB with actual upload"
     echo "  $0 -e                # Skip extraction (if CSVs already exist)"
+    echo "  $0 -l                # Run SPARQL tests without a GraphDB install"
 }
 
 # Parse command line arguments
@@ -87,6 +90,9 @@ while [[ $# -gt 0 ]]; do
         --no-dry-run)
             DRY_RUN=false
             ;;
+        -l|--local-graphdb)
+            LOCAL_GRAPHDB=true
+            ;;
         *)
             echo "Unknown option: $1"
             show_help
@@ -146,6 +152,22 @@ else
     exit 1
 fi
 
+print_status "Step 2d: Linking deliverables to lexicon terms..."
+if python3 scripts/etl/link_lexicon_terms.py; then
+    print_status "Term links generated (ex:mentionsTerm)"
+else
+    print_error "Term linking failed"
+    exit 1
+fi
+
+print_status "Step 2e: Assigning SMEs to deliverables by functional area..."
+if python3 scripts/etl/join_sme_deliverables.py; then
+    print_status "SME assignments generated (ex:assignedSME, sme_workload.csv)"
+else
+    print_error "SME assignment join failed"
+    exit 1
+fi
+
 # Step 3: Combine all TTL files (including drug products and temporal ontology)
 print_status "Step 3: Combining all TTL files..."
 print_status "  • Base ontology"
@@ -156,6 +178,8 @@ print_status "  • Lexicon (174 pharmaceutical terms)"
 print_status "  • Stage/deliverable instances"
 print_status "  • SME instances"
 print_status "  • Lexicon term instances"
+print_status "  • Deliverable → term links"
+print_status "  • Deliverable → SME assignments"
 print_status "  • GIST alignments"
 if python3 scripts/etl/combine_ttls.py; then
     print_status "TTL combination completed (15,000+ triples)"
@@ -164,6 +188,44 @@ else
     exit 1
 fi
 
+# Optional: local GraphDB stand-in so SPARQL tests and uploads have an endpoint
+if [ "$LOCAL_GRAPHDB" = true ]; then
+    # Serve on the port of --graphdb-url, so later steps talk to the stand-in
+    LOCAL_GRAPHDB_HOSTPORT=${GRAPHDB_URL#*://}
+    LOCAL_GRAPHDB_HOSTPORT=${LOCAL_GRAPHDB_HOSTPORT%%/*}
+    LOCAL_GRAPHDB_PORT=${LOCAL_GRAPHDB_HOSTPORT##*:}
+    if [ "$LOCAL_GRAPHDB_PORT" = "$LOCAL_GRAPHDB_HOSTPORT" ]; then
+        LOCAL_GRAPHDB_PORT=7200
+    fi
+    LOCAL_GRAPHDB_ROOT="http://localhost:$LOCAL_GRAPHDB_PORT"
+    print_status "Starting local GraphDB stand-in at $LOCAL_GRAPHDB_ROOT..."
+    LOCAL_GRAPHDB_LOG=$(mktemp)
+    # Result cache off, so query timings measure evaluation
+    python3 scripts/deployment/local_graphdb_server.py --repository "$GRAPHDB_REPO" --port "$LOCAL_GRAPHDB_PORT" \
+        --cache-mb 0 --load output/current/cmc_stagegate_all.ttl > "$LOCAL_GRAPHDB_LOG" 2>&1 &
+    LOCAL_GRAPHDB_PID=$!
+    trap 'kill $LOCAL_GRAPHDB_PID 2>/dev/null; rm -f "$LOCAL_GRAPHDB_LOG"' EXIT
+    LOCAL_GRAPHDB_READY=false
+    for _ in $(seq 1 60); do
+        if ! kill -0 $LOCAL_GRAPHDB_PID 2>/dev/null; then
+            break
+        fi
+        # Only our server counts: another GraphDB may already answer on this port
+        if curl -s -D - -o /dev/null "$LOCAL_GRAPHDB_ROOT/repositories" | grep -qi '^server: LocalGraphDB' \
+                && kill -0 $LOCAL_GRAPHDB_PID 2>/dev/null; then
+            LOCAL_GRAPHDB_READY=true
+            break
+        fi
+        sleep 0.5
+    done
+    if [ "$LOCAL_GRAPHDB_READY" != true ]; then
+        print_error "Local GraphDB stand-in failed to start on port $LOCAL_GRAPHDB_PORT"
+        cat "$LOCAL_GRAPHDB_LOG"
+        exit 1
+    fi
+    print_status "Local GraphDB stand-in ready ($(curl -s "$LOCAL_GRAPHDB_ROOT/repositories/$GRAPHDB_REPO/size") statements)"
+fi
+
 # Step 4: Validation
 if [ "$SKIP_VALIDATION" = false ]; then
     print_status "Step 4: Validating TTL files..."
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark the stage-occupancy interval index on a synthetic portfolio.
+
+Generates N drugs that each run through S consecutive stages (random start
+dates, durations and slippage against a projected plan), fills a
+PortfolioAnalytics instance with them and times point ("which drugs were in
+stage 4 on date X?") and overlap ("what ran during this gate review?") queries
+through the interval index against a linear scan over all occupancies. Results
+from both paths are compared so the benchmark doubles as a correctness check.
+
+Usage:
+  python3 scripts/analysis/benchmark_interval_index.py
+  python3 scripts/analysis/benchmark_interval_index.py --drugs 10000 --stages 13 --queries 2000 --report bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph.interval_index import OPEN_END  # noqa: E402
+from portfolio_analytics import EX, PortfolioAnalytics  # noqa: E402
+
+FIRST_START = date(2010, 1, 1).toordinal()
+LAST_START = date(2022, 12, 31).toordinal()
+
+
+def synthetic_portfolio(drugs: int, stages: int, as_of: date, seed: int = 7) -> PortfolioAnalytics:
+    """Portfolio of ``drugs`` x ``stages`` occupancies; stages after ``as_of`` are not entered."""
+    rng = random.Random(seed)
+    analytics = PortfolioAnalytics(as_of)
+    today = as_of.toordinal()
+    analytics.stages = [f"<{EX}Stage-protein-{n}>" for n in range(stages)]
+    for d in range(drugs):
+        analytics.drugs.append(f"<{EX}Drug-SYN{d:06d}>")
+        analytics.drug_label.append(f"SYN-{d:06d}")
+        analytics.drug_indication.append("")
+        analytics.drug_modality.append(f"{EX}ValueStream-Protein")
+        planned = actual = rng.randint(FIRST_START, LAST_START)
+        current = None
+        for n in range(stages):
+            if actual > today:
+                break
+            length = rng.randint(60, 420)
+            slip = max(0, int(rng.gauss(10, 45)))
+            end = actual + length + slip
+            is_current = end > today
+            analytics.occupancies.append(f"<{EX}Occupancy-SYN{d:06d}-Stage{n}>")
+            analytics.occ_drug.append(d)
+            analytics.occ_stage.append(n)
+            analytics.occ_stage_num.append(n)
+            analytics.occ_current.append(1 if is_current else 0)
+            analytics.actual_start.append(actual)
+            analytics.actual_end.append(0 if is_current else end)
+            analytics.projected_start.append(planned)
+            analytics.projected_end.append(planned + length)
+            analytics.delayed.append(1 if slip > 30 else 0)
+            current = n
+            if is_current:
+                break
+            planned, actual = planned + length + 1, end + 1
+        analytics.drug_current_stage.append(analytics.stages[current] if current is not None else "")
+    analytics._compute()
+    return analytics
+
+
+def linear_overlap(analytics: PortfolioAnalytics, lo: int, hi: int, stage: Optional[int], projected: bool) -> List[int]:
+    starts, ends = ((analytics.projected_start, analytics.projected_end) if projected
+                    else (analytics.actual_start, analytics.actual_end))
+    stage_num = analytics.occ_stage_num
+    found = []
+    for i in range(len(starts)):
+        start = starts[i]
+        if not start or start > hi:
+            continue
+        end = ends[i] or (0 if projected else OPEN_END)
+        if end >= lo and end >= start and (stage is None or stage_num[i] == stage):
+            found.append(i)
+    return found
+
+
+def time_queries(run: Callable[[int, int, Optional[int]], List[int]], queries: List[tuple]) -> Dict:
+    latencies = []
+    hits = 0
+    for lo, hi, stage in queries:
+        t0 = time.perf_counter()
+        hits += len(run(lo, hi, stage))
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+    return {
+        "queries": len(queries),
+        "hits": hits,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the stage-occupancy interval index.")
+    parser.add_argument("--drugs", type=int, default=10000, help="Synthetic drugs (default: 10000)")
+    parser.add_argument("--stages", type=int, default=13, help="Stages per drug (default: 13)")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries per workload (default: 1000)")
+    parser.add_argument("--linear-queries", type=int, default=50,
+                        help="Queries timed with the linear scan baseline (default: 50)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--report", help="Write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    as_of = date(2025, 1, 1)
+    rng = random.Random(args.seed + 1)
+
+    t0 = time.perf_counter()
+    analytics = synthetic_portfolio(args.drugs, args.stages, as_of, args.seed)
+    t1 = time.perf_counter()
+    actual = analytics.interval_index()
+    t2 = time.perf_counter()
+    projected = analytics.interval_index(projected=True)
+    for stage in range(args.stages):
+        analytics.interval_index(False, stage)
+        analytics.interval_index(True, stage)
+    t3 = time.perf_counter()
+    print(f"Synthetic portfolio: {args.drugs} drugs, {len(analytics.occupancies)} stage occupancies "
+          f"(generated in {t1 - t0:.2f}s)")
+    print(f"Index build: actual {len(actual)} intervals in {(t2 - t1) * 1000:.0f} ms; projected "
+          f"({len(projected)}) and per-stage indexes in {(t3 - t2) * 1000:.0f} ms")
+
+    today = as_of.toordinal()
+    workloads = {
+        "point (stage filter)": [(d, d, rng.randrange(args.stages))
+                                 for d in (rng.randint(FIRST_START, today) for _ in range(args.queries))],
+        "point (all stages)": [(d, d, None) for d in (rng.randint(FIRST_START, today) for _ in range(args.queries))],
+        "overlap 2 weeks": [(d, d + 14, None) for d in (rng.randint(FIRST_START, today) for _ in range(args.queries))],
+    }
+
+    results = {"drugs": args.drugs, "stages": args.stages, "occupancies": len(analytics.occupancies),
+               "build_ms": round((t3 - t1) * 1000, 1), "workloads": {}}
+    print(f"\n{'workload':31} {'mode':6} {'queries':>7} {'avg hits':>9} {'mean':>10} {'p99':>10}")
+    print("-" * 80)
+    mismatches = 0
+    for name, queries in workloads.items():
+        for projected_flag in (False, True):
+            kind = "proj" if projected_flag else "actual"
+            index_stats = time_queries(
+                lambda lo, hi, st: analytics.interval_index(projected_flag, st).overlapping(lo, hi), queries)
+            sample = queries[:args.linear_queries]
+            linear_stats = time_queries(
+                lambda lo, hi, st: linear_overlap(analytics, lo, hi, st, projected_flag), sample)
+            for lo, hi, st in sample:
+                if (sorted(analytics.occupancies_overlapping(date.fromordinal(lo), date.fromordinal(hi), st,
+                                                            projected_flag))
+                        != linear_overlap(analytics, lo, hi, st, projected_flag)):
+                    mismatches += 1
+            speedup = linear_stats["mean_us"] / index_stats["mean_us"] if index_stats["mean_us"] else 0.0
+            label = f"{name} [{kind}]"
+            print(f"{label:31} index  {index_stats['queries']:>7} {index_stats['hits'] / len(queries):>9.1f} "
+                  f"{index_stats['mean_us']:>8.1f}µs {index_stats['p99_us']:>8.1f}µs")
+            print(f"{'':31} linear {linear_stats['queries']:>7} {'':>9} "
+                  f"{linear_stats['mean_us']:>8.0f}µs {linear_stats['p99_us']:>8.0f}µs  ({speedup:.0f}x)")
+            results["workloads"][label] = {
+                "index": {k: round(v, 2) for k, v in index_stats.items()},
+                "linear": {k: round(v, 2) for k, v in linear_stats.items()},
+                "speedup": round(speedup, 1),
+            }
+
+    results["mismatches"] = mismatches
+    if args.report:
+        Path(args.report).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n📄 Report written to {args.report}")
+    if mismatches:
+        print(f"\n❌ {mismatches} queries disagreed with the linear scan")
+        return 1
+    print("\n✅ Index results match the linear scan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Resolve lexicon abbreviations without GraphDB.
+
+Loads the lexicon into an in-memory index (graph/lexicon_index.py) from
+output/current/cmc_stagegate_lexicon_instances.ttl, or from the Lexicon CSV in
+data/current/ when the TTL has not been generated, and answers exact,
+case-insensitive, prefix and fuzzy (edit distance) lookups. By default each
+query falls through those tiers until one matches.
+
+With --serve it answers over HTTP instead:
+
+- ``GET /lookup?q=CQA[&mode=auto|exact|ci|prefix|fuzzy][&distance=1][&limit=10]``
+- ``GET /terms``     every entry
+- ``GET /health``    entry count and source
+
+Usage:
+  python3 scripts/analysis/lexicon_lookup.py CQA ppq "gm"
+  python3 scripts/analysis/lexicon_lookup.py --mode fuzzy --distance 2 CQQ
+  python3 scripts/analysis/lexicon_lookup.py            # interactive prompt
+  python3 scripts/analysis/lexicon_lookup.py --serve --port 7300
+  python3 scripts/analysis/lexicon_lookup.py --benchmark
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph.lexicon_index import LOOKUP_MODES, LexiconEntry, LexiconIndex  # noqa: E402
+
+BASE_DIR = Path(os.getenv("STAGED_BASE_DIR", Path(__file__).resolve().parents[2]))
+LEXICON_TTL = BASE_DIR / "output" / "current" / "cmc_stagegate_lexicon_instances.ttl"
+MODES = LOOKUP_MODES
+
+
+def load_index(source: Optional[Path] = None) -> Tuple[LexiconIndex, Path]:
+    """Index from ``source`` (TTL or CSV), else the generated TTL, else the extracted CSV."""
+    if source is None:
+        csv_files = sorted((BASE_DIR / "data" / "current").glob("*Lexicon.csv"))
+        source = LEXICON_TTL if LEXICON_TTL.exists() or not csv_files else csv_files[0]
+    if not source.exists():
+        raise FileNotFoundError(f"lexicon not found at {source}")
+    index = LexiconIndex.from_csv(source) if source.suffix == ".csv" else LexiconIndex.from_ttl(source)
+    return index, source
+
+
+def run_lookup(index: LexiconIndex, query: str, mode: str = "auto", distance: int = 1,
+               limit: int = 10) -> Tuple[str, List[Tuple[Optional[int], LexiconEntry]]]:
+    """``(match kind, [(edit distance or None, entry)])`` for one query (see ``LexiconIndex.lookup``)."""
+    return index.lookup(query, mode, distance, limit)
+
+
+def format_hits(query: str, kind: str, hits: List[Tuple[Optional[int], LexiconEntry]], elapsed_us: float) -> str:
+    if not hits:
+        return f"❓ {query}: no match ({elapsed_us:.0f} µs)"
+    lines = [f"🔎 {query} [{kind}, {elapsed_us:.0f} µs]"]
+    for distance, entry in hits:
+        flags = "".join(f" [{f}]" for f, on in (("critical", entry.critical), ("regulatory", entry.regulatory)) if on)
+        shown_distance = f" (distance {distance})" if distance else ""
+        category = f" — {entry.category}" if entry.category else ""
+        lines.append(f"   {entry.abbreviation}: {entry.definition}{category}{flags}{shown_distance}")
+    return "\n".join(lines)
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    server_version = "LexiconLookup/1.0"
+    index: LexiconIndex = LexiconIndex([])
+    source = ""
+
+    def log_message(self, fmt: str, *args) -> None:
+        sys.stderr.write(f"[{self.log_date_time_string()}] {fmt % args}\n")
+
+    def _json(self, status: int, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        parsed = urllib.parse.urlsplit(self.path)
+        params = {k: v[-1] for k, v in urllib.parse.parse_qs(parsed.query).items()}
+        path = parsed.path.rstrip("/")
+        if path == "/health":
+            self._json(200, {"entries": len(self.index), "source": self.source})
+        elif path == "/terms":
+            self._json(200, {"terms": [e.to_dict() for e in self.index.entries]})
+        elif path == "/lookup":
+            query, mode = params.get("q", ""), params.get("mode", "auto")
+            if not query or mode not in MODES:
+                self._json(400, {"error": f"need q=<abbreviation> and mode in {', '.join(MODES)}"})
+                return
+            try:
+                distance, limit = int(params.get("distance", 1)), int(params.get("limit", 10))
+            except ValueError:
+                self._json(400, {"error": "distance and limit must be integers"})
+                return
+            start = time.perf_counter()
+            kind, hits = run_lookup(self.index, query, mode, distance, limit)
+            elapsed_us = (time.perf_counter() - start) * 1e6
+            self._json(200, {"query": query, "match": kind, "elapsed_us": round(elapsed_us, 1),
+                             "results": [{**e.to_dict(), "distance": d} for d, e in hits]})
+        else:
+            self._json(404, {"error": "use /lookup?q=..., /terms or /health"})
+
+
+def benchmark(index: LexiconIndex, rounds: int = 2000) -> None:
+    """Mean and p99 latency per lookup kind over queries drawn from the index itself."""
+    random.seed(0)
+    keys = [e.abbreviation for e in index.entries]
+    typos = [k[:-1] + ("X" if k[-1] != "X" else "Y") for k in keys]
+    cases = [("exact", lambda q: index.exact(q), keys),
+             ("case-insensitive", lambda q: index.case_insensitive(q), [k.lower() for k in keys]),
+             ("prefix", lambda q: index.prefix(q[:1]), keys),
+             ("fuzzy d=1", lambda q: index.fuzzy(q, 1), typos),
+             ("fuzzy d=2", lambda q: index.fuzzy(q, 2), typos),
+             ("auto (typo)", lambda q: index.lookup(q), typos)]
+    print(f"{'lookup':<18}{'mean µs':>10}{'p99 µs':>10}")
+    for name, fn, queries in cases:
+        sample = [random.choice(queries) for _ in range(rounds)]
+        times = []
+        for query in sample:
+            start = time.perf_counter()
+            fn(query)
+            times.append((time.perf_counter() - start) * 1e6)
+        times.sort()
+        print(f"{name:<18}{sum(times) / len(times):>10.1f}{times[int(len(times) * 0.99)]:>10.1f}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Exact, case-insensitive, prefix and fuzzy lexicon lookup.")
+    parser.add_argument("queries", nargs="*", help="Abbreviations to look up (none: interactive prompt)")
+    parser.add_argument("--source", type=Path, help="Lexicon TTL or CSV (default: generated TTL, else CSV)")
+    parser.add_argument("--mode", choices=MODES, default="auto", help="Lookup kind (default: auto = first tier that matches)")
+    parser.add_argument("--distance", type=int, default=1, help="Maximum edit distance for fuzzy lookup (default: 1)")
+    parser.add_argument("--limit", type=int, default=10, help="Maximum results per query (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--serve", action="store_true", help="Serve lookups over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address for --serve (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=7300, help="Port for --serve (default: 7300)")
+    parser.add_argument("--benchmark", action="store_true", help="Measure lookup latency and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    start = time.perf_counter()
+    try:
+        index, source = load_index(args.source)
+    except FileNotFoundError as exc:
+        print(f"❌ {exc}")
+        return 1
+    loaded_ms = (time.perf_counter() - start) * 1000
+
+    if args.benchmark:
+        print(f"📚 {len(index)} terms from {source.name} indexed in {loaded_ms:.1f} ms")
+        benchmark(index)
+        return 0
+
+    if args.serve:
+        LookupHandler.index, LookupHandler.source = index, str(source)
+        server = ThreadingHTTPServer((args.host, args.port), LookupHandler)
+        server.daemon_threads = True
+        print(f"📚 {len(index)} terms from {source.name} indexed in {loaded_ms:.1f} ms")
+        print(f"🚀 Serving lookups at http://{args.host}:{args.port}/lookup?q=CQA", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    def answer(query: str) -> bool:
+        begin = time.perf_counter()
+        kind, hits = run_lookup(index, query, args.mode, args.distance, args.limit)
+        elapsed_us = (time.perf_counter() - begin) * 1e6
+        if args.json:
+            print(json.dumps({"query": query, "match": kind,
+                              "results": [{**e.to_dict(), "distance": d} for d, e in hits]}, ensure_ascii=False))
+        else:
+            print(format_hits(query, kind, hits, elapsed_us))
+        return bool(hits)
+
+    if args.queries:
+        found = [answer(q) for q in args.queries]
+        return 0 if all(found) else 1
+
+    print(f"📚 {len(index)} terms from {source.name} indexed in {loaded_ms:.1f} ms (empty line or Ctrl-D to quit)")
+    while True:
+        try:
+            query = input("abbr> ").strip()
+        except EOFError:
+            break
+        if not query:
+            break
+        answer(query)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Materialised portfolio analytics for drug products.
+
+Walks the temporal graph (DrugProduct -> StageOccupancy -> time:Interval ->
+time:Instant) once and computes, as of a given date, the figures that the
+product_instance queries derive with NOW() arithmetic on every request:
+
+- per occupancy: actual/projected start and end, duration, slip, delay flag
+  (05_stage_bottlenecks)
+- per drug: development start, stages completed, days in development, average
+  days per stage, velocity and projected launch (06_drug_velocity), historical
+  stage duration, stages remaining and launch forecast (10_portfolio_forecast)
+- per stage: drug count, delayed count, average/max duration, typical delay
+  reason
+
+Values are held in columnar ``array`` columns (dates as proleptic ordinals,
+0 = missing) and can be written as CSV tables and/or written back as triples.
+
+Usage:
+  python3 scripts/analysis/portfolio_analytics.py
+  python3 scripts/analysis/portfolio_analytics.py --as-of 2025-01-01 --csv-dir output/analytics
+  python3 scripts/analysis/portfolio_analytics.py --write-ttl output/current/cmc_stagegate_portfolio_analytics.ttl
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import re
+import sys
+import time
+from array import array
+from collections import Counter, defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph.interval_index import OPEN_END, IntervalIndex  # noqa: E402
+from graph.terms import RDF_TYPE, escape_ntriples, is_literal, parse_date, split_literal, term_value  # noqa: E402
+from graph.triple_store import TripleStore  # noqa: E402
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_TTL = BASE_DIR / "output" / "current" / "cmc_stagegate_all.ttl"
+
+EX = "https://w3id.org/cmc-stagegate#"
+TIME = "http://www.w3.org/2006/time#"
+RDFS_LABEL = "<http://www.w3.org/2000/01/rdf-schema#label>"
+
+A = f"<{RDF_TYPE}>"
+DRUG_PRODUCT = f"<{EX}DrugProduct>"
+HAS_STAGE_HISTORY = f"<{EX}hasStageHistory>"
+OCCUPIED_STAGE = f"<{EX}occupiedStage>"
+IS_CURRENT = f"<{EX}isCurrentStage>"
+DELAY_REASON = f"<{EX}delayReason>"
+ACTUAL_INTERVAL = f"<{EX}actualInterval>"
+VALID_DURING = f"<{EX}validDuring>"
+PROJECTED_INTERVAL = f"<{EX}projectedInterval>"
+CURRENT_STAGE = f"<{EX}currentStage>"
+DEVELOPMENT_PROGRAM = f"<{EX}developmentProgram>"
+HAS_MODALITY = f"<{EX}hasModality>"
+TARGET_INDICATION = f"<{EX}targetIndication>"
+HAS_BEGINNING = f"<{TIME}hasBeginning>"
+HAS_END = f"<{TIME}hasEnd>"
+IN_XSD_DATE = f"<{TIME}inXSDDate>"
+
+DAYS_PER_MONTH = 30.4
+NO_DATE = 0
+_STAGE_NUM_RE = re.compile(r"-(\d+)$")
+
+
+def stage_number(stage_iri: str) -> int:
+    """Stage number from IRIs like ``ex:Stage-protein-5``; -1 if absent."""
+    m = _STAGE_NUM_RE.search(term_value(stage_iri))
+    return int(m.group(1)) if m else -1
+
+
+def total_stages(modality: str) -> int:
+    """Stage count per value stream, as assumed by 10_portfolio_forecast."""
+    if "Protein" in modality:
+        return 13
+    if "CGT" in modality:
+        return 11
+    return 10
+
+
+def _first(store: TripleStore, s: str, p: str) -> Optional[str]:
+    return next((o for _, _, o in store.match(s, p, None)), None)
+
+
+def _label(store: TripleStore, node: Optional[str]) -> str:
+    if node is None:
+        return ""
+    label = _first(store, node, RDFS_LABEL)
+    return term_value(label) if label else term_value(node).rsplit("#", 1)[-1]
+
+
+class PortfolioAnalytics:
+    """Columnar per-occupancy, per-drug and per-stage analytics."""
+
+    def __init__(self, as_of: Optional[date] = None):
+        self.as_of = as_of or date.today()
+        # dictionaries
+        self.drugs: List[str] = []
+        self.stages: List[str] = []
+        self.occupancies: List[str] = []
+        self.delay_reasons: List[str] = []
+        # occupancy columns
+        self.occ_drug = array("I")
+        self.occ_stage = array("I")
+        self.occ_stage_num = array("i")
+        self.occ_current = array("b")  # ex:isCurrentStage: 1 true, 0 false, -1 not stated
+        self.occ_reason = array("i")  # index into delay_reasons, -1 for none
+        self.actual_start = array("l")
+        self.actual_end = array("l")
+        self.projected_start = array("l")
+        self.projected_end = array("l")
+        self.duration_days = array("l")
+        self.slip_days = array("l")
+        self.delayed = array("b")
+        # drug columns
+        self.drug_label: List[str] = []
+        self.drug_indication: List[str] = []
+        self.drug_modality: List[str] = []
+        self.drug_current_stage: List[str] = []
+        self.start_date = array("l")
+        self.stages_completed = array("i")
+        self.days_in_development = array("l")
+        self.avg_days_per_stage = array("d")
+        self.velocity = array("d")
+        self.projected_launch = array("l")
+        self.historical_avg_days = array("d")
+        self.stages_remaining = array("i")
+        self.months_to_launch = array("d")
+        self.estimated_launch = array("l")
+        self.confidence: List[str] = []
+        self._indexes: Dict[tuple, IntervalIndex] = {}
+
+    # ------------------------------------------------------------------ load
+    @classmethod
+    def from_store(cls, store: TripleStore, as_of: Optional[date] = None) -> "PortfolioAnalytics":
+        analytics = cls(as_of)
+        analytics._collect(store)
+        analytics._compute()
+        return analytics
+
+    def _interval_dates(self, store: TripleStore, interval: Optional[str], cache: Dict[str, tuple]) -> tuple:
+        if interval is None:
+            return NO_DATE, NO_DATE
+        cached = cache.get(interval)
+        if cached is None:
+            ends = []
+            for prop in (HAS_BEGINNING, HAS_END):
+                instant = _first(store, interval, prop)
+                value = _first(store, instant, IN_XSD_DATE) if instant else None
+                try:
+                    ends.append(parse_date(term_value(value)).toordinal() if value and is_literal(value) else NO_DATE)
+                except ValueError:
+                    ends.append(NO_DATE)
+            cached = cache[interval] = tuple(ends)
+        return cached
+
+    def _collect(self, store: TripleStore) -> None:
+        stage_index: Dict[str, int] = {}
+        reason_index: Dict[str, int] = {}
+        intervals: Dict[str, tuple] = {}
+        for drug, _, _ in store.match(None, A, DRUG_PRODUCT):
+            d = len(self.drugs)
+            self.drugs.append(drug)
+            self.drug_label.append(_label(store, drug))
+            indication = _first(store, drug, TARGET_INDICATION)
+            self.drug_indication.append(term_value(indication) if indication else "")
+            program = _first(store, drug, DEVELOPMENT_PROGRAM)
+            modality = _first(store, program, HAS_MODALITY) if program else None
+            self.drug_modality.append(term_value(modality) if modality else "")
+            current = _first(store, drug, CURRENT_STAGE)
+            self.drug_current_stage.append(current or "")
+
+            for _, _, occ in store.match(drug, HAS_STAGE_HISTORY, None):
+                stage = _first(store, occ, OCCUPIED_STAGE)
+                if stage is None:
+                    continue  # history entry that is referenced but never described
+                if stage not in stage_index:
+                    stage_index[stage] = len(self.stages)
+                    self.stages.append(stage)
+                flag = _first(store, occ, IS_CURRENT)
+                reason = _first(store, occ, DELAY_REASON)
+                if reason is not None:
+                    reason = term_value(reason)
+                    if reason not in reason_index:
+                        reason_index[reason] = len(self.delay_reasons)
+                        self.delay_reasons.append(reason)
+                actual = _first(store, occ, ACTUAL_INTERVAL) or _first(store, occ, VALID_DURING)
+                projected = _first(store, occ, PROJECTED_INTERVAL)
+                a_start, a_end = self._interval_dates(store, actual, intervals)
+                p_start, p_end = self._interval_dates(store, projected, intervals)
+
+                self.occupancies.append(occ)
+                self.occ_drug.append(d)
+                self.occ_stage.append(stage_index[stage])
+                self.occ_stage_num.append(stage_number(stage))
+                flag_value = split_literal(flag)[0] if flag else None
+                self.occ_current.append(1 if flag_value in ("true", "1") else 0 if flag_value in ("false", "0") else -1)
+                self.occ_reason.append(reason_index[reason] if reason is not None else -1)
+                self.actual_start.append(a_start)
+                self.actual_end.append(a_end)
+                self.projected_start.append(p_start)
+                self.projected_end.append(p_end)
+                self.delayed.append(1 if reason is not None else 0)
+
+    # --------------------------------------------------------------- compute
+    def _compute(self) -> None:
+        today = self.as_of.toordinal()
+        n_drugs = len(self.drugs)
+        first_start = [0] * n_drugs
+        completed = [0] * n_drugs
+        hist_total = [0] * n_drugs
+        hist_count = [0] * n_drugs
+
+        for i in range(len(self.occupancies)):
+            start, end = self.actual_start[i], self.actual_end[i]
+            effective_end = end or (today if start else NO_DATE)
+            duration = effective_end - start if start else -1
+            self.duration_days.append(duration)
+
+            planned_end = self.projected_end[i]
+            slip = (effective_end - planned_end) if planned_end and effective_end else 0
+            self.slip_days.append(slip)
+            if slip > 0:
+                self.delayed[i] = 1
+
+            d = self.occ_drug[i]
+            if start and (not first_start[d] or start < first_start[d]):
+                first_start[d] = start
+            # Like 06_drug_velocity, only occupancies flagged isCurrentStage false count as completed
+            if self.occ_current[i] == 0:
+                completed[d] += 1
+                if start and end:
+                    hist_total[d] += end - start
+                    hist_count[d] += 1
+
+        for d in range(n_drugs):
+            start = first_start[d]
+            self.start_date.append(start)
+            self.stages_completed.append(completed[d])
+            total = today - start if start else 0
+            self.days_in_development.append(total)
+            avg = total / (completed[d] + 1) if start else 0.0
+            self.avg_days_per_stage.append(avg)
+            self.velocity.append(365 / avg if avg else 0.0)
+            self.projected_launch.append(int(start + 13 * avg) if start else NO_DATE)
+
+            hist = hist_total[d] / hist_count[d] if hist_count[d] else 0.0
+            self.historical_avg_days.append(hist)
+            current_num = stage_number(self.drug_current_stage[d]) if self.drug_current_stage[d] else -1
+            remaining = total_stages(self.drug_modality[d]) - current_num if current_num >= 0 else -1
+            self.stages_remaining.append(remaining)
+            months = remaining * hist / DAYS_PER_MONTH if remaining >= 0 and hist else 0.0
+            self.months_to_launch.append(months)
+            self.estimated_launch.append(today + round(months * DAYS_PER_MONTH) if hist and remaining >= 0 else NO_DATE)
+            self.confidence.append("High" if current_num > 7 else "Medium" if current_num > 4 else "Low")
+
+    # -------------------------------------------------------------- intervals
+    def interval_index(self, projected: bool = False, stage: Optional[int] = None) -> IntervalIndex:
+        """Interval index over actual (default) or projected occupancy intervals.
+
+        Payloads are occupancy rows; actual intervals without an end are open.
+        With ``stage`` the index only holds occupancies of that stage number.
+        """
+        key = (projected, stage)
+        index = self._indexes.get(key)
+        if index is None:
+            starts, ends = ((self.projected_start, self.projected_end) if projected
+                            else (self.actual_start, self.actual_end))
+            stage_num = self.occ_stage_num
+            index = self._indexes[key] = IntervalIndex(
+                (starts[i], ends[i] or (NO_DATE if projected else OPEN_END), i)
+                for i in range(len(self.occupancies))
+                if starts[i] and (stage is None or stage_num[i] == stage))
+        return index
+
+    def occupancies_overlapping(self, lo: date, hi: date, stage: Optional[int] = None,
+                                projected: bool = False) -> List[int]:
+        """Occupancy rows whose interval overlaps ``[lo, hi]``, optionally for one stage number."""
+        return sorted(self.interval_index(projected, stage).overlapping(lo.toordinal(), hi.toordinal()))
+
+    def drugs_in_stage_on(self, day: date, stage: Optional[int] = None, projected: bool = False) -> List[str]:
+        """Drugs occupying (or planned to occupy) a stage on ``day``."""
+        rows = self.occupancies_overlapping(day, day, stage, projected)
+        return sorted({self.drugs[self.occ_drug[i]] for i in rows})
+
+    # ---------------------------------------------------------------- tables
+    def stage_summary(self) -> List[Dict]:
+        """Per-stage bottleneck figures (cf. 05_stage_bottlenecks)."""
+        drugs = defaultdict(set)
+        delayed = defaultdict(set)
+        durations = defaultdict(list)
+        reasons: Dict[int, Counter] = defaultdict(Counter)
+        for i in range(len(self.occupancies)):
+            s = self.occ_stage[i]
+            drugs[s].add(self.occ_drug[i])
+            if self.delayed[i]:
+                delayed[s].add(self.occ_drug[i])
+            if self.occ_reason[i] >= 0:
+                reasons[s][self.occ_reason[i]] += 1
+            if self.duration_days[i] >= 0:
+                durations[s].append(self.duration_days[i])
+        rows = []
+        for s, stage in enumerate(self.stages):
+            values = durations[s]
+            rows.append({
+                "stage": term_value(stage),
+                "drug_count": len(drugs[s]),
+                "delayed_drugs": len(delayed[s]),
+                "avg_days": round(sum(values) / len(values), 1) if values else "",
+                "max_days": max(values) if values else "",
+                "typical_delay_reason": self.delay_reasons[reasons[s].most_common(1)[0][0]] if reasons[s] else "",
+            })
+        rows.sort(key=lambda r: (-r["drug_count"], r["stage"]))
+        return rows
+
+    def drug_table(self) -> List[Dict]:
+        rows = []
+        for d, drug in enumerate(self.drugs):
+            rows.append({
+                "drug": term_value(drug),
+                "label": self.drug_label[d],
+                "indication": self.drug_indication[d],
+                "modality": self.drug_modality[d],
+                "current_stage": term_value(self.drug_current_stage[d]) if self.drug_current_stage[d] else "",
+                "start_date": _iso(self.start_date[d]),
+                "stages_completed": self.stages_completed[d],
+                "days_in_development": self.days_in_development[d],
+                "avg_days_per_stage": round(self.avg_days_per_stage[d], 1),
+                "stages_per_year": round(self.velocity[d], 3),
+                "projected_launch": _iso(self.projected_launch[d]),
+                "historical_avg_days": round(self.historical_avg_days[d], 1),
+                "stages_remaining": self.stages_remaining[d],
+                "months_to_launch": round(self.months_to_launch[d], 1),
+                "estimated_launch": _iso(self.estimated_launch[d]),
+                "confidence": self.confidence[d],
+            })
+        return rows
+
+    def occupancy_table(self) -> List[Dict]:
+        rows = []
+        for i, occ in enumerate(self.occupancies):
+            rows.append({
+                "occupancy": term_value(occ),
+                "drug": term_value(self.drugs[self.occ_drug[i]]),
+                "stage": term_value(self.stages[self.occ_stage[i]]),
+                "is_current": self.occ_current[i] == 1,
+                "actual_start": _iso(self.actual_start[i]),
+                "actual_end": _iso(self.actual_end[i]),
+                "projected_start": _iso(self.projected_start[i]),
+                "projected_end": _iso(self.projected_end[i]),
+                "duration_days": self.duration_days[i] if self.duration_days[i] >= 0 else "",
+                "slip_days": self.slip_days[i],
+                "delayed": bool(self.delayed[i]),
+            })
+        return rows
+
+    def write_csv(self, directory: Path) -> List[Path]:
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, rows in (("portfolio_drugs", self.drug_table()),
+                           ("portfolio_occupancies", self.occupancy_table()),
+                           ("portfolio_stages", self.stage_summary())):
+            path = directory / f"{name}.csv"
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                if rows:
+                    writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+                    writer.writeheader()
+                    writer.writerows(rows)
+            written.append(path)
+        return written
+
+    # -------------------------------------------------------------- triples
+    def to_turtle(self) -> str:
+        """Precomputed values as ex: datatype properties on drugs and occupancies."""
+        lines = [
+            f"@prefix ex: <{EX}> .",
+            "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .",
+            "@prefix owl: <http://www.w3.org/2002/07/owl#> .",
+            "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .",
+            "",
+            f"# Portfolio analytics materialised as of {self.as_of.isoformat()}",
+            "# Generated by scripts/analysis/portfolio_analytics.py",
+            "",
+        ]
+        for prop, comment in (
+            ("analyticsAsOf", "Date the precomputed analytics refer to"),
+            ("durationDays", "Days spent in the stage (to the as-of date if still open)"),
+            ("slipDays", "Days the actual end is later than the projected end"),
+            ("isDelayed", "Occupancy has a delay reason or overran its projection"),
+            ("daysInDevelopment", "Days since the first stage entry"),
+            ("stagesCompleted", "Number of completed stage occupancies"),
+            ("avgDaysPerStage", "Days in development divided by stages entered"),
+            ("stagesPerYear", "Development velocity"),
+            ("projectedLaunchDate", "Start date plus 13 average stage durations"),
+            ("stagesRemaining", "Stages left for the drug's value stream"),
+            ("estimatedLaunchDate", "As-of date plus remaining stages at historical pace"),
+            ("forecastConfidence", "High/Medium/Low by current stage"),
+        ):
+            lines.append(f'ex:{prop} a owl:DatatypeProperty ; rdfs:comment "{comment}" .')
+        lines.append("")
+
+        as_of = f'"{self.as_of.isoformat()}"^^xsd:date'
+        for i, occ in enumerate(self.occupancies):
+            props = [f"ex:isDelayed {'true' if self.delayed[i] else 'false'}",
+                     f'ex:slipDays "{self.slip_days[i]}"^^xsd:integer',
+                     f"ex:analyticsAsOf {as_of}"]
+            if self.duration_days[i] >= 0:
+                props.insert(0, f'ex:durationDays "{self.duration_days[i]}"^^xsd:integer')
+            lines.append(f"{occ} " + " ;\n    ".join(props) + " .")
+        lines.append("")
+        for d, drug in enumerate(self.drugs):
+            props = [f'ex:stagesCompleted "{self.stages_completed[d]}"^^xsd:integer',
+                     f"ex:analyticsAsOf {as_of}",
+                     f'ex:forecastConfidence "{escape_ntriples(self.confidence[d])}"']
+            if self.start_date[d]:
+                props += [f'ex:daysInDevelopment "{self.days_in_development[d]}"^^xsd:integer',
+                          f'ex:avgDaysPerStage "{self.avg_days_per_stage[d]:.2f}"^^xsd:decimal',
+                          f'ex:stagesPerYear "{self.velocity[d]:.4f}"^^xsd:decimal',
+                          f'ex:projectedLaunchDate "{_iso(self.projected_launch[d])}"^^xsd:date']
+            if self.stages_remaining[d] >= 0:
+                props.append(f'ex:stagesRemaining "{self.stages_remaining[d]}"^^xsd:integer')
+            if self.estimated_launch[d]:
+                props.append(f'ex:estimatedLaunchDate "{_iso(self.estimated_launch[d])}"^^xsd:date')
+            lines.append(f"{drug} " + " ;\n    ".join(props) + " .")
+        return "\n".join(lines) + "\n"
+
+
+def _iso(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat() if ordinal else ""
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Materialise portfolio analytics from the temporal graph.")
+    parser.add_argument("--ttl", nargs="+", default=[str(DEFAULT_TTL)], help="TTL files to analyse")
+    parser.add_argument("--as-of", help="Reference date instead of today (YYYY-MM-DD)")
+    parser.add_argument("--csv-dir", help="Write portfolio_{drugs,occupancies,stages}.csv here")
+    parser.add_argument("--write-ttl", help="Write the precomputed values as triples to this file")
+    parser.add_argument("--on", help="List stage occupancies running on this date (YYYY-MM-DD)")
+    parser.add_argument("--overlapping", nargs=2, metavar=("START", "END"),
+                        help="List stage occupancies overlapping this date range, e.g. a gate review")
+    parser.add_argument("--stage", type=int, help="Restrict --on/--overlapping to one stage number")
+    parser.add_argument("--projected", action="store_true", help="Use projected instead of actual intervals")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    as_of = date.fromisoformat(args.as_of) if args.as_of else date.today()
+
+    start = time.perf_counter()
+    store = TripleStore.from_files(args.ttl)
+    loaded = time.perf_counter()
+    analytics = PortfolioAnalytics.from_store(store, as_of)
+    computed = time.perf_counter()
+
+    print(f"Loaded {len(store)} triples in {loaded - start:.2f}s; analytics computed in "
+          f"{(computed - loaded) * 1000:.1f} ms (as of {as_of.isoformat()})")
+    print(f"  Drugs: {len(analytics.drugs)}, stage occupancies: {len(analytics.occupancies)}, "
+          f"delayed: {sum(analytics.delayed)}")
+
+    if not analytics.drugs:
+        print("⚠️  No ex:DrugProduct instances found")
+    for row in analytics.drug_table():
+        print(f"  {row['label'][:30]:30} stage {row['current_stage'].rsplit('#', 1)[-1]:<20}  "
+              f"{row['stages_per_year']:>6} stages/yr  launch ≈ {row['estimated_launch'] or 'n/a'} ({row['confidence']})")
+
+    if args.on or args.overlapping:
+        lo, hi = ((date.fromisoformat(args.on),) * 2 if args.on
+                  else tuple(date.fromisoformat(d) for d in args.overlapping))
+        kind = "projected" if args.projected else "actual"
+        rows = analytics.occupancies_overlapping(lo, hi, args.stage, args.projected)
+        stage = f" in stage {args.stage}" if args.stage is not None else ""
+        window = lo.isoformat() if lo == hi else f"{lo.isoformat()} – {hi.isoformat()}"
+        print(f"\n🔎 {len(rows)} {kind} stage occupancies{stage} during {window}:")
+        for i in rows:
+            print(f"  {analytics.drug_label[analytics.occ_drug[i]][:30]:30} "
+                  f"{term_value(analytics.stages[analytics.occ_stage[i]]).rsplit('#', 1)[-1]:20} "
+                  f"{_iso(analytics.actual_start[i] if not args.projected else analytics.projected_start[i])} → "
+                  f"{_iso(analytics.actual_end[i] if not args.projected else analytics.projected_end[i]) or 'open'}")
+
+    if args.csv_dir:
+        for path in analytics.write_csv(Path(args.csv_dir)):
+            print(f"📄 {path}")
+    if args.write_ttl:
+        path = Path(args.write_ttl)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(analytics.to_turtle(), encoding="utf-8")
+        print(f"📄 Precomputed triples written to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
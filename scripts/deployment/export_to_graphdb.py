@@ -11,6 +11,10 @@ import urllib.request
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph.query_cache import chain_version, deployed_version, file_digest, record_deploy  # noqa: E402
+
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Upload TTL files to GraphDB (RDF4J HTTP API).")
@@ -20,9 +24,10 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     default_user = os.getenv("GRAPHDB_USER")
     default_pass = os.getenv("GRAPHDB_PASSWORD")
 
+    base_dir = Path(os.getenv("STAGED_BASE_DIR", "/Users/nicholasbaro/Python/staged"))
     default_files = [
-        str(Path("/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_base.ttl")),
-        str(Path("/Users/nicholasbaro/Python/staged/output/current/cmc_stagegate_instances.ttl")),
+        str(base_dir / "data" / "required_ttl_files" / "cmc_stagegate_base.ttl"),
+        str(base_dir / "output" / "current" / "cmc_stagegate_instances.ttl"),
     ]
 
     parser.add_argument("--graphdb-url", default=default_url, help="GraphDB base URL (default from GRAPHDB_URL).")
@@ -119,22 +124,31 @@ def main(argv: Optional[List[str]] = None) -> int:
     if args.dry_run:
         print("Mode: DRY RUN (no data will be sent)")
 
-    for f in args.files:
-        p = Path(f).resolve()
-        if not p.exists():
-            print(f"Skip missing file: {p}")
-            continue
-        ctype = detect_content_type(p)
-        size = p.stat().st_size
-        print(f"Upload: {p.name} ({size} bytes) as {ctype}")
-        if args.dry_run:
-            continue
-        ok, status, msg = upload_file(p, endpoint, ctype, auth_header, args.timeout, args.max_retries)
-        if ok:
-            print(f"  -> Success (HTTP {status})")
-        else:
-            print(f"  -> Failed (HTTP {status}): {msg}")
-            return 1
+    uploaded: List[Path] = []
+    try:
+        for f in args.files:
+            p = Path(f).resolve()
+            if not p.exists():
+                print(f"Skip missing file: {p}")
+                continue
+            ctype = detect_content_type(p)
+            size = p.stat().st_size
+            print(f"Upload: {p.name} ({size} bytes) as {ctype}")
+            if args.dry_run:
+                continue
+            ok, status, msg = upload_file(p, endpoint, ctype, auth_header, args.timeout, args.max_retries)
+            if ok:
+                print(f"  -> Success (HTTP {status})")
+                uploaded.append(p)
+            else:
+                print(f"  -> Failed (HTTP {status}): {msg}")
+                return 1
+    finally:
+        if uploaded:
+            # New graph version invalidates cached query results for this repository,
+            # including after a partial upload
+            repo_url = args.graphdb_url.rstrip("/") + f"/repositories/{urllib.parse.quote(args.repository)}"
+            record_deploy(repo_url, chain_version(deployed_version(repo_url), file_digest(uploaded)))
 
     print("Done.")
     return 0
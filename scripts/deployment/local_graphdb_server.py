@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for GraphDB speaking the subset of the RDF4J HTTP protocol used
+by this repository, so the SPARQL tests and uploads can run without a GraphDB
+install.
+
+Endpoints (per repository, default ``cmc-stagegate``):
+
+- ``GET  /repositories``                       list repositories
+- ``GET|POST /repositories/{id}``              SPARQL query (``query`` parameter,
+  ``application/sparql-query`` or form-encoded body)
+- ``POST /repositories/{id}/statements``       add Turtle / N-Triples
+- ``PUT  /repositories/{id}/statements``       replace contents
+- ``DELETE /repositories/{id}/statements``     clear (optional subj/pred/obj filter)
+- ``GET  /repositories/{id}/statements``       export as N-Triples
+- ``GET  /repositories/{id}/size``             number of statements
+- ``GET  /repositories/{id}/namespaces``       known prefixes
+
+Named graphs are not modelled: a ``context`` parameter is accepted and the data
+is merged into the default graph.
+
+JSON query results are cached per repository (see ``graph.query_cache``); any
+change to a repository's statements bumps its graph version, clears the cache
+and records the new version so client-side caches are invalidated too. A
+request sent with ``Cache-Control: no-cache`` is always evaluated, and
+``--cache-mb 0`` turns the cache off.
+
+Usage:
+  python3 scripts/deployment/local_graphdb_server.py --load output/current/cmc_stagegate_all.ttl
+  python3 scripts/validation/test_gist_queries.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph.query_cache import QueryCache, chain_version, record_deploy  # noqa: E402
+from graph.sparql import QueryResult, run_query  # noqa: E402
+from graph.sparql_parser import SparqlError  # noqa: E402
+from graph.terms import STANDARD_PREFIXES, to_ntriples  # noqa: E402
+from graph.triple_store import TripleStore  # noqa: E402
+from graph.turtle_parser import TurtleError, TurtleParser  # noqa: E402
+
+RDF_CONTENT_TYPES = {"text/turtle", "application/x-turtle", "application/n-triples", "text/plain"}
+
+
+class Repository:
+    """A named store plus the namespaces seen in uploaded data."""
+
+    def __init__(self, repo_id: str, url: str, cache_bytes: int):
+        self.id = repo_id
+        self.url = url
+        self.store = TripleStore()
+        self.namespaces: Dict[str, str] = dict(STANDARD_PREFIXES)
+        self.lock = threading.RLock()
+        self.cache = QueryCache(max_bytes=cache_bytes)
+        self.version = chain_version(None, hashlib.sha256(b"").hexdigest())
+
+    def _changed(self, digest: str) -> None:
+        self.version = chain_version(self.version, digest)
+        self.cache.clear()
+        record_deploy(self.url, self.version)
+
+    def load(self, text: str, base: Optional[str] = None, replace: bool = False) -> int:
+        parser = TurtleParser(base)
+        triples = parser.parse(text)
+        with self.lock:
+            if replace:
+                self.store.clear()
+            added = self.store.add_all(triples)
+            for prefix, namespace in parser.prefixes.items():
+                self.namespaces.setdefault(prefix, namespace)
+            self._changed(hashlib.sha256(text.encode("utf-8")).hexdigest())
+        return added
+
+    def remove(self, s: Optional[str], p: Optional[str], o: Optional[str]) -> int:
+        with self.lock:
+            removed = self.store.remove(s, p, o)
+            if removed:
+                self._changed(hashlib.sha256(f"remove {s} {p} {o}".encode("utf-8")).hexdigest())
+        return removed
+
+    def query(self, text: str) -> QueryResult:
+        with self.lock:
+            return run_query(self.store, text, prefixes=self.namespaces)
+
+
+class GraphDBHandler(BaseHTTPRequestHandler):
+    server_version = "LocalGraphDB/1.0"
+    repositories: Dict[str, Repository] = {}
+
+    # ----------------------------------------------------------------- helpers
+    def log_message(self, fmt: str, *args) -> None:
+        sys.stderr.write(f"[{self.log_date_time_string()}] {fmt % args}\n")
+
+    def _send(self, status: int, body: bytes, content_type: str = "text/plain; charset=utf-8") -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, (message + "\n").encode("utf-8"))
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _content_type(self) -> str:
+        return (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+    def _route(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        params = urllib.parse.parse_qs(parsed.query)
+        parts = [urllib.parse.unquote(p) for p in parsed.path.strip("/").split("/") if p]
+        return parts, params
+
+    def _repository(self, parts: List[str]) -> Optional[Repository]:
+        repo = self.repositories.get(parts[1])
+        if repo is None:
+            self._error(404, f"Unknown repository: {parts[1]}")
+        return repo
+
+    # ---------------------------------------------------------------- dispatch
+    def do_GET(self) -> None:
+        parts, params = self._route()
+        if parts == ["repositories"]:
+            return self._list_repositories()
+        if len(parts) < 2 or parts[0] != "repositories":
+            return self._error(404, "Not found")
+        repo = self._repository(parts)
+        if repo is None:
+            return
+        if len(parts) == 2:
+            if "query" not in params:
+                return self._error(400, "Missing query parameter")
+            return self._query(repo, params["query"][0])
+        if parts[2:] == ["size"]:
+            return self._send(200, str(len(repo.store)).encode("ascii"))
+        if parts[2:] == ["statements"]:
+            return self._export(repo, params)
+        if parts[2:] == ["namespaces"]:
+            return self._namespaces(repo)
+        return self._error(404, "Not found")
+
+    do_HEAD = do_GET
+
+    def do_POST(self) -> None:
+        parts, params = self._route()
+        if len(parts) < 2 or parts[0] != "repositories":
+            return self._error(404, "Not found")
+        repo = self._repository(parts)
+        if repo is None:
+            return
+        body = self._body()
+        ctype = self._content_type()
+        if len(parts) == 2:
+            if ctype == "application/sparql-query":
+                return self._query(repo, body.decode("utf-8"))
+            form = urllib.parse.parse_qs(body.decode("utf-8")) if ctype == "application/x-www-form-urlencoded" else {}
+            query = (form.get("query") or params.get("query") or [None])[0]
+            if query is None:
+                return self._error(400, "Missing query")
+            return self._query(repo, query)
+        if parts[2:] == ["statements"]:
+            return self._upload(repo, body, ctype, params, replace=False)
+        return self._error(404, "Not found")
+
+    def do_PUT(self) -> None:
+        parts, params = self._route()
+        if len(parts) != 3 or parts[0] != "repositories" or parts[2] != "statements":
+            return self._error(404, "Not found")
+        repo = self._repository(parts)
+        if repo is not None:
+            self._upload(repo, self._body(), self._content_type(), params, replace=True)
+
+    def do_DELETE(self) -> None:
+        parts, params = self._route()
+        if len(parts) != 3 or parts[0] != "repositories" or parts[2] != "statements":
+            return self._error(404, "Not found")
+        repo = self._repository(parts)
+        if repo is None:
+            return
+        s, p, o = (params.get(k, [None])[0] for k in ("subj", "pred", "obj"))
+        removed = repo.remove(s, p, o)
+        print(f"🗑  {repo.id}: removed {removed} statements", flush=True)
+        self._send(204, b"")
+
+    # ---------------------------------------------------------------- handlers
+    def _list_repositories(self) -> None:
+        base = f"http://{self.headers.get('Host', 'localhost')}/repositories/"
+        bindings = [{
+            "uri": {"type": "uri", "value": base + repo_id},
+            "id": {"type": "literal", "value": repo_id},
+            "title": {"type": "literal", "value": repo_id},
+            "readable": {"type": "literal", "value": "true"},
+            "writable": {"type": "literal", "value": "true"},
+        } for repo_id in self.repositories]
+        payload = {"head": {"vars": ["uri", "id", "title", "readable", "writable"]},
+                   "results": {"bindings": bindings}}
+        self._send(200, json.dumps(payload).encode("utf-8"), "application/sparql-results+json")
+
+    def _namespaces(self, repo: Repository) -> None:
+        bindings = [{"prefix": {"type": "literal", "value": prefix},
+                     "namespace": {"type": "literal", "value": namespace}}
+                    for prefix, namespace in sorted(repo.namespaces.items())]
+        payload = {"head": {"vars": ["prefix", "namespace"]}, "results": {"bindings": bindings}}
+        self._send(200, json.dumps(payload).encode("utf-8"), "application/sparql-results+json")
+
+    def _query(self, repo: Repository, text: str) -> None:
+        start = time.perf_counter()
+        csv_wanted = "text/csv" in (self.headers.get("Accept") or "")
+        version = repo.version
+        bypass = csv_wanted or "no-cache" in (self.headers.get("Cache-Control") or "").lower()
+        payload = None if bypass else repo.cache.get(text, version)
+        if payload is not None:
+            elapsed = time.perf_counter() - start
+            print(f"🔎 {repo.id}: query answered from cache in {elapsed * 1000:.1f} ms", flush=True)
+            return self._send(200, json.dumps(payload).encode("utf-8"), "application/sparql-results+json")
+        try:
+            result = repo.query(text)
+        except SparqlError as e:
+            return self._error(400, f"MALFORMED QUERY: {e}")
+        elapsed = time.perf_counter() - start
+        rows = "ASK" if result.boolean is not None else f"{len(result)} rows"
+        print(f"🔎 {repo.id}: query answered in {elapsed * 1000:.1f} ms ({rows})", flush=True)
+
+        if csv_wanted:
+            return self._send(200, result.to_csv().encode("utf-8"), "text/csv; charset=utf-8")
+        payload = result.to_json()
+        repo.cache.put(text, version, payload)
+        self._send(200, json.dumps(payload).encode("utf-8"), "application/sparql-results+json")
+
+    def _upload(self, repo: Repository, body: bytes, ctype: str, params: Dict[str, List[str]], replace: bool) -> None:
+        if ctype not in RDF_CONTENT_TYPES:
+            return self._error(415, f"Unsupported content type: {ctype or 'none'} (use text/turtle or application/n-triples)")
+        base = params.get("baseURI", [None])[0]
+        start = time.perf_counter()
+        try:
+            text = body.decode("utf-8")
+            added = repo.load(text, base, replace=replace)
+        except (TurtleError, UnicodeDecodeError) as e:
+            return self._error(400, f"MALFORMED DATA: {e}")
+        elapsed = time.perf_counter() - start
+        rate = added / elapsed if elapsed > 0 else float(added)
+        context = params.get("context", [None])[0]
+        note = f" (context {context} merged into default graph)" if context else ""
+        print(f"📥 {repo.id}: +{added} statements in {elapsed:.2f}s ({rate:,.0f} triples/s), "
+              f"total {len(repo.store)}{note}", flush=True)
+        self._send(204, b"")
+
+    def _export(self, repo: Repository, params: Dict[str, List[str]]) -> None:
+        s, p, o = (params.get(k, [None])[0] for k in ("subj", "pred", "obj"))
+        with repo.lock:
+            lines = [f"{to_ntriples(ts)} {to_ntriples(tp)} {to_ntriples(to)} .\n"
+                     for ts, tp, to in repo.store.match(s, p, o)]
+        self._send(200, "".join(lines).encode("utf-8"), "application/n-triples; charset=utf-8")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local RDF4J-compatible stand-in for GraphDB.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=7200, help="Port (default: 7200, as GraphDB)")
+    parser.add_argument("--repository", action="append", dest="repositories",
+                        help="Repository ID to serve; repeatable (default: cmc-stagegate)")
+    parser.add_argument("--load", nargs="+", default=[], help="TTL files to preload into the first repository")
+    parser.add_argument("--cache-mb", type=float, default=32,
+                        help="Query result cache budget per repository; 0 disables it (default: 32 MB)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    repo_ids = args.repositories or ["cmc-stagegate"]
+    host = "localhost" if args.host in ("0.0.0.0", "127.0.0.1", "") else args.host
+    cache_bytes = int(args.cache_mb * 1024 * 1024)
+    repositories = {
+        repo_id: Repository(repo_id, f"http://{host}:{args.port}/repositories/{repo_id}", cache_bytes)
+        for repo_id in repo_ids
+    }
+
+    first = repositories[repo_ids[0]]
+    for path in args.load:
+        path = Path(path)
+        if not path.exists():
+            print(f"❌ File not found: {path}")
+            return 1
+        start = time.perf_counter()
+        try:
+            added = first.load(path.read_text(encoding="utf-8"), path.resolve().as_uri())
+        except TurtleError as e:
+            print(f"❌ {path}: {e}")
+            return 1
+        print(f"📥 Loaded {path} into {first.id}: {added} statements in {time.perf_counter() - start:.2f}s")
+
+    GraphDBHandler.repositories = repositories
+    server = ThreadingHTTPServer((args.host, args.port), GraphDBHandler)
+    server.daemon_threads = True
+    print(f"🚀 Serving {', '.join(repo_ids)} at http://{args.host}:{args.port}/repositories/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,24 +4,30 @@ Combine multiple TTL files into a single comprehensive file.
 Consolidates base ontology, extensions, instances, and alignments.
 """
 
+import os
 from pathlib import Path
 
+# Project root (STAGED_BASE_DIR overrides it)
+BASE_DIR = os.getenv("STAGED_BASE_DIR", "/Users/nicholasbaro/Python/staged")
+
 # Default files to combine - now in organized location
 DEFAULT_FILES = [
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_base.ttl",
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_drug_products.ttl",
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_modalities.ttl",
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_temporal.ttl",
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_lexicon.ttl",
-    "/Users/nicholasbaro/Python/staged/output/current/cmc_stagegate_instances.ttl",
-    "/Users/nicholasbaro/Python/staged/output/current/cmc_stagegate_sme_instances.ttl",
-    "/Users/nicholasbaro/Python/staged/output/current/cmc_stagegate_lexicon_instances.ttl",
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/example_drug_instances.ttl",
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/example_temporal_tracking.ttl",
-    "/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_gist_align.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/cmc_stagegate_base.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/cmc_stagegate_drug_products.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/cmc_stagegate_modalities.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/cmc_stagegate_temporal.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/cmc_stagegate_lexicon.ttl",
+    f"{BASE_DIR}/output/current/cmc_stagegate_instances.ttl",
+    f"{BASE_DIR}/output/current/cmc_stagegate_sme_instances.ttl",
+    f"{BASE_DIR}/output/current/cmc_stagegate_lexicon_instances.ttl",
+    f"{BASE_DIR}/output/current/cmc_stagegate_term_links.ttl",
+    f"{BASE_DIR}/output/current/cmc_stagegate_sme_assignments.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/example_drug_instances.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/example_temporal_tracking.ttl",
+    f"{BASE_DIR}/data/required_ttl_files/cmc_stagegate_gist_align.ttl",
 ]
 # Combined output goes to output/current/
-DEFAULT_OUTPUT = "/Users/nicholasbaro/Python/staged/output/current/cmc_stagegate_all.ttl"
+DEFAULT_OUTPUT = f"{BASE_DIR}/output/current/cmc_stagegate_all.ttl"
 
 def combine_ttl_files(input_files=DEFAULT_FILES, output_file=DEFAULT_OUTPUT):
     """
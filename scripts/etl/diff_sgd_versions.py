@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Compare two SGD extractions (workbook versions) stage by stage and deliverable by deliverable.
+
+Rows are aligned on the identities generate_cmc_ttl_gupri.py mints GUPRIs
+from: a stage is (value stream, stage gate) and a deliverable is (value stream,
+stage gate, deliverable text), with the nth repeat of a deliverable in a stage
+matched to the nth repeat on the other side. Each version is loaded into a
+dict keyed by the GUPRI cache key and the two dicts are hash-joined, so the
+diff is linear in the number of rows. Modified entities are compared field by
+field (whitespace-normalised) over the columns both versions have; columns
+only one version has are reported as schema changes.
+
+The diff can be written as JSON, as a field-level CSV, and as RDF change
+triples (ex:ChangeSet / ex:EntityChange / ex:FieldChange, declared in
+cmc_stagegate_base.ttl) that point at the same GUPRIs as the instance data, so
+workbook history can be queried next to the graph.
+
+Usage:
+  python3 scripts/etl/diff_sgd_versions.py                     # latest data/extracted_* vs data/current
+  python3 scripts/etl/diff_sgd_versions.py data/extracted_250910 data/current --json diff.json --csv diff.csv
+  python3 scripts/etl/diff_sgd_versions.py OLD.csv NEW.csv --ttl output/current/sgd_changes.ttl
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generate_cmc_ttl_gupri as gupri  # noqa: E402
+
+# Identity columns; everything else in OFFICIAL_COLS is compared
+IDENTITY_FIELDS = ("Value Stream", "Stage Gate", "Deliverable")
+STAGE_FIELDS = ("Stage Gate Description",)
+CHANGE_TYPES = {"added": "ex:ChangeAdded", "removed": "ex:ChangeRemoved", "modified": "ex:ChangeModified"}
+
+
+def normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").split())
+
+
+def find_sgd_csv(path: Path) -> Path:
+    """The SGD extraction itself, or the ``*__SGD.csv`` inside a directory."""
+    if path.is_file():
+        return path
+    matches = sorted(path.glob("*__SGD.csv"))
+    if not matches:
+        raise FileNotFoundError(f"no *__SGD.csv in {path}")
+    return matches[0]
+
+
+def default_versions() -> Tuple[Path, Path]:
+    """Most recent archived extraction (data/extracted_YYMMDD) and data/current."""
+    archives = sorted(p for p in (gupri.BASE_DIR / "data").glob("extracted_*") if p.is_dir())
+    if not archives:
+        raise FileNotFoundError(f"no data/extracted_* directory under {gupri.BASE_DIR}")
+    return archives[-1], gupri.BASE_DIR / "data" / "current"
+
+
+class Version:
+    """One SGD extraction indexed by GUPRI cache key."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows = 0
+        # key -> (identity components, {field: value})
+        self.stages: Dict[str, Tuple[Tuple[str, ...], Dict[str, str]]] = {}
+        self.deliverables: Dict[str, Tuple[Tuple[str, ...], Dict[str, str]]] = {}
+        with open(path, encoding="utf-8", newline="") as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+            fieldnames = reader.fieldnames or []
+        known = {name for names in gupri.OFFICIAL_COLS.values() for name in names}
+        self.fields = [col for col, names in gupri.OFFICIAL_COLS.items() if any(n in fieldnames for n in names)]
+        # Columns outside OFFICIAL_COLS, labelled by the repeated header row when there is one
+        header = next((r for r in rows[:5] if gupri.get_value(r, "Value Stream") == "Value Stream"), {})
+        self.extra = {name: normalize(header.get(name)) or name for name in fieldnames if name not in known}
+        self.fields += list(self.extra.values())
+        self._index(rows)
+
+    def _index(self, rows: List[Dict[str, str]]) -> None:
+        occurrences: Counter = Counter()
+        for row in rows:
+            value_stream = gupri.get_value(row, "Value Stream")
+            stage_num = gupri.get_value(row, "Stage Gate")
+            if not stage_num or (value_stream == "Value Stream" and stage_num == "Stage Gate"):
+                continue
+            self.rows += 1
+            stage_key = gupri.gupri_cache_key("Stage", value_stream, stage_num)
+            if stage_key not in self.stages:
+                self.stages[stage_key] = ((value_stream, stage_num),
+                                          {f: normalize(gupri.get_value(row, f)) for f in STAGE_FIELDS})
+            deliverable = gupri.get_value(row, "Deliverable")
+            if not deliverable or not value_stream:
+                continue
+            key = gupri.gupri_cache_key("QualityAttribute", value_stream, stage_num, deliverable)
+            occurrences[key] += 1
+            if occurrences[key] > 1:
+                key = f"{key}{gupri.OCCURRENCE_SEP}{occurrences[key]}"
+            values = {f: normalize(gupri.get_value(row, f)) for f in gupri.OFFICIAL_COLS
+                      if f not in IDENTITY_FIELDS and f not in STAGE_FIELDS}
+            values.update((label, normalize(row.get(name))) for name, label in self.extra.items())
+            self.deliverables[key] = ((value_stream, stage_num, deliverable), values)
+
+
+def diff_entities(old: Dict, new: Dict, fields: List[str]) -> Dict[str, List]:
+    """Hash join of two key -> (identity, values) maps."""
+    added = [k for k in new if k not in old]
+    removed = [k for k in old if k not in new]
+    modified = []
+    for key, (identity, values) in new.items():
+        previous = old.get(key)
+        if previous is None:
+            continue
+        changes = [(f, previous[1].get(f, ""), values.get(f, "")) for f in fields
+                   if previous[1].get(f, "") != values.get(f, "")]
+        if changes:
+            modified.append((key, changes))
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def entity_id(kind: str, identity: Tuple[str, ...]) -> str:
+    """GUPRI for an entity, minted exactly as generate_cmc_ttl_gupri.py does."""
+    if kind == "Stage":
+        value_stream, stage_num = identity
+        hint = f"{gupri.safe_id(value_stream)}_{gupri.safe_id(stage_num)}"
+    else:
+        hint = gupri.safe_id(identity[2])[:30]
+    return gupri.create_gupri(kind, *identity, readable_hint=hint)
+
+
+def compare(old: Version, new: Version) -> Dict:
+    """Full diff of two versions as plain data."""
+    shared = [f for f in new.fields if f in old.fields]
+    report = {
+        "old": str(old.path), "new": str(new.path),
+        "old_rows": old.rows, "new_rows": new.rows,
+        "columns_added": [f for f in new.fields if f not in old.fields],
+        "columns_removed": [f for f in old.fields if f not in new.fields],
+    }
+    for kind, attr, fields in (("Stage", "stages", [f for f in STAGE_FIELDS if f in shared]),
+                               ("QualityAttribute", "deliverables", [f for f in shared if f not in IDENTITY_FIELDS
+                                                                     and f not in STAGE_FIELDS])):
+        before, after = getattr(old, attr), getattr(new, attr)
+        result = diff_entities(before, after, fields)
+
+        def describe(key: str, side: Dict) -> Dict:
+            identity = side[key][0]
+            return {"key": key.replace(gupri.OCCURRENCE_SEP, "#"), "id": entity_id(kind, identity),
+                    "label": identity[-1] if kind == "QualityAttribute" else f"{identity[0]} stage {identity[1]}"}
+
+        report[attr] = {
+            "added": [describe(k, after) for k in result["added"]],
+            "removed": [describe(k, before) for k in result["removed"]],
+            "modified": [{**describe(k, after), "fields": [{"field": f, "old": o, "new": n} for f, o, n in changes]}
+                         for k, changes in result["modified"]],
+        }
+    return report
+
+
+def short_hash(*parts: str) -> str:
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=6).hexdigest()
+
+
+def to_turtle(report: Dict) -> str:
+    """RDF change triples for a diff report."""
+    lit = gupri.escape_turtle_literal
+    old_name, new_name = Path(report["old"]).parent.name, Path(report["new"]).parent.name
+    changeset = f"ex:ChangeSet_{short_hash(report['old'], report['new'], report['generated'])}"
+    totals = {t: sum(len(report[a][t]) for a in ("stages", "deliverables")) for t in CHANGE_TYPES}
+    lines = [gupri.PREFIXES, "",
+             f"{changeset} a ex:ChangeSet ;",
+             f"    rdfs:label {lit(f'SGD changes {old_name} -> {new_name}')} ;",
+             f"    ex:fromVersion {lit(report['old'])} ;",
+             f"    ex:toVersion {lit(report['new'])} ;",
+             f"    prov:generatedAtTime \"{report['generated']}\"^^xsd:dateTime ;",
+             f"    ex:addedCount \"{totals['added']}\"^^xsd:integer ;",
+             f"    ex:removedCount \"{totals['removed']}\"^^xsd:integer ;",
+             f"    ex:modifiedCount \"{totals['modified']}\"^^xsd:integer .", ""]
+    for attr in ("stages", "deliverables"):
+        for change_type, entries in report[attr].items():
+            for entry in entries:
+                change = f"ex:Change_{short_hash(changeset, change_type, entry['key'])}"
+                label = f"{change_type.capitalize()}: {entry['label'][:80]}"
+                field_changes = [(f"ex:FieldChange_{short_hash(change, f['field'])}", f)
+                                 for f in entry.get("fields", [])]
+                props = [f"ex:inChangeSet {changeset}",
+                         f"ex:changeType {CHANGE_TYPES[change_type]}",
+                         f"ex:changedEntity {entry['id']}",
+                         f"ex:entityKey {lit(entry['key'])}",
+                         f"rdfs:label {lit(label)}"]
+                props += [f"ex:hasFieldChange {node}" for node, _ in field_changes]
+                lines.append(f"{change} a ex:EntityChange ;\n    " + " ;\n    ".join(props) + " .")
+                for node, field in field_changes:
+                    lines += [f"{node} a ex:FieldChange ;",
+                              f"    ex:fieldName {lit(field['field'])} ;",
+                              f"    ex:oldValue {lit(field['old'])} ;",
+                              f"    ex:newValue {lit(field['new'])} ."]
+                lines.append("")
+    return "\n".join(lines)
+
+
+def write_csv(report: Dict, path: Path) -> None:
+    """One line per added/removed entity and per changed field."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["change", "kind", "id", "key", "field", "old", "new"])
+        for attr, kind in (("stages", "Stage"), ("deliverables", "Deliverable")):
+            for change_type, entries in report[attr].items():
+                for entry in entries:
+                    for field in entry.get("fields") or [{"field": "", "old": "", "new": ""}]:
+                        writer.writerow([change_type, kind, entry["id"], entry["key"], field["field"],
+                                         field["old"], field["new"]])
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diff two SGD extractions by stage and deliverable identity.")
+    parser.add_argument("old", nargs="?", type=Path, help="Older extraction (dir or *__SGD.csv); "
+                                                          "default: latest data/extracted_*")
+    parser.add_argument("new", nargs="?", type=Path, help="Newer extraction (default: data/current)")
+    parser.add_argument("--json", type=Path, help="Write the full diff as JSON")
+    parser.add_argument("--csv", type=Path, help="Write field-level changes as CSV")
+    parser.add_argument("--ttl", type=Path, help="Write RDF change triples (ex:ChangeSet)")
+    parser.add_argument("--show", type=int, default=5, help="Example changes to print per type (default: 5)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        old_path, new_path = default_versions() if args.old is None else (args.old, args.new or default_versions()[1])
+        old_csv, new_csv = find_sgd_csv(old_path), find_sgd_csv(new_path)
+    except FileNotFoundError as exc:
+        print(f"Error: {exc}")
+        return 1
+
+    gupri.load_id_mappings()
+    old, new = Version(old_csv), Version(new_csv)
+    report = {"generated": datetime.now().isoformat(timespec="seconds"), **compare(old, new)}
+
+    print("SGD Version Diff")
+    print("=" * 50)
+    print(f"Old: {old_csv} ({old.rows} rows)")
+    print(f"New: {new_csv} ({new.rows} rows)")
+    if report["columns_added"] or report["columns_removed"]:
+        print(f"Columns added: {', '.join(report['columns_added']) or '-'}; "
+              f"removed: {', '.join(report['columns_removed']) or '-'}")
+    for attr in ("stages", "deliverables"):
+        diff = report[attr]
+        print(f"{attr.capitalize():<13} +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['modified'])}")
+    field_counts = Counter(f["field"] for e in report["deliverables"]["modified"] for f in e["fields"])
+    if field_counts:
+        print("Most changed fields: " + ", ".join(f"{f} ({n})" for f, n in field_counts.most_common(5)))
+    for change_type, symbol in (("added", "+"), ("removed", "-"), ("modified", "~")):
+        for entry in report["deliverables"][change_type][:args.show]:
+            detail = ", ".join(f["field"] for f in entry.get("fields", []))
+            print(f"  {symbol} {entry['label'][:70]}" + (f"  [{detail}]" if detail else ""))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"📄 JSON diff: {args.json}")
+    if args.csv:
+        write_csv(report, args.csv)
+        print(f"📄 CSV diff: {args.csv}")
+    if args.ttl:
+        args.ttl.parent.mkdir(parents=True, exist_ok=True)
+        args.ttl.write_text(to_turtle(report), encoding="utf-8")
+        print(f"📄 Change triples: {args.ttl}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
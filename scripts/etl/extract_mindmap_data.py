@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 """
 Extract MindMap structure from HTML file and convert to ontology instances
+
+MindManager archives are decoded from the HTML and read in one streaming pass
+over Document.xml (scripts/mindmap/mindmap_stream.py); other payloads fall
+back to loading the whole file and parsing the tree.
 """
 
 import base64
@@ -14,6 +18,10 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "mindmap"))
+
+from mindmap_stream import open_mmap_document, parse_topics  # noqa: E402
+
 
 class MindMapExtractor:
     """Extract and process MindMap data from HTML viewer file"""
@@ -77,6 +85,49 @@ class MindMapExtractor:
                 
         return None
     
+    def parse_mmap_archive(self) -> Optional[Dict]:
+        """Stream the topics of the HTML's MindManager archive; None if it has no MindManager topics"""
+        try:
+            with open_mmap_document(self.html_path) as xml_stream:
+                print(f"Streaming Document.xml from: {self.html_path}")
+                structure = self.parse_mindmap_stream(xml_stream)
+        except (ValueError, zipfile.BadZipFile, ET.ParseError):
+            return None
+        return structure if structure['nodes'] else None
+    
+    def parse_mindmap_stream(self, xml_stream) -> Dict:
+        """Build the node structure from one iterparse pass over MindManager XML"""
+        structure = {
+            'root': None,
+            'nodes': [],
+            'relationships': []
+        }
+        
+        for topic in parse_topics(xml_stream, id_attr='id'):
+            node_data = {
+                'id': topic.id,
+                'text': topic.text or f"Node_{topic.index + 1}",
+                'type': topic.tag,
+                'attributes': topic.attributes
+            }
+            if topic.children:
+                node_data['children'] = topic.children
+            structure['nodes'].append(node_data)
+            if topic.parent is not None:
+                structure['relationships'].append({
+                    'parent': topic.parent,
+                    'child': topic.id,
+                    'type': 'hasChild'
+                })
+        
+        if structure['nodes']:
+            structure['root'] = structure['nodes'][0]['id']
+        self.nodes = structure['nodes']
+        self.relationships = structure['relationships']
+        self.node_counter = len(self.nodes)
+        print(f"Found {len(self.nodes)} topic nodes in one pass")
+        return structure
+    
     def parse_mindmap_xml(self, xml_content: str) -> Dict:
         """Parse MindMap XML structure"""
         try:
@@ -335,13 +386,16 @@ class MindMapExtractor:
             output_path = self.html_path.parent / 'mindmap_structure.ttl'
         
         try:
-            # Extract mmap data from HTML
-            base64_data = self.extract_mmap_data()
+            # MindManager archive: decode and stream Document.xml
+            structure = self.parse_mmap_archive()
+            if structure is not None:
+                node_count = self.generate_ttl(structure, output_path)
+                print(f"Successfully generated ontology with {node_count} nodes")
+                return True
             
-            # Decode base64
+            # Otherwise load the payload, extract the XML and parse the whole tree
+            base64_data = self.extract_mmap_data()
             mmap_bytes = self.decode_mmap(base64_data)
-            
-            # Extract XML
             xml_content = self.extract_xml_from_mmap(mmap_bytes)
             
             if xml_content:
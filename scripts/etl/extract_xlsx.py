@@ -15,24 +15,28 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 import re
 from pathlib import Path
 from typing import Dict, List, Optional
 
 
+BASE_DIR = Path(os.getenv("STAGED_BASE_DIR", "/Users/nicholasbaro/Python/staged"))
+
+
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Extract .xlsx sheets to CSV and optionally combine with CSV files.")
     parser.add_argument(
         "--input-dir",
         type=Path,
-        default=Path("/Users/nicholasbaro/Python/staged/data/current_input"),
+        default=BASE_DIR / "data" / "current_input",
         help="Directory containing .xlsx/.csv files (default: data/current_input)",
     )
     parser.add_argument(
         "--output-dir",
         type=Path,
-        default=Path("/Users/nicholasbaro/Python/staged/data/current"),
+        default=BASE_DIR / "data" / "current",
         help="Directory to write outputs (default: data/current)",
     )
     parser.add_argument(
@@ -172,7 +176,7 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     input_dir: Path = args.input_dir.resolve()
     # Default to data/current if no output dir specified
-    default_output = Path("/Users/nicholasbaro/Python/staged/data/current")
+    default_output = BASE_DIR / "data" / "current"
     output_dir: Path = (args.output_dir or default_output).resolve()
     encoding: str = args.encoding
 
@@ -6,14 +6,19 @@ Uses Globally Unique, Persistent, Resolvable Identifiers (GUPRIs).
 
 from __future__ import annotations
 
+import argparse
 import csv
+import hashlib
 import json
+import os
 import re
 import sys
 import uuid
+from array import array
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from glob import glob
-from typing import Dict, Iterable, List, Mapping, Set, Tuple
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 # Skip pandas import to avoid segfault
 pd = None
@@ -22,14 +27,17 @@ pd = None
 # Generated once using uuid.uuid4() and hardcoded for persistence
 CMC_NAMESPACE_UUID = uuid.UUID('a7c6f3e0-8b5d-4e2a-9f1c-3d7e5a9b2c4e')
 
+# Project root (STAGED_BASE_DIR overrides it, e.g. for benchmark workspaces)
+BASE_DIR = Path(os.getenv("STAGED_BASE_DIR", "/Users/nicholasbaro/Python/staged"))
+
 # Find files
-xlsx_files = glob("/Users/nicholasbaro/Python/staged/data/current_input/*.xlsx")
-EXCEL_FILE = Path(xlsx_files[0]) if xlsx_files else Path("/Users/nicholasbaro/Python/staged/data/current_input/input.xlsx")
+xlsx_files = glob(str(BASE_DIR / "data" / "current_input" / "*.xlsx"))
+EXCEL_FILE = Path(xlsx_files[0]) if xlsx_files else BASE_DIR / "data" / "current_input" / "input.xlsx"
 
-sgd_files = glob("/Users/nicholasbaro/Python/staged/data/current/*__SGD.csv")
-SGD_FILE = Path(sgd_files[0]) if sgd_files else Path("/Users/nicholasbaro/Python/staged/data/current/SGD.csv")
+sgd_files = glob(str(BASE_DIR / "data" / "current" / "*__SGD.csv"))
+SGD_FILE = Path(sgd_files[0]) if sgd_files else BASE_DIR / "data" / "current" / "SGD.csv"
 
-OUTPUT_DIR = Path("/Users/nicholasbaro/Python/staged/output/current")
+OUTPUT_DIR = BASE_DIR / "output" / "current"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_TTL = OUTPUT_DIR / "cmc_stagegate_instances.ttl"
 
@@ -37,6 +45,15 @@ OUTPUT_TTL = OUTPUT_DIR / "cmc_stagegate_instances.ttl"
 ID_MAPPING_FILE = OUTPUT_DIR / "gupri_mappings.json"
 ID_MAPPINGS = {}
 
+# Block layout of the last run (for --incremental) and the entities it changed
+STATE_FILE = OUTPUT_DIR / "cmc_stagegate_instances.state.json"
+CHANGES_FILE = OUTPUT_DIR / "cmc_stagegate_instances.changes.json"
+
+# (GUPRI cache key, fingerprint of the source fields, renderer) for one TTL block
+Block = Tuple[str, str, Callable[[], str]]
+# Separates a repeated deliverable's key from its occurrence number (cell text may contain '#')
+OCCURRENCE_SEP = "\x1f"
+
 PREFIXES = (
     "@prefix ex:    <https://w3id.org/cmc-stagegate#> .\n"
     "@prefix xsd:   <http://www.w3.org/2001/XMLSchema#> .\n"
@@ -61,6 +78,20 @@ OFFICIAL_COLS = {
     "Comments/Document reference": ["Comments/Document reference", "Comments/\nDocument reference", "251031 - added column from Synthetics .2"],
 }
 
+# Spreadsheet date formats, tried in order (US month/day before day/month)
+DATE_FORMATS = (
+    "%Y-%m-%d", "%Y/%m/%d", "%m/%d/%Y", "%m/%d/%y", "%d-%b-%Y", "%d-%b-%y",
+    "%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y", "%b %Y", "%B %Y", "%d.%m.%Y",
+)
+EXCEL_EPOCH = date(1899, 12, 30)
+NO_DATE = 0
+
+# Source columns (every header variant) a deliverable block is rendered from; fingerprinted raw
+DELIVERABLE_SOURCE_COLS = tuple(name for col in ("Value Stream", "Stage Gate", "Deliverable",
+                                                 "Explanation/Translation", "Category", "Plan date",
+                                                 "Actual date", "Comments/Document reference")
+                                for name in OFFICIAL_COLS[col])
+
 
 def load_id_mappings():
     """Load existing ID mappings for persistence across runs."""
@@ -80,6 +111,16 @@ def save_id_mappings():
         json.dump(ID_MAPPINGS, f, indent=2, sort_keys=True)
 
 
+def gupri_cache_key(entity_type: str, *key_components) -> str:
+    """Deterministic mapping key for an entity (also the GUPRI's UUIDv5 seed)."""
+    return f"{entity_type}:{':'.join(str(k) for k in key_components if k)}"
+
+
+def fingerprint(*fields: str) -> str:
+    """Short content hash of the source fields a block is rendered from."""
+    return hashlib.blake2b("\x1f".join(fields).encode("utf-8"), digest_size=8).hexdigest()
+
+
 def create_gupri(entity_type: str, *key_components, readable_hint: str = None) -> str:
     """
     Create a GUPRI (Globally Unique, Persistent, Resolvable Identifier).
@@ -93,7 +134,7 @@ def create_gupri(entity_type: str, *key_components, readable_hint: str = None) -
         GUPRI in format ex:EntityType_[readable]_UUID
     """
     # Create deterministic key from components
-    cache_key = f"{entity_type}:{':'.join(str(k) for k in key_components if k)}"
+    cache_key = gupri_cache_key(entity_type, *key_components)
     
     # Return existing mapping if available
     if cache_key in ID_MAPPINGS:
@@ -164,11 +205,62 @@ def get_value(row: dict, col_name: str) -> str:
     return ""
 
 
-def emit_stage_blocks_gupri(rows: Iterable[Dict[str, str]]) -> Tuple[str, int]:
-    """Emit stage blocks with GUPRIs."""
-    ttl_lines = []
-    seen_stages: Dict[str, bool] = {}
-    count = 0
+def parse_sheet_date(value: str) -> Optional[date]:
+    """Parse a Plan/Actual date cell (ISO, US, textual or Excel serial); None if not a date."""
+    text = " ".join(value.split())
+    if not text:
+        return None
+    if re.fullmatch(r"\d{5}(\.0+)?", text):
+        serial = int(float(text))
+        if 20000 <= serial <= 80000:
+            return EXCEL_EPOCH + timedelta(days=serial)
+        return None
+    # Drop a midnight time part from exported datetimes ("2023-01-15 00:00:00")
+    text = re.sub(r"[ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?$", "", text)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_dates(rows: List[Dict[str, str]]) -> Dict[str, array]:
+    """
+    Parse the Plan date / Actual date columns of all rows in one pass.
+
+    Returns ``plan``, ``actual`` and ``slippage`` columns aligned with ``rows``:
+    dates as proleptic ordinals (0 = missing or unparseable) and slippage as
+    actual minus planned in days (only meaningful where both dates are set).
+    Each distinct cell text is parsed once.
+    """
+    parsed: Dict[str, int] = {}
+
+    def column(name: str) -> array:
+        values = array("l")
+        for row in rows:
+            raw = get_value(row, name)
+            ordinal = parsed.get(raw)
+            if ordinal is None:
+                day = parse_sheet_date(raw)
+                ordinal = parsed[raw] = day.toordinal() if day else NO_DATE
+            values.append(ordinal)
+        return values
+
+    plan = column("Plan date")
+    actual = column("Actual date")
+    slippage = array("l", (a - p if a and p else 0 for p, a in zip(plan, actual)))
+    return {"plan": plan, "actual": actual, "slippage": slippage}
+
+
+def date_literal(ordinal: int) -> str:
+    return f'"{date.fromordinal(ordinal).isoformat()}"^^xsd:date'
+
+
+def stage_blocks(rows: Iterable[Dict[str, str]]) -> List[Block]:
+    """One block per distinct (value stream, stage), described by its first row."""
+    blocks: List[Block] = []
+    seen_stages: Set[str] = set()
 
     for row in rows:
         value_stream = get_value(row, "Value Stream")
@@ -184,55 +276,77 @@ def emit_stage_blocks_gupri(rows: Iterable[Dict[str, str]]) -> Tuple[str, int]:
         stage_key = f"{value_stream}:{stage_num}"
         if stage_key in seen_stages:
             continue
-        seen_stages[stage_key] = True
-        count += 1
-
-        # Generate GUPRIs for all related entities
-        readable_hint = f"{safe_id(value_stream)}_{safe_id(stage_num)}"
-        stage_gupri = create_gupri("Stage", value_stream, stage_num, readable_hint=readable_hint)
-        plan_gupri = create_gupri("StagePlan", value_stream, stage_num)
-        gate_gupri = create_gupri("StageGate", value_stream, stage_num)
-        spec_gupri = create_gupri("Specification", value_stream, stage_num)
-        
-        # Create legacy IDs for backwards compatibility
-        stream_id = safe_id(value_stream or "generic")
-        stage_id = safe_id(stage_num)
-        legacy_stage = create_legacy_alias("Stage", f"{stream_id}-{stage_id}")
-
-        label = stage_desc or f"Stage {stage_num}"
-
-        # Emit triples with GUPRI as primary ID
-        # Clean label for comment (single line)
-        comment_label = label.replace('\n', ' / ').replace('\r', ' ')
-        ttl_lines.append(f"\n# Stage: {comment_label}\n")
-        ttl_lines.append(f"{stage_gupri} a ex:Stage ;\n")
-        ttl_lines.append(f"    rdfs:label {escape_turtle_literal(label)} ;\n")
-        ttl_lines.append(f"    ex:hasPlan {plan_gupri} ;\n")
-        ttl_lines.append(f"    ex:hasGate {gate_gupri} ;\n")
-        ttl_lines.append(f"    ex:hasSpecification {spec_gupri} ;\n")
-        ttl_lines.append(f"    owl:sameAs {legacy_stage} .\n")
-        
-        # Add legacy ID triple for compatibility
-        ttl_lines.append(f"{legacy_stage} owl:sameAs {stage_gupri} .\n")
-        
-        # Plan
-        ttl_lines.append(f"{plan_gupri} a ex:StagePlan ;\n")
-        ttl_lines.append(f"    rdfs:label {escape_turtle_literal(f'Plan for {label}')} .\n")
-        
-        # Gate
-        ttl_lines.append(f"{gate_gupri} a ex:StageGate ;\n")
-        ttl_lines.append(f"    rdfs:label {escape_turtle_literal(f'Gate for {label}')} .\n")
+        seen_stages.add(stage_key)
+        blocks.append((gupri_cache_key("Stage", value_stream, stage_num),
+                       fingerprint(value_stream, stage_num, stage_desc),
+                       lambda row=row: render_stage(row)))
+    return blocks
 
-    return ("".join(ttl_lines), count)
 
-
-def emit_deliverable_blocks_gupri(rows: Iterable[Dict[str, str]]) -> Tuple[str, int]:
-    """Emit deliverable blocks with GUPRIs."""
+def render_stage(row: Dict[str, str]) -> str:
+    """Stage, plan and gate triples for one stage."""
     ttl_lines = []
-    count = 0
+    value_stream = get_value(row, "Value Stream")
+    stage_num = get_value(row, "Stage Gate")
+    stage_desc = get_value(row, "Stage Gate Description")
+
+    # Generate GUPRIs for all related entities
+    readable_hint = f"{safe_id(value_stream)}_{safe_id(stage_num)}"
+    stage_gupri = create_gupri("Stage", value_stream, stage_num, readable_hint=readable_hint)
+    plan_gupri = create_gupri("StagePlan", value_stream, stage_num)
+    gate_gupri = create_gupri("StageGate", value_stream, stage_num)
+    spec_gupri = create_gupri("Specification", value_stream, stage_num)
+    
+    # Create legacy IDs for backwards compatibility
+    stream_id = safe_id(value_stream or "generic")
+    stage_id = safe_id(stage_num)
+    legacy_stage = create_legacy_alias("Stage", f"{stream_id}-{stage_id}")
+
+    label = stage_desc or f"Stage {stage_num}"
+
+    # Emit triples with GUPRI as primary ID
+    # Clean label for comment (single line)
+    comment_label = label.replace('\n', ' / ').replace('\r', ' ')
+    ttl_lines.append(f"\n# Stage: {comment_label}\n")
+    ttl_lines.append(f"{stage_gupri} a ex:Stage ;\n")
+    ttl_lines.append(f"    rdfs:label {escape_turtle_literal(label)} ;\n")
+    ttl_lines.append(f"    ex:hasPlan {plan_gupri} ;\n")
+    ttl_lines.append(f"    ex:hasGate {gate_gupri} ;\n")
+    ttl_lines.append(f"    ex:hasSpecification {spec_gupri} ;\n")
+    ttl_lines.append(f"    owl:sameAs {legacy_stage} .\n")
+    
+    # Add legacy ID triple for compatibility
+    ttl_lines.append(f"{legacy_stage} owl:sameAs {stage_gupri} .\n")
+    
+    # Plan
+    ttl_lines.append(f"{plan_gupri} a ex:StagePlan ;\n")
+    ttl_lines.append(f"    rdfs:label {escape_turtle_literal(f'Plan for {label}')} .\n")
+    
+    # Gate
+    ttl_lines.append(f"{gate_gupri} a ex:StageGate ;\n")
+    ttl_lines.append(f"    rdfs:label {escape_turtle_literal(f'Gate for {label}')} .\n")
+    return "".join(ttl_lines)
+
+
+def emit_stage_blocks_gupri(rows: Iterable[Dict[str, str]]) -> Tuple[str, int]:
+    """Emit stage blocks with GUPRIs."""
+    blocks = stage_blocks(rows)
+    return ("".join(render() for _, _, render in blocks), len(blocks))
+
+
+def deliverable_blocks(rows: List[Dict[str, str]], dates: Dict[str, array]) -> List[Block]:
+    """
+    Specification blocks (once per stage) and one block per deliverable row.
+
+    Repeated deliverables within a stage share a GUPRI; their block keys get an
+    occurrence suffix (``OCCURRENCE_SEP`` + 2, 3, ...) so every key is unique.
+    """
+    blocks: List[Block] = []
     declared_specs: Set[str] = set()
+    occurrences: Dict[str, int] = {}
+    plan_col, actual_col, slip_col = dates["plan"], dates["actual"], dates["slippage"]
 
-    for row in rows:
+    for i, row in enumerate(rows):
         value_stream = get_value(row, "Value Stream")
         stage_num = get_value(row, "Stage Gate")
         deliverable = get_value(row, "Deliverable")
@@ -241,104 +355,270 @@ def emit_deliverable_blocks_gupri(rows: Iterable[Dict[str, str]]) -> Tuple[str,
             continue
             
         # Emit specification once per stage
-        spec_gupri = create_gupri("Specification", value_stream, stage_num)
         spec_key = f"{value_stream}:{stage_num}"
-        
         if spec_key not in declared_specs:
             declared_specs.add(spec_key)
             stage_desc = get_value(row, "Stage Gate Description") or f"Stage {stage_num}"
-            ttl_lines.append(f"{spec_gupri} a ex:Specification ;\n")
-            ttl_lines.append(f"    rdfs:label {escape_turtle_literal(f'Specification for {stage_desc}')} .\n")
-            count += 1
+            blocks.append((gupri_cache_key("Specification", value_stream, stage_num),
+                           fingerprint(value_stream, stage_num, stage_desc),
+                           lambda row=row: render_specification(row)))
 
         if not deliverable:
             continue
 
-        # Get additional fields
-        explanation = get_value(row, "Explanation/Translation")
-        owner_raw = get_value(row, "Owner")
-        category = get_value(row, "Category")
-        plan_date = get_value(row, "Plan date")
-        actual_date = get_value(row, "Actual date")
-        comments = get_value(row, "Comments/Document reference")
-
-        # Generate GUPRI for deliverable
-        readable_hint = safe_id(deliverable)[:30]
-        qa_gupri = create_gupri("QualityAttribute", value_stream, stage_num, deliverable, 
-                               readable_hint=readable_hint)
-        
-        # Legacy ID for compatibility
-        stream_id = safe_id(value_stream or "generic")
-        stage_id = safe_id(stage_num)
-        deliv_id = safe_id(deliverable)[:64]
-        legacy_qa = create_legacy_alias("CQA", f"{stream_id}-{stage_id}-{deliv_id}")
-
-        # Build triple
-        # Clean deliverable for comment (single line)
-        comment_deliv = deliverable.replace('\n', ' / ').replace('\r', ' ')
-        ttl_lines.append(f"\n# Deliverable: {comment_deliv[:50]}{'...' if len(comment_deliv) > 50 else ''}\n")
-        ttl_lines.append(f"{qa_gupri} a ex:QualityAttribute ;\n")
-        ttl_lines.append(f"    rdfs:label {escape_turtle_literal(deliverable)} ;\n")
-        
-        if explanation:
-            ttl_lines.append(f"    rdfs:comment {escape_turtle_literal(explanation)} ;\n")
-        if category:
-            ttl_lines.append(f"    ex:hasCategory {escape_turtle_literal(category)} ;\n")
-        if plan_date:
-            ttl_lines.append(f"    ex:plannedDate {escape_turtle_literal(plan_date)} ;\n")
-        if actual_date:
-            ttl_lines.append(f"    ex:actualDate {escape_turtle_literal(actual_date)} ;\n")
-        if comments:
-            ttl_lines.append(f"    ex:reference {escape_turtle_literal(comments)} ;\n")
-        
-        # Add legacy alias
-        ttl_lines.append(f"    owl:sameAs {legacy_qa} .\n")
-        ttl_lines.append(f"{legacy_qa} owl:sameAs {qa_gupri} .\n")
-        
-        count += 1
+        key = gupri_cache_key("QualityAttribute", value_stream, stage_num, deliverable)
+        occurrences[key] = occurrences.get(key, 0) + 1
+        if occurrences[key] > 1:
+            key = f"{key}{OCCURRENCE_SEP}{occurrences[key]}"
+        blocks.append((key, fingerprint(*(row.get(name) or "" for name in DELIVERABLE_SOURCE_COLS)),
+                       lambda row=row, i=i: render_deliverable(row, plan_col[i], actual_col[i], slip_col[i])))
+    return blocks
+
+
+def render_specification(row: Dict[str, str]) -> str:
+    value_stream = get_value(row, "Value Stream")
+    stage_num = get_value(row, "Stage Gate")
+    spec_gupri = create_gupri("Specification", value_stream, stage_num)
+    stage_desc = get_value(row, "Stage Gate Description") or f"Stage {stage_num}"
+    return (f"{spec_gupri} a ex:Specification ;\n"
+            f"    rdfs:label {escape_turtle_literal(f'Specification for {stage_desc}')} .\n")
+
+
+def render_deliverable(row: Dict[str, str], plan: int, actual: int, slippage: int) -> str:
+    """Quality attribute triples for one deliverable row (dates as ordinals, 0 = none)."""
+    ttl_lines = []
+    value_stream = get_value(row, "Value Stream")
+    stage_num = get_value(row, "Stage Gate")
+    deliverable = get_value(row, "Deliverable")
+
+    # Get additional fields
+    explanation = get_value(row, "Explanation/Translation")
+    category = get_value(row, "Category")
+    plan_date = get_value(row, "Plan date")
+    actual_date = get_value(row, "Actual date")
+    comments = get_value(row, "Comments/Document reference")
+
+    # Generate GUPRI for deliverable
+    readable_hint = safe_id(deliverable)[:30]
+    qa_gupri = create_gupri("QualityAttribute", value_stream, stage_num, deliverable, 
+                           readable_hint=readable_hint)
+    
+    # Legacy ID for compatibility
+    stream_id = safe_id(value_stream or "generic")
+    stage_id = safe_id(stage_num)
+    deliv_id = safe_id(deliverable)[:64]
+    legacy_qa = create_legacy_alias("CQA", f"{stream_id}-{stage_id}-{deliv_id}")
+
+    # Build triple
+    # Clean deliverable for comment (single line)
+    comment_deliv = deliverable.replace('\n', ' / ').replace('\r', ' ')
+    ttl_lines.append(f"\n# Deliverable: {comment_deliv[:50]}{'...' if len(comment_deliv) > 50 else ''}\n")
+    ttl_lines.append(f"{qa_gupri} a ex:QualityAttribute ;\n")
+    ttl_lines.append(f"    rdfs:label {escape_turtle_literal(deliverable)} ;\n")
+    
+    if explanation:
+        ttl_lines.append(f"    rdfs:comment {escape_turtle_literal(explanation)} ;\n")
+    if category:
+        ttl_lines.append(f"    ex:hasCategory {escape_turtle_literal(category)} ;\n")
+    if plan:
+        ttl_lines.append(f"    ex:plannedDate {date_literal(plan)} ;\n")
+    elif plan_date:
+        ttl_lines.append(f"    ex:plannedDateText {escape_turtle_literal(plan_date)} ;\n")
+    if actual:
+        ttl_lines.append(f"    ex:actualDate {date_literal(actual)} ;\n")
+    elif actual_date:
+        ttl_lines.append(f"    ex:actualDateText {escape_turtle_literal(actual_date)} ;\n")
+    if plan and actual:
+        ttl_lines.append(f'    ex:slippageDays "{slippage}"^^xsd:integer ;\n')
+    if comments:
+        ttl_lines.append(f"    ex:reference {escape_turtle_literal(comments)} ;\n")
+    
+    # Add legacy alias
+    ttl_lines.append(f"    owl:sameAs {legacy_qa} .\n")
+    ttl_lines.append(f"{legacy_qa} owl:sameAs {qa_gupri} .\n")
+    return "".join(ttl_lines)
+
 
-    return ("".join(ttl_lines), count)
+def emit_deliverable_blocks_gupri(rows: List[Dict[str, str]],
+                                  dates: Optional[Dict[str, array]] = None) -> Tuple[str, int]:
+    """Emit deliverable blocks with GUPRIs."""
+    blocks = deliverable_blocks(rows, dates if dates is not None else normalize_dates(rows))
+    return ("".join(render() for _, _, render in blocks), len(blocks))
+
+
+def generator_hash() -> str:
+    """Hash of this script; cached blocks are only reused when it is unchanged."""
+    return hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+
+def load_block_state() -> Optional[Dict]:
+    """Block layout of the previous run, if it matches the TTL on disk and this generator."""
+    if not STATE_FILE.exists() or not OUTPUT_TTL.exists():
+        return None
+    try:
+        state = json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    if state.get("generator") != generator_hash() or state.get("prefixes") != PREFIXES:
+        return None
+    return state
 
 
-def main():
-    """Main entry point."""
+def assemble(sections: Dict[str, List[Block]], old_state: Optional[Dict]) -> Tuple[str, Dict, Dict[str, int]]:
+    """
+    Build the TTL text from blocks, copying unchanged blocks from the previous output.
+
+    The file layout is ``PREFIXES, "\n", stage blocks, "\n", deliverable
+    blocks``; the state records each block's key, fingerprint and length so a
+    block's text can be sliced out of the old file without re-rendering it.
+    """
+    old_text = ""
+    old_blocks: Dict[str, Tuple[str, int, int]] = {}
+    if old_state:
+        old_text = OUTPUT_TTL.read_text(encoding="utf-8")
+        offset = len(PREFIXES) + 1
+        for name in ("stages", "deliverables"):
+            for key, fp, length in old_state["sections"][name]:
+                old_blocks[key] = (fp, offset, length)
+                offset += length
+            offset += 1 if name == "stages" else 0
+        if offset != len(old_text):  # file edited or truncated since: rebuild everything
+            old_blocks = {}
+
+    parts = [PREFIXES, "\n"]
+    state = {"generator": generator_hash(), "prefixes": PREFIXES, "sections": {}}
+    counts = {"rendered": 0, "reused": 0}
+    for name in ("stages", "deliverables"):
+        layout = []
+        for key, fp, render in sections[name]:
+            old = old_blocks.get(key)
+            if old and old[0] == fp and base_key(key) in ID_MAPPINGS:
+                text = old_text[old[1]:old[1] + old[2]]
+                counts["reused"] += 1
+            else:
+                text = render()
+                counts["rendered"] += 1
+            parts.append(text)
+            layout.append([key, fp, len(text)])
+        state["sections"][name] = layout
+        if name == "stages":
+            parts.append("\n")
+    return "".join(parts), state, counts
+
+
+def base_key(block_key: str) -> str:
+    return block_key.split(OCCURRENCE_SEP, 1)[0]
+
+
+def entity_changes(old_state: Optional[Dict], new_state: Dict) -> Dict[str, List[Dict[str, str]]]:
+    """Added, changed and removed entities between two block layouts."""
+    def fingerprints(state):
+        if not state:
+            return {}
+        return {key: fp for name in ("stages", "deliverables") for key, fp, _ in state["sections"][name]}
+
+    old, new = fingerprints(old_state), fingerprints(new_state)
+
+    def entry(key: str) -> Dict[str, str]:
+        return {"kind": key.split(":", 1)[0], "key": key, "id": ID_MAPPINGS.get(base_key(key), "")}
+
+    return {
+        "added": [entry(k) for k in new if k not in old],
+        "changed": [entry(k) for k in new if k in old and old[k] != new[k]],
+        "removed": [entry(k) for k in old if k not in new],
+    }
+
+
+def read_sgd_rows(path: Path = SGD_FILE) -> List[Dict[str, str]]:
+    """Parse the extracted SGD sheet into row dicts."""
+    with open(path, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate GUPRI-compliant stage/deliverable TTL from the SGD CSV.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Regenerate only blocks whose rows changed since the last run; reuse the rest")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None, sgd_rows: Optional[List[Dict[str, str]]] = None,
+         id_mappings: Optional[Dict[str, str]] = None):
+    """
+    Main entry point.
+
+    The in-process pipeline runner passes already parsed SGD rows and the live
+    GUPRI mapping dict; new mappings are added to that dict in place.
+    """
+    global ID_MAPPINGS
+    args = parse_args(argv)
     print(f"GUPRI-Compliant CMC Stage Gate TTL Generator")
     print(f"=" * 50)
     
     # Load existing ID mappings
-    load_id_mappings()
-    print(f"Loaded {len(ID_MAPPINGS)} existing ID mappings")
+    if id_mappings is None:
+        load_id_mappings()
+    else:
+        ID_MAPPINGS = id_mappings
+    loaded_mappings = len(ID_MAPPINGS)
+    print(f"Loaded {loaded_mappings} existing ID mappings")
     
     print(f"Input CSV: {SGD_FILE.name if SGD_FILE.exists() else 'Not found'}")
     print(f"Output: {OUTPUT_TTL}")
     print()
     
     # Read CSV
-    if not SGD_FILE.exists():
+    if sgd_rows is not None:
+        rows = sgd_rows
+    elif not SGD_FILE.exists():
         print(f"Error: {SGD_FILE} not found")
         return 1
-        
-    with open(SGD_FILE, encoding="utf-8") as f:
-        rows = list(csv.DictReader(f))
+    else:
+        rows = read_sgd_rows(SGD_FILE)
     
     # Map columns
     print(f"Using headers: {list(OFFICIAL_COLS.keys())}")
     
-    # Generate stage blocks
-    stage_ttl, stage_count = emit_stage_blocks_gupri(rows)
-    
-    # Generate deliverables
-    deliv_ttl, qa_count = emit_deliverable_blocks_gupri(rows)
-    
-    # Combine and write
-    final_ttl = PREFIXES + "\n" + stage_ttl + "\n" + deliv_ttl
-    
+    # Normalise Plan/Actual dates to xsd:date and compute slippage
+    dates = normalize_dates(rows)
+    both = sum(1 for p, a in zip(dates["plan"], dates["actual"]) if p and a)
+    unparsed = sum(1 for row, p, a in zip(rows, dates["plan"], dates["actual"])
+                   if (get_value(row, "Plan date") and not p) or (get_value(row, "Actual date") and not a))
+    print(f"Dates: {sum(1 for p in dates['plan'] if p)} planned, {sum(1 for a in dates['actual'] if a)} actual, "
+          f"{both} with slippage, {unparsed} rows with unparseable date text")
+
+    # Stage blocks, then specifications and deliverables, fingerprinted by GUPRI cache key
+    sections = {"stages": stage_blocks(rows), "deliverables": deliverable_blocks(rows, dates)}
+    stage_count, qa_count = len(sections["stages"]), len(sections["deliverables"])
+
+    old_state = load_block_state()
+    final_ttl, state, counts = assemble(sections, old_state if args.incremental else None)
+    if args.incremental:
+        print(f"Incremental: {counts['reused']} blocks reused, {counts['rendered']} regenerated"
+              + ("" if old_state else " (no usable previous state)"))
+
     with open(OUTPUT_TTL, "w", encoding="utf-8") as f:
         f.write(final_ttl)
+    STATE_FILE.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+
+    # Changed-entity list for downstream steps
+    changes = entity_changes(old_state, state)
+    CHANGES_FILE.write_text(json.dumps({
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "source": SGD_FILE.name,
+        "incremental": args.incremental,
+        "baseline": old_state is not None,
+        **changes,
+    }, indent=2), encoding="utf-8")
+    print(f"Changes: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+          f"{len(changes['removed'])} removed -> {CHANGES_FILE.name}")
     
     # Save ID mappings
-    save_id_mappings()
-    print(f"Saved {len(ID_MAPPINGS)} ID mappings to {ID_MAPPING_FILE.name}")
+    if len(ID_MAPPINGS) != loaded_mappings or not ID_MAPPING_FILE.exists():
+        save_id_mappings()
+        print(f"Saved {len(ID_MAPPINGS)} ID mappings to {ID_MAPPING_FILE.name}")
+    else:
+        print(f"ID mappings unchanged ({ID_MAPPING_FILE.name})")
     
     print(f"Wrote TTL: {OUTPUT_TTL} (stages={stage_count}, deliverables={qa_count})")
     print(f"Total GUPRIs created: {len(ID_MAPPINGS)}")
@@ -5,23 +5,28 @@ Creates instance data for pharmaceutical/biotechnology terminology.
 """
 
 import csv
+import json
+import os
 import re
 import uuid
 from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime
 
-# Paths
-BASE_DIR = Path("/Users/nicholasbaro/Python/staged")
+# Paths (STAGED_BASE_DIR overrides the project root)
+BASE_DIR = Path(os.getenv("STAGED_BASE_DIR", "/Users/nicholasbaro/Python/staged"))
 DATA_DIR = BASE_DIR / "data" / "current"
 OUTPUT_DIR = BASE_DIR / "output" / "current"
+# Category precedence and critical/regulatory term lists (editable without code changes)
+RULES_FILE = BASE_DIR / "data" / "required_ttl_files" / "lexicon_term_rules.json"
 
 # GUPRI namespace for consistent IDs
 LEXICON_NAMESPACE_UUID = uuid.UUID('b8d7e4a1-9c3f-4e2b-8a1d-6f5c3b9e7d2a')
 
-# ID mappings for persistence
-LEXICON_ID_MAPPINGS: Dict[str, str] = {}
+# ID mappings for persistence (written alongside the TTL, one entry per term)
 MAPPINGS_FILE = OUTPUT_DIR / "lexicon_gupri_mappings.json"
+# Width reserved for the header counts, which are filled in once all terms are written
+STATS_WIDTH = 12
 
 
 def safe_id(text: str) -> str:
@@ -37,18 +42,10 @@ def safe_id(text: str) -> str:
 
 def generate_lexicon_gupri(abbr: str) -> str:
     """Generate a GUPRI for a lexicon term."""
-    unique_key = f"Term:{abbr}"
-    
-    if unique_key in LEXICON_ID_MAPPINGS:
-        return LEXICON_ID_MAPPINGS[unique_key]
-    
-    # Generate deterministic UUID
-    term_uuid = uuid.uuid5(LEXICON_NAMESPACE_UUID, unique_key)
+    # Deterministic UUID, so the same abbreviation always gets the same ID
+    term_uuid = uuid.uuid5(LEXICON_NAMESPACE_UUID, f"Term:{abbr}")
     safe_abbr = safe_id(abbr)
-    gupri = f"ex:Term_{safe_abbr}_{str(term_uuid)[:8]}"
-    
-    LEXICON_ID_MAPPINGS[unique_key] = gupri
-    return gupri
+    return f"ex:Term_{safe_abbr}_{str(term_uuid)[:8]}"
 
 
 def escape_turtle_literal(value: str) -> str:
@@ -72,53 +69,77 @@ def escape_turtle_literal(value: str) -> str:
         return f'"{value}"'
 
 
+class TermRules:
+    """
+    Category rules compiled into one regex over abbreviations and one over
+    definitions, each an alternation of every pattern in precedence order.
+    A match reports the highest-precedence pattern starting at that position;
+    resuming the search one character later also finds overlapping patterns.
+    The lowest rank found wins, and the scan stops as soon as no remaining
+    pattern could beat it. Matching is case-insensitive.
+    """
+
+    def __init__(self, rules: Dict):
+        self.default = rules["default_category"]
+        self.categories = [rule["category"] for rule in rules["categories"]]
+        self.matchers = []
+        for field, key in enumerate(("abbreviation_contains", "definition_contains")):
+            ranks: Dict[str, int] = {}
+            for rank, rule in enumerate(rules["categories"]):
+                for pattern in rule.get(key, []):
+                    ranks.setdefault(pattern.lower(), rank)
+            if ranks:
+                ordered = sorted(ranks, key=lambda p: (ranks[p], -len(p)))
+                regex = re.compile("|".join(map(re.escape, ordered)))
+                self.matchers.append((field, regex, ranks, min(ranks.values())))
+        self.critical = frozenset(a.upper() for a in rules.get("critical_terms", []))
+        self.regulatory = frozenset(a.upper() for a in rules.get("regulatory_terms", []))
+
+    def categorize(self, abbr: str, definition: str) -> str:
+        best = len(self.categories)
+        texts = (abbr.lower(), definition.lower())
+        for field, regex, ranks, floor in self.matchers:
+            text, pos = texts[field], 0
+            while best > floor:
+                match = regex.search(text, pos)
+                if match is None:
+                    break
+                best = min(best, ranks[match.group()])
+                pos = match.start() + 1
+        return self.categories[best] if best < len(self.categories) else self.default
+
+
+# path -> ((mtime_ns, size) the rules were compiled from, rules)
+_TERM_RULES: Dict[Path, Tuple[Tuple[int, int], TermRules]] = {}
+
+
+def load_term_rules(path: Path = RULES_FILE) -> TermRules:
+    """
+    Rule table compiled on first use and reused until the file changes (the
+    in-process pipeline runner keeps this module loaded across runs).
+    """
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    held = _TERM_RULES.get(path)
+    if held is None or held[0] != version:
+        with open(path, encoding="utf-8") as f:
+            held = _TERM_RULES[path] = (version, TermRules(json.load(f)))
+    return held[1]
+
+
 def categorize_term(abbr: str, definition: str) -> str:
     """Categorize a term based on its abbreviation and definition."""
-    abbr_upper = abbr.upper()
-    def_lower = definition.lower()
-    
-    # Regulatory terms
-    if any(term in abbr_upper for term in ['GMP', 'GLP', 'FDA', 'EMA', 'IND', 'NDA', 'BLA', 'MAA', 'CTD', 'ICH']):
-        return "ex:TermCategory-Regulatory"
-    
-    # Quality terms
-    if any(term in abbr_upper for term in ['QA', 'QC', 'CQA', 'CPP', 'OOS', 'OOT', 'CoA', 'QBD']):
-        return "ex:TermCategory-Quality"
-    
-    # Cell & Gene Therapy terms
-    if any(term in abbr_upper for term in ['MCB', 'WCB', 'EOPCB', 'DCB', 'CAR', 'CGT', 'MVB']):
-        return "ex:TermCategory-CellGene"
-    
-    # Process/Manufacturing terms
-    if any(term in abbr_upper for term in ['DSP', 'USP', 'PPQ', 'PV', 'DOE', 'PAR', 'CPV', 'FMEA']):
-        return "ex:TermCategory-Process"
-    
-    # Clinical terms
-    if any(term in abbr_upper for term in ['FIH', 'PK', 'CTA', 'CSR', 'IDE']) or 'clinical' in def_lower:
-        return "ex:TermCategory-Clinical"
-    
-    # Analytical terms
-    if any(term in abbr_upper for term in ['AD', 'ATP', 'CMA', 'TOE']) or 'analytical' in def_lower:
-        return "ex:TermCategory-Analytical"
-    
-    # Organization terms
-    if any(term in def_lower for term in ['team', 'committee', 'council', 'department', 'organization']):
-        return "ex:TermCategory-Organization"
-    
-    # Default to Process if unclear
-    return "ex:TermCategory-Process"
+    return load_term_rules().categorize(abbr, definition)
 
 
 def is_critical_term(abbr: str) -> bool:
     """Determine if this is a critical term."""
-    critical_abbrs = {'CQA', 'CPP', 'CMA', 'FIH', 'PPQ', 'GMP', 'MCB', 'WCB'}
-    return abbr.upper() in critical_abbrs
+    return abbr.upper() in load_term_rules().critical
 
 
 def is_regulatory_term(abbr: str) -> bool:
     """Determine if this is a regulatory term."""
-    regulatory_abbrs = {'GMP', 'GLP', 'FDA', 'EMA', 'IND', 'NDA', 'BLA', 'MAA', 'CTD', 'ICH', 'CTA', 'IMPD'}
-    return abbr.upper() in regulatory_abbrs
+    return abbr.upper() in load_term_rules().regulatory
 
 
 def find_related_stage(abbr: str, definition: str) -> List[str]:
@@ -149,8 +170,20 @@ def find_related_stage(abbr: str, definition: str) -> List[str]:
     return related_stages
 
 
+def stats_header(term_count: int, triple_count: int) -> str:
+    """Header count lines, padded to a fixed width so they can be rewritten in place."""
+    return (f"#    Total terms: {term_count:<{STATS_WIDTH}}\n"
+            f"#    Total triples: {triple_count:<{STATS_WIDTH}}\n")
+
+
 def generate_lexicon_ttl():
-    """Generate TTL from Lexicon CSV."""
+    """Generate TTL from Lexicon CSV.
+
+    Terms are streamed to the output as the CSV is read, so memory does not grow
+    with the lexicon. The header reserves fixed-width count lines that are
+    rewritten once the totals are known; the file is written under a temporary
+    name and only replaces the previous output when complete.
+    """
     
     # Find the Lexicon CSV file
     csv_files = list(DATA_DIR.glob("*Lexicon.csv"))
@@ -160,109 +193,108 @@ def generate_lexicon_ttl():
     
     csv_path = csv_files[0]
     print(f"Processing: {csv_path.name}")
+    if not RULES_FILE.exists():
+        print(f"Error: Term rules not found at {RULES_FILE}")
+        raise SystemExit(1)
+    rules = load_term_rules()
+    print(f"Rules: {RULES_FILE.name} ({len(rules.categories)} categories)")
     
-    # Output file
+    # Output files (written under temporary names, renamed when complete)
     output_path = OUTPUT_DIR / "cmc_stagegate_lexicon_instances.ttl"
-    
-    # TTL header
-    ttl_lines = [
-        "@prefix ex: <https://w3id.org/cmc-stagegate#> .",
-        "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .",
-        "@prefix skos: <http://www.w3.org/2004/02/skos/core#> .",
-        "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .",
-        "@prefix dcterms: <http://purl.org/dc/terms/> .",
-        "@prefix owl: <http://www.w3.org/2002/07/owl#> .",
-        "",
-        "#################################################################",
-        "#    Lexicon Instance Data",
-        f"#    Generated from: {csv_path.name}",
-        f"#    Generated on: {datetime.now().isoformat()}",
-        "#    Total terms: Will be counted after processing",
-        "#################################################################",
-        "",
-    ]
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_output = output_path.with_name(output_path.name + ".tmp")
+    tmp_mappings = MAPPINGS_FILE.with_name(MAPPINGS_FILE.name + ".tmp")
     
     term_count = 0
     triple_count = 0
+    categories: Dict[str, int] = {}
     
-    # Read and process CSV
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    with open(csv_path, 'r', encoding='utf-8') as f, \
+            open(tmp_output, 'w', encoding='utf-8') as out, \
+            open(tmp_mappings, 'w', encoding='utf-8') as mappings:
+        # TTL header, with placeholder counts
+        out.write("@prefix ex: <https://w3id.org/cmc-stagegate#> .\n"
+                  "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n"
+                  "@prefix skos: <http://www.w3.org/2004/02/skos/core#> .\n"
+                  "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n"
+                  "@prefix dcterms: <http://purl.org/dc/terms/> .\n"
+                  "@prefix owl: <http://www.w3.org/2002/07/owl#> .\n"
+                  "\n"
+                  "#################################################################\n"
+                  "#    Lexicon Instance Data\n"
+                  f"#    Generated from: {csv_path.name}\n"
+                  f"#    Generated on: {datetime.now().isoformat()}\n")
+        stats_offset = out.tell()
+        out.write(stats_header(0, 0))
+        out.write("#################################################################\n")
+        mappings.write("{")
         
-        for row in reader:
+        for row in csv.DictReader(f):
             abbr = row.get('Abbreviation & Nomenclature', '').strip()
             definition = row.get('Definition', '').strip()
             
             if not abbr or not definition:
                 continue
             
-            term_count += 1
-            
             # Generate GUPRI
             term_id = generate_lexicon_gupri(abbr)
+            mappings.write(f"{',' if term_count else ''}\n  {json.dumps(f'Term:{abbr}')}: {json.dumps(term_id)}")
+            term_count += 1
             
             # Determine category
             category = categorize_term(abbr, definition)
-            
-            # Check if critical or regulatory
-            is_critical = is_critical_term(abbr)
-            is_regulatory = is_regulatory_term(abbr)
+            categories[category] = categories.get(category, 0) + 1
             
             # Find related stages
             related_stages = find_related_stage(abbr, definition)
             
             # Generate TTL
-            ttl_lines.append(f"### Term: {abbr}")
-            ttl_lines.append(f"{term_id} a ex:DefinedTerm ;")
-            ttl_lines.append(f"    ex:hasAbbreviation {escape_turtle_literal(abbr)} ;")
-            ttl_lines.append(f"    ex:hasDefinition {escape_turtle_literal(definition)} ;")
-            ttl_lines.append(f"    ex:hasTermCategory {category} ;")
-            ttl_lines.append(f"    skos:prefLabel {escape_turtle_literal(abbr)} ;")
-            ttl_lines.append(f"    skos:definition {escape_turtle_literal(definition)} ;")
-            ttl_lines.append(f"    skos:notation {escape_turtle_literal(abbr)} ;")
-            ttl_lines.append(f"    skos:inScheme ex:LexiconScheme ;")
-            
+            lines = [
+                "",
+                f"### Term: {abbr}",
+                f"{term_id} a ex:DefinedTerm ;",
+                f"    ex:hasAbbreviation {escape_turtle_literal(abbr)} ;",
+                f"    ex:hasDefinition {escape_turtle_literal(definition)} ;",
+                f"    ex:hasTermCategory {category} ;",
+                f"    skos:prefLabel {escape_turtle_literal(abbr)} ;",
+                f"    skos:definition {escape_turtle_literal(definition)} ;",
+                f"    skos:notation {escape_turtle_literal(abbr)} ;",
+                f"    skos:inScheme ex:LexiconScheme ;",
+            ]
             triple_count += 7
             
-            if is_critical:
-                ttl_lines.append(f"    ex:isCritical true ;")
+            # Check if critical or regulatory
+            if is_critical_term(abbr):
+                lines.append(f"    ex:isCritical true ;")
                 triple_count += 1
             
-            if is_regulatory:
-                ttl_lines.append(f"    ex:isRegulatory true ;")
+            if is_regulatory_term(abbr):
+                lines.append(f"    ex:isRegulatory true ;")
                 triple_count += 1
             
             # Add related stages
-            if related_stages:
-                for stage in related_stages:
-                    ttl_lines.append(f"    ex:usedInStage {stage} ;")
-                    triple_count += 1
+            for stage in related_stages:
+                lines.append(f"    ex:usedInStage {stage} ;")
+                triple_count += 1
             
             # Add label and close
-            ttl_lines.append(f"    rdfs:label {escape_turtle_literal(f'{abbr} - {definition[:50]}...' if len(definition) > 50 else f'{abbr} - {definition}')} .")
-            ttl_lines.append("")
+            lines.append(f"    rdfs:label {escape_turtle_literal(f'{abbr} - {definition[:50]}...' if len(definition) > 50 else f'{abbr} - {definition}')} .")
             triple_count += 1
+            out.write('\n'.join(lines) + '\n')
+        
+        mappings.write("\n}" if term_count else "}")
+        # Fill in the reserved statistics lines
+        out.seek(stats_offset)
+        out.write(stats_header(term_count, triple_count))
     
-    # Add statistics comment at the top
-    ttl_lines[11] = f"#    Total terms: {term_count}"
-    ttl_lines.insert(12, f"#    Total triples: {triple_count}")
-    
-    # Write output file
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(ttl_lines))
+    tmp_output.replace(output_path)
+    tmp_mappings.replace(MAPPINGS_FILE)
     
     print(f"✅ Generated {output_path.name}")
     print(f"   Terms: {term_count}")
     print(f"   Triples: {triple_count}")
-    print(f"   Categories: {len(set(categorize_term(abbr, '') for abbr in ['GMP', 'CQA', 'MCB', 'CDT', 'FIH', 'AD']))}")
-    
-    # Save ID mappings
-    if LEXICON_ID_MAPPINGS:
-        import json
-        with open(MAPPINGS_FILE, 'w') as f:
-            json.dump(LEXICON_ID_MAPPINGS, f, indent=2, sort_keys=True)
-        print(f"✅ Saved {len(LEXICON_ID_MAPPINGS)} ID mappings to {MAPPINGS_FILE.name}")
+    print(f"   Categories: {', '.join(f'{c} ({n})' for c, n in sorted(categories.items(), key=lambda kv: -kv[1]))}")
+    print(f"✅ Saved {term_count} ID mappings to {MAPPINGS_FILE.name}")
 
 
 if __name__ == "__main__":
@@ -10,12 +10,14 @@ Handles the actual CSV structure with columns:
 """
 
 import csv
+import os
 import re
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple
 
-# Configuration
-BASE_DIR = Path("/Users/nicholasbaro/Python/staged")
+# Configuration (STAGED_BASE_DIR overrides the project root)
+BASE_DIR = Path(os.getenv("STAGED_BASE_DIR", "/Users/nicholasbaro/Python/staged"))
 DATA_DIR = BASE_DIR / "data" / "current"
 
 # Find SME CSV file
@@ -48,6 +50,34 @@ def escape_turtle_literal(value: str) -> str:
     return value
 
 
+def functional_area_iris(functional_areas: Dict[str, Dict]) -> Dict[Tuple[str, str], str]:
+    """
+    IRI of each functional area node, keyed by ``(modality, area_name)``.
+
+    Parenthesised text is dropped from the ID unless two areas of a modality
+    would then share it ("Drug Product Development & Delivery (Drug Product)"
+    and "... (Primary Container & Device)").
+    """
+    iris = {}
+    for modality, areas in functional_areas.items():
+        ids = Counter(safe_id(area_name) for area_name in areas)
+        for area_name in areas:
+            area_id = safe_id(area_name)
+            if ids[area_id] > 1:
+                area_id = re.sub(r'[^a-z0-9]+', '-', area_name.lower()).strip('-')
+            iris[(modality, area_name)] = f"ex:FA-{modality}-{area_id}"
+    return iris
+
+
+def sme_iri(sme_name: str) -> str:
+    return f"ex:SME-{safe_id(sme_name)}"
+
+
+def assignment_iri(sme_name: str, area_iri: str, role: str) -> str:
+    """IRI of the role node linking an SME to a functional area as primary or backup."""
+    return f"ex:Assignment-{area_iri[len('ex:FA-'):]}-{safe_id(sme_name)}-{role}"
+
+
 def extract_primary_backup(name_text: str):
     """Extract primary name and backup name from text like 'Name (Backup Other)'."""
     backup_match = re.search(r'\(Backup ([^)]+)\)', name_text)
@@ -58,17 +88,17 @@ def extract_primary_backup(name_text: str):
     return name_text.strip(), None
 
 
-def generate_sme_ttl():
-    """Generate RDF triples from SME CSV data."""
-    
-    print(f"Reading SME data from: {SME_FILE}")
-    
-    if not SME_FILE.exists():
-        print(f"Error: SME file not found at {SME_FILE}")
-        return
-    
+def load_sme_assignments(sme_file: Path = SME_FILE) -> Tuple[Dict[str, Dict[str, Dict[str, List[str]]]], Dict[str, Dict]]:
+    """
+    Parse the SME sheet into functional areas and SMEs.
+
+    Returns ``(functional_areas, all_smes)``: ``{modality: {area_name:
+    {'primary': [...], 'secondary': [...]}}}`` and ``{sme_name: {modalities,
+    areas, is_primary, is_backup, specialty}}``, where areas are ``(modality,
+    area_name)`` pairs.
+    """
     # Read CSV data
-    with open(SME_FILE, 'r', encoding='utf-8') as f:
+    with open(sme_file, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         rows = list(reader)
     
@@ -98,46 +128,67 @@ def generate_sme_ttl():
             }
         
         # Extract primary and backup from person field
-        primary_name, backup_name = extract_primary_backup(person)
+        # A cell may list several people, one per line
+        for line in person.splitlines():
+            if not line.strip():
+                continue
+            primary_name, backup_name = extract_primary_backup(line)
         
-        # Process primary person
-        if primary_name:
-            if primary_name not in all_smes:
-                all_smes[primary_name] = {
-                    'modalities': set(),
-                    'areas': set(),
-                    'is_primary': set(),
-                    'is_backup': set(),
-                    'specialty': specialty if specialty else ""
-                }
+            # Process primary person
+            if primary_name:
+                if primary_name not in all_smes:
+                    all_smes[primary_name] = {
+                        'modalities': set(),
+                        'areas': set(),
+                        'is_primary': set(),
+                        'is_backup': set(),
+                        'specialty': specialty if specialty else ""
+                    }
             
-            all_smes[primary_name]['modalities'].add(value_stream)
-            if functional_area:
-                all_smes[primary_name]['areas'].add(f"{functional_area} ({value_stream})")
+                if specialty and not all_smes[primary_name]['specialty']:
+                    all_smes[primary_name]['specialty'] = specialty
+                all_smes[primary_name]['modalities'].add(value_stream)
+                if functional_area:
+                    all_smes[primary_name]['areas'].add((value_stream, functional_area))
                 
-                if contact_type.lower() == 'primary':
-                    functional_areas[value_stream][functional_area]['primary'].append(primary_name)
-                    all_smes[primary_name]['is_primary'].add(f"{functional_area} ({value_stream})")
-                elif contact_type.lower() == 'secondary':
-                    functional_areas[value_stream][functional_area]['secondary'].append(primary_name)
-                    all_smes[primary_name]['is_backup'].add(f"{functional_area} ({value_stream})")
+                    if contact_type.lower() == 'primary':
+                        functional_areas[value_stream][functional_area]['primary'].append(primary_name)
+                        all_smes[primary_name]['is_primary'].add((value_stream, functional_area))
+                    elif contact_type.lower() == 'secondary':
+                        functional_areas[value_stream][functional_area]['secondary'].append(primary_name)
+                        all_smes[primary_name]['is_backup'].add((value_stream, functional_area))
         
-        # Process backup person if present
-        if backup_name:
-            if backup_name not in all_smes:
-                all_smes[backup_name] = {
-                    'modalities': set(),
-                    'areas': set(),
-                    'is_primary': set(),
-                    'is_backup': set(),
-                    'specialty': ""
-                }
+            # Process backup person if present
+            if backup_name:
+                if backup_name not in all_smes:
+                    all_smes[backup_name] = {
+                        'modalities': set(),
+                        'areas': set(),
+                        'is_primary': set(),
+                        'is_backup': set(),
+                        'specialty': ""
+                    }
             
-            all_smes[backup_name]['modalities'].add(value_stream)
-            if functional_area:
-                all_smes[backup_name]['areas'].add(f"{functional_area} ({value_stream})")
-                all_smes[backup_name]['is_backup'].add(f"{functional_area} ({value_stream})")
-                functional_areas[value_stream][functional_area]['secondary'].append(backup_name)
+                all_smes[backup_name]['modalities'].add(value_stream)
+                if functional_area:
+                    all_smes[backup_name]['areas'].add((value_stream, functional_area))
+                    all_smes[backup_name]['is_backup'].add((value_stream, functional_area))
+                    functional_areas[value_stream][functional_area]['secondary'].append(backup_name)
+    
+    return functional_areas, all_smes
+
+
+def generate_sme_ttl():
+    """Generate RDF triples from SME CSV data."""
+    
+    print(f"Reading SME data from: {SME_FILE}")
+    
+    if not SME_FILE.exists():
+        print(f"Error: SME file not found at {SME_FILE}")
+        return
+    
+    functional_areas, all_smes = load_sme_assignments(SME_FILE)
+    fa_iris = functional_area_iris(functional_areas)
     
     # Generate TTL output
     ttl_lines = []
@@ -155,22 +206,19 @@ def generate_sme_ttl():
     for modality in sorted(functional_areas.keys()):
         ttl_lines.append(f"\n# Functional Areas - {modality}")
         for area_name in sorted(functional_areas[modality].keys()):
-            area_id = safe_id(area_name)
-            ttl_lines.append(f"\nex:FA-{modality}-{area_id} a ex:FunctionalArea ;")
+            ttl_lines.append(f"\n{fa_iris[(modality, area_name)]} a ex:FunctionalArea ;")
             ttl_lines.append(f'    rdfs:label "{escape_turtle_literal(area_name)} ({modality})" ;')
             ttl_lines.append(f'    ex:modality "{modality}" ;')
             
             # Add primary SMEs
             primary_smes = functional_areas[modality][area_name]['primary']
             for sme_name in primary_smes:
-                sme_id = safe_id(sme_name)
-                ttl_lines.append(f"    ex:hasSME ex:SME-{sme_id} ;")
+                ttl_lines.append(f"    ex:hasSME {sme_iri(sme_name)} ;")
             
             # Add secondary/backup SMEs
             secondary_smes = functional_areas[modality][area_name]['secondary']
             for sme_name in secondary_smes:
-                sme_id = safe_id(sme_name)
-                ttl_lines.append(f"    ex:hasBackupSME ex:SME-{sme_id} ;")
+                ttl_lines.append(f"    ex:hasBackupSME {sme_iri(sme_name)} ;")
             
             # Remove trailing semicolon and add period
             ttl_lines[-1] = ttl_lines[-1].replace(' ;', ' .')
@@ -179,9 +227,8 @@ def generate_sme_ttl():
     ttl_lines.append("\n\n# Subject Matter Experts")
     for sme_name in sorted(all_smes.keys()):
         sme_data = all_smes[sme_name]
-        sme_id = safe_id(sme_name)
         
-        ttl_lines.append(f"\nex:SME-{sme_id} a ex:SubjectMatterExpert ;")
+        ttl_lines.append(f"\n{sme_iri(sme_name)} a ex:SubjectMatterExpert ;")
         ttl_lines.append(f'    rdfs:label "{escape_turtle_literal(sme_name)}" ;')
         ttl_lines.append(f'    gist:name "{escape_turtle_literal(sme_name)}" ;')
         
@@ -190,23 +237,39 @@ def generate_sme_ttl():
             ttl_lines.append(f'    ex:hasExpertiseInModality "{modality}" ;')
         
         # Add functional areas
-        for area in sorted(sme_data['areas']):
-            ttl_lines.append(f'    ex:responsibleForArea "{escape_turtle_literal(area)}" ;')
+        for modality, area_name in sorted(sme_data['areas']):
+            ttl_lines.append(f"    ex:responsibleForArea {fa_iris[(modality, area_name)]} ;")
         
         # Add specialty if present
         if sme_data['specialty']:
             ttl_lines.append(f'    ex:hasSpecialty "{escape_turtle_literal(sme_data["specialty"])}" ;')
         
-        # Add primary/backup status
-        if sme_data['is_primary']:
-            ttl_lines.append(f'    ex:isPrimaryFor "{", ".join(sorted(sme_data["is_primary"]))}" ;')
-        
-        if sme_data['is_backup']:
-            ttl_lines.append(f'    ex:isBackupFor "{", ".join(sorted(sme_data["is_backup"]))}" ;')
+        # Add primary/backup status, with a role node per (area, role)
+        for modality, area_name in sorted(sme_data['is_primary']):
+            ttl_lines.append(f"    ex:isPrimaryFor {fa_iris[(modality, area_name)]} ;")
+        for modality, area_name in sorted(sme_data['is_backup']):
+            ttl_lines.append(f"    ex:isBackupFor {fa_iris[(modality, area_name)]} ;")
+        for role, key in (('primary', 'is_primary'), ('backup', 'is_backup')):
+            for modality, area_name in sorted(sme_data[key]):
+                ttl_lines.append(f"    ex:hasAssignment {assignment_iri(sme_name, fa_iris[(modality, area_name)], role)} ;")
         
         # Remove trailing semicolon and add period
         ttl_lines[-1] = ttl_lines[-1].replace(' ;', ' .')
     
+    # Generate role nodes (SME -> functional area as primary or backup)
+    ttl_lines.append("\n\n# Expert Assignments")
+    assignment_count = 0
+    for sme_name in sorted(all_smes.keys()):
+        sme_data = all_smes[sme_name]
+        for role, key, role_iri in (('primary', 'is_primary', 'ex:PrimaryRole'), ('backup', 'is_backup', 'ex:BackupRole')):
+            for modality, area_name in sorted(sme_data[key]):
+                assignment_count += 1
+                ttl_lines.append(f"\n{assignment_iri(sme_name, fa_iris[(modality, area_name)], role)} a ex:ExpertAssignment ;")
+                ttl_lines.append(f'    rdfs:label "{escape_turtle_literal(f"{sme_name} - {role} for {area_name} ({modality})")}" ;')
+                ttl_lines.append(f"    ex:assignedExpert {sme_iri(sme_name)} ;")
+                ttl_lines.append(f"    ex:forFunctionalArea {fa_iris[(modality, area_name)]} ;")
+                ttl_lines.append(f"    ex:assignmentRole {role_iri} .")
+    
     # Write output
     output_content = '\n'.join(ttl_lines)
     with open(OUTPUT_TTL, 'w', encoding='utf-8') as f:
@@ -221,6 +284,7 @@ def generate_sme_ttl():
     for modality in functional_areas:
         print(f"    - {modality}: {len(functional_areas[modality])}")
     print(f"  Subject Matter Experts: {total_smes}")
+    print(f"  Expert Assignments: {assignment_count}")
     print(f"  Output: {OUTPUT_TTL}")
     
     # Show sample data
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic SGD workbook (SGD, SME and Lexicon sheets) for scale testing.
+
+The output mirrors the real template so the ETL scripts read it unchanged:
+- SGD sheet with the two-row header (``Drop Down`` / ``Unnamed`` /
+  ``251031 - added column from Synthetics`` over the real column names), i.e.
+  the aliases listed in ``OFFICIAL_COLS`` of generate_cmc_ttl_gupri.py
+- SME sheet (Value Stream, Functional Area of Responsibility, Contact, Person, Specialty)
+- Lexicon sheet (Abbreviation & Nomenclature, Definition)
+
+Sheets are written as an .xlsx workbook and/or as per-sheet CSVs named like
+extract_xlsx.py output (``<workbook>__<sheet>.csv``). Rows are streamed, so
+millions of deliverables need constant memory; Excel's 1,048,576-row sheet
+limit applies to the .xlsx only (the CSV always holds every row).
+
+Requires no third-party packages.
+
+Usage:
+  python3 scripts/etl/generate_synthetic_sgd.py --rows 40000
+  python3 scripts/etl/generate_synthetic_sgd.py --rows 4000000 --formats csv --value-streams 6 --stages 16
+  python3 scripts/etl/generate_synthetic_sgd.py --rows 10000 --multiline-ratio 0.2 --date-density 0.8 --header-style official
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import sys
+import time
+import zipfile
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+from xml.sax.saxutils import escape
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_OUTPUT_DIR = BASE_DIR / "data" / "synthetic"
+DEFAULT_NAME = "Synthetic_SGD"
+
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_EPOCH = date(1899, 12, 30)
+
+# Row 1 of the template as pandas reads it (column aliases in OFFICIAL_COLS) ...
+TEMPLATE_HEADER = [
+    "Drop Down", "Drop Down.1", "Drop Down.2", "Drop Down.3", "Unnamed: 4", "Unnamed: 5", "Unnamed: 6",
+    "Unnamed: 7", "Drop Down.4", "Drop Down.5", "251031 - added column from Synthetics",
+    "251031 - added column from Synthetics .1", "251031 - added column from Synthetics .2",
+]
+# ... and as the raw cells in the workbook, before pandas de-duplicates them
+TEMPLATE_HEADER_CELLS = [
+    "Drop Down", "Drop Down", "Drop Down", "Drop Down", "", "", "", "", "Drop Down", "Drop Down",
+    "251031 - added column from Synthetics ", "251031 - added column from Synthetics ",
+    "251031 - added column from Synthetics ",
+]
+# Row 2: the real column names, with the line breaks the template uses
+TEMPLATE_NAMES = [
+    "Value Stream", "Stage Gate", "Stage Gate Description", "Functional Area/Subteam", "Category",
+    "Deliverable", "Explanation/\nTranslation", "Owner", "Status", "To be presented at", "Plan \ndate",
+    "Actual\ndate", "Comments/\nDocument reference",
+]
+OFFICIAL_NAMES = [
+    "Value Stream", "Stage Gate", "Stage Gate Description", "Functional Area/Subteam", "Category",
+    "Deliverable", "Explanation/Translation", "Owner", "Status", "To be presented at", "Plan date",
+    "Actual date", "Comments/Document reference",
+]
+SME_HEADER = ["Value Stream", "Functional Area of Responsibility", "Contact", "Person", "Specialty"]
+LEXICON_HEADER = ["Abbreviation & Nomenclature", "Definition"]
+
+VALUE_STREAMS = ["Protein", "CGT", "SM", "Vaccines", "Oligo", "Peptide", "ADC", "mRNA"]
+
+STAGE_DESCRIPTIONS = [
+    "Entry in ED", "Candidate Selection", "Entry into Early Development", "API Process & DP Phase 1 Development Plan",
+    "Ph1/2 mfg. Readiness and Preliminary Phase 2b/3 Sourcing Assessment", "Entry into Full Development",
+    "API Process & DP Phase 2b/3 Development Plan", "Entry into Phase 3 Clinical Studies (Full Development Decision)",
+    "Ph 3 Mfg. Readiness, Process Characterization Plan & Process Validation Strategy",
+    "Clinical Phase 3; API & DP Registration Batch Manufacture Readiness",
+    "API & DP Process Validation Review & Establishing Specification", "API & DP Process Validation Batch Readiness",
+    "Ready to File", "Ready to Launch", "Transfer of Ownership", "Post-Launch Lifecycle Review",
+]
+
+FUNCTIONAL_AREAS = [
+    "Analytical Development (AD)", "API Development", "API (Proteins)", "API (Cell & Gene)", "DP Development",
+    "Drug Product Development & Delivery (DPD&D)", "Product Quality Management (PQM)", "CMC Leadership (CMC-L)",
+    "JSC Value Chain Management (VCLs)", "JSC DS Technical Integration", "JSC DP Technical Integration",
+    "CMC Regulatory Affairs", "Combination Products  Development Process (CPDP)", "Combination Products / Devices",
+    "DP Analytics Development", "Clinical Supply Chain", "Material Sciences", "Program Management",
+    "Control Strategy Focus Group", "Dossier Development and Operations (DDO)",
+    "Environmental Health & Safety (EH&S)(SPOC)", "Primary Container",
+]
+
+CATEGORIES = [
+    "Product Design & Knowledge", "DP Analytics Development", "API Analytics Development",
+    "Process Design & Understanding", "JSC - VCT", "Miscellaneous", "Product Quality Management",
+    "Portfolio Management", "CMC Regulatory Dossier Development", "Primary Container",
+    "API process/materials Design Space",
+]
+
+OWNERS = ["AD-SI", "CSI", "SCDL", "TLIs", "DS-TI", "QE", "VCL", "CMC-L", "DP-SI", "PM"]
+
+VERBS = ["Review", "Define", "Complete", "Establish", "Confirm", "Assess", "Initiate", "Align on", "Document",
+         "Approve", "Qualify", "Verify", "Plan", "Transfer", "Finalize", "Identify", "Evaluate", "Submit"]
+OBJECTS = ["control strategy", "reference standard", "stability protocol", "process characterization plan",
+           "critical quality attributes", "specification limits", "analytical methods", "comparability assessment",
+           "batch records", "risk assessment", "container closure system", "sourcing strategy",
+           "technology transfer package", "process validation protocol", "critical reagents", "impurity profile",
+           "formulation design", "device requirements", "release testing", "supply forecast"]
+QUALIFIERS = ["for clinical supply", "with the CMO", "ahead of the gate review", "for the registration batches",
+              "per regulatory guidance", "with Quality", "for the IND/IMPD", "for commercial launch",
+              "based on development data", "for the BLA/MAA", "across sites", "in the source document"]
+GATES = ["Gate 1", "Gate 2", "Gate 3", "PDC", "DRC", "CMC-L review", "Portfolio committee"]
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn",
+               "Robin", "Drew", "Kai", "Noor", "Lee", "Sasha", "Dana", "Emery", "Rowan", "Parker"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Muller", "Rossi", "Kim", "Nguyen", "Okafor", "Silva",
+              "Novak", "Haddad", "Larsen", "Tanaka", "Dubois", "Kowalski", "Ibrahim", "Moreau", "Jansen", "Ortiz"]
+
+LEXICON_SEED = [
+    ("AD", "Analytical Development"), ("API", "Active Pharmaceutical Ingredient"),
+    ("ATP", "Analytical Target Profile"), ("BLA", "Biologics License Application"),
+    ("CMC", "Chemistry, Manufacturing and Controls"), ("CMO", "Contract Manufacturing Organization"),
+    ("CPP", "Critical Process Parameter"), ("CQA", "Critical Quality Attribute"),
+    ("DP", "Drug Product"), ("DS", "Drug Substance"), ("GMP", "Good Manufacturing Practice"),
+    ("IND", "Investigational New Drug"), ("IMPD", "Investigational Medicinal Product Dossier"),
+    ("MAA", "Marketing Authorisation Application"), ("PPQ", "Process Performance Qualification"),
+    ("QTPP", "Quality Target Product Profile"), ("SOP", "Standard Operating Procedure"),
+    ("TPP", "Target Product Profile"),
+]
+LEXICON_WORDS = ["Process", "Quality", "Analytical", "Clinical", "Control", "Stability", "Validation", "Material",
+                 "Specification", "Supply", "Product", "Method", "Risk", "Development", "Regulatory", "Batch",
+                 "Transfer", "Container", "Device", "Release", "Sterility", "Potency", "Impurity", "Reference"]
+
+
+# ============================================================================
+# Row generators
+# ============================================================================
+
+def value_stream_names(count: int) -> List[str]:
+    return [VALUE_STREAMS[i] if i < len(VALUE_STREAMS) else f"Stream-{i + 1}" for i in range(count)]
+
+
+def stage_description(value_stream: str, stage: int) -> str:
+    desc = STAGE_DESCRIPTIONS[stage % len(STAGE_DESCRIPTIONS)]
+    if stage >= len(STAGE_DESCRIPTIONS):
+        desc = f"{desc} ({stage // len(STAGE_DESCRIPTIONS) + 1})"
+    return f"{desc} ({value_stream})" if stage == 0 else desc
+
+
+def sentence(rng: random.Random, terms: Sequence[str]) -> str:
+    text = f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    if rng.random() < 0.5:
+        text += f" and {rng.choice(OBJECTS)}"
+    text += f" {rng.choice(QUALIFIERS)}"
+    if terms and rng.random() < 0.3:
+        text += f" ({rng.choice(terms)})"
+    return text
+
+
+def cell_text(rng: random.Random, terms: Sequence[str], multiline_ratio: float) -> str:
+    if rng.random() < multiline_ratio:
+        return "\n".join(f"- {sentence(rng, terms)}" for _ in range(rng.randint(2, 4)))
+    return sentence(rng, terms)
+
+
+def sgd_rows(rows: int, value_streams: List[str], stages: int, multiline_ratio: float, date_density: float,
+             terms: Sequence[str], rng: random.Random) -> Iterator[List]:
+    """Deliverable rows spread evenly over value streams and stages, grouped as in the template."""
+    groups = [(vs, stage) for vs in value_streams for stage in range(stages)]
+    per_group, extra = divmod(rows, len(groups))
+    start = date(2022, 1, 1)
+    for g, (vs, stage) in enumerate(groups):
+        desc = stage_description(vs, stage)
+        stage_plan = start + timedelta(days=stage * 120)
+        for _ in range(per_group + (1 if g < extra else 0)):
+            plan = actual = None
+            status = ""
+            if rng.random() < date_density:
+                plan = stage_plan + timedelta(days=rng.randint(-30, 90))
+                if rng.random() < 0.6:
+                    actual = plan + timedelta(days=int(rng.gauss(7, 25)))
+                    status = "Complete"
+                else:
+                    status = rng.choice(["In Progress", "Not Started"])
+            yield [
+                vs,
+                stage,
+                desc,
+                rng.choice(FUNCTIONAL_AREAS),
+                rng.choice(CATEGORIES) if rng.random() < 0.35 else "",
+                cell_text(rng, terms, multiline_ratio),
+                cell_text(rng, terms, multiline_ratio) if rng.random() < 0.4 else "",
+                rng.choice(OWNERS) if rng.random() < 0.12 else "",
+                status,
+                rng.choice(GATES) if plan and rng.random() < 0.5 else "",
+                plan,
+                actual,
+                f"SOP TV-SOP-{rng.randint(10000, 99999)}" if rng.random() < 0.05 else "",
+            ]
+
+
+def person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def sme_rows(value_streams: List[str], areas: int, backup_ratio: float, rng: random.Random) -> Iterator[List]:
+    """Primary (optionally '(Backup X)') and Secondary contacts per value stream and functional area."""
+    for vs in value_streams:
+        for area in FUNCTIONAL_AREAS[:areas]:
+            primary = person(rng)
+            if rng.random() < backup_ratio:
+                backup = person(rng)
+                yield [vs, area, "Primary", f"{primary} (Backup {backup})", ""]
+                yield [vs, area, "Secondary", backup, ""]
+            else:
+                yield [vs, area, "Primary", primary, ""]
+
+
+def lexicon_rows(count: int, rng: random.Random) -> List[List[str]]:
+    """Seed abbreviations plus generated multi-word terms, unique by abbreviation."""
+    rows = [list(pair) for pair in LEXICON_SEED[:count]]
+    seen = {abbr for abbr, _ in rows}
+    while len(rows) < count:
+        words = rng.sample(LEXICON_WORDS, rng.randint(2, 4))
+        abbr = "".join(w[0] for w in words)
+        if abbr in seen:
+            abbr = f"{abbr}{len(rows)}"
+        seen.add(abbr)
+        rows.append([abbr, " ".join(words)])
+    return rows
+
+
+# ============================================================================
+# Writers
+# ============================================================================
+
+def csv_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, date):
+        return f"{value.isoformat()} 00:00:00"  # as pandas reads an Excel date cell with dtype=str
+    return str(value)
+
+
+def xlsx_cell(value) -> str:
+    if value is None or value == "":
+        return "<c/>"
+    if isinstance(value, date):
+        return f'<c s="1"><v>{(value - EXCEL_EPOCH).days}</v></c>'
+    if isinstance(value, int):
+        return f"<c><v>{value}</v></c>"
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+
+
+class XlsxWriter:
+    """Minimal streaming .xlsx writer: inline strings, numbers and dates."""
+
+    def __init__(self, path: Path, sheet_names: List[str]):
+        self.path = path
+        self.sheet_names = sheet_names
+        self.zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+        self._write_package_parts()
+
+    def _write_package_parts(self) -> None:
+        sheets = range(1, len(self.sheet_names) + 1)
+        self.zip.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                      'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                      for i in sheets)
+            + "</Types>"))
+        self.zip.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="xl/workbook.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            "</Relationships>"))
+        self.zip.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + "".join(f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>'
+                      for i, name in zip(sheets, self.sheet_names))
+            + "</sheets></workbook>"))
+        self.zip.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(f'<Relationship Id="rId{i}" Target="worksheets/sheet{i}.xml" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+                      for i in sheets)
+            + f'<Relationship Id="rId{len(self.sheet_names) + 1}" Target="styles.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"/>'
+            "</Relationships>"))
+        # Style 1 = built-in short date format (numFmtId 14) for Plan/Actual date cells
+        self.zip.writestr("xl/styles.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+            '<borders count="1"><border/></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            "</styleSheet>"))
+
+    def open_sheet(self, index: int):
+        """Binary stream for sheet ``index`` (1-based); write rows with ``write_row``."""
+        stream = self.zip.open(f"xl/worksheets/sheet{index}.xml", "w", force_zip64=True)
+        stream.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+        return stream
+
+    @staticmethod
+    def write_row(stream, values: Sequence) -> None:
+        stream.write(("<row>" + "".join(xlsx_cell(v) for v in values) + "</row>").encode("utf-8"))
+
+    @staticmethod
+    def close_sheet(stream) -> None:
+        stream.write(b"</sheetData></worksheet>")
+        stream.close()
+
+    def close(self) -> None:
+        self.zip.close()
+
+
+def write_sheet(header_rows: List[List], rows: Iterator[List], csv_header: List[str],
+                csv_file: Optional[TextIO], xlsx: Optional[XlsxWriter], sheet_index: int) -> Tuple[int, bool]:
+    """Stream one sheet to CSV and/or xlsx; returns (data rows, truncated in xlsx)."""
+    writer = csv.writer(csv_file) if csv_file else None
+    if writer:
+        writer.writerow(csv_header)
+        for extra in header_rows[1:]:
+            writer.writerow([csv_value(v) for v in extra])
+    stream = xlsx.open_sheet(sheet_index) if xlsx else None
+    if stream:
+        for header in header_rows:
+            XlsxWriter.write_row(stream, header)
+    xlsx_rows = len(header_rows)
+    count = 0
+    truncated = False
+    for row in rows:
+        count += 1
+        if writer:
+            writer.writerow([csv_value(v) for v in row])
+        if stream:
+            if xlsx_rows < EXCEL_MAX_ROWS:
+                XlsxWriter.write_row(stream, row)
+                xlsx_rows += 1
+            else:
+                truncated = True
+    if stream:
+        XlsxWriter.close_sheet(stream)
+    return count, truncated
+
+
+# ============================================================================
+# Main
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a synthetic SGD/SME/Lexicon workbook for scale testing.")
+    parser.add_argument("--rows", type=int, default=4000, help="Deliverable rows in the SGD sheet (default: 4000)")
+    parser.add_argument("--value-streams", type=int, default=3, help="Number of value streams (default: 3)")
+    parser.add_argument("--stages", type=int, default=14, help="Stage gates per value stream, from 0 (default: 14)")
+    parser.add_argument("--multiline-ratio", type=float, default=0.04,
+                        help="Fraction of text cells spanning several lines (default: 0.04)")
+    parser.add_argument("--date-density", type=float, default=0.3,
+                        help="Fraction of deliverables with a plan date; ~60%% of those get an actual date "
+                             "(default: 0.3)")
+    parser.add_argument("--lexicon-terms", type=int, default=170, help="Lexicon entries (default: 170)")
+    parser.add_argument("--sme-areas", type=int, default=len(FUNCTIONAL_AREAS),
+                        help=f"Functional areas with SMEs per value stream (max {len(FUNCTIONAL_AREAS)})")
+    parser.add_argument("--backup-ratio", type=float, default=0.3,
+                        help="Fraction of primary SMEs listed with a backup (default: 0.3)")
+    parser.add_argument("--header-style", choices=["template", "official"], default="template",
+                        help="template: two-row header with Drop Down/Unnamed aliases (as the real workbook); "
+                             "official: one header row with the OFFICIAL_COLS names")
+    parser.add_argument("--formats", default="xlsx,csv", help="Comma-separated: xlsx, csv (default: both)")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help="Output directory (default: data/synthetic)")
+    parser.add_argument("--name", default=DEFAULT_NAME, help=f"Workbook name (default: {DEFAULT_NAME})")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    formats = {f.strip().lower() for f in args.formats.split(",") if f.strip()}
+    if not formats <= {"xlsx", "csv"} or not formats:
+        print(f"Error: --formats must be xlsx and/or csv, got {args.formats!r}", file=sys.stderr)
+        return 2
+    if args.value_streams < 1 or args.stages < 1 or args.rows < 0:
+        print("Error: --value-streams and --stages must be >= 1 and --rows >= 0", file=sys.stderr)
+        return 2
+
+    rng = random.Random(args.seed)
+    streams = value_stream_names(args.value_streams)
+    lexicon = lexicon_rows(args.lexicon_terms, rng)
+    terms = [abbr for abbr, _ in lexicon]
+    output_dir: Path = args.output_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if args.header_style == "template":
+        sgd_header_rows = [TEMPLATE_HEADER_CELLS, TEMPLATE_NAMES]
+        sgd_csv_header = TEMPLATE_HEADER
+    else:
+        sgd_header_rows = [OFFICIAL_NAMES]
+        sgd_csv_header = OFFICIAL_NAMES
+
+    print("Synthetic SGD Workbook Generator")
+    print("=" * 50)
+    print(f"Rows: {args.rows:,} | value streams: {', '.join(streams)} | stages: {args.stages} | "
+          f"multi-line: {args.multiline_ratio:.0%} | dates: {args.date_density:.0%}")
+
+    sheets = [
+        ("SGD", sgd_header_rows, sgd_csv_header,
+         sgd_rows(args.rows, streams, args.stages, args.multiline_ratio, args.date_density, terms, rng)),
+        ("SME", [SME_HEADER], SME_HEADER,
+         sme_rows(streams, min(args.sme_areas, len(FUNCTIONAL_AREAS)), args.backup_ratio, rng)),
+        ("Lexicon", [LEXICON_HEADER], LEXICON_HEADER, iter(lexicon)),
+    ]
+
+    start = time.perf_counter()
+    xlsx = XlsxWriter(output_dir / f"{args.name}.xlsx", [s[0] for s in sheets]) if "xlsx" in formats else None
+    written: List[Path] = []
+    try:
+        for index, (sheet, header_rows, csv_header, rows) in enumerate(sheets, 1):
+            csv_path = output_dir / f"{args.name}__{sheet}.csv"
+            csv_file = open(csv_path, "w", newline="", encoding="utf-8") if "csv" in formats else None
+            try:
+                count, truncated = write_sheet(header_rows, rows, csv_header, csv_file, xlsx, index)
+            finally:
+                if csv_file:
+                    csv_file.close()
+            if csv_file:
+                written.append(csv_path)
+            print(f"  {sheet:8} {count:>12,} rows")
+            if truncated:
+                print(f"  ⚠️  {sheet} exceeds Excel's {EXCEL_MAX_ROWS:,}-row limit; the .xlsx sheet is truncated "
+                      f"(the CSV has all rows)")
+    finally:
+        if xlsx:
+            xlsx.close()
+            written.insert(0, xlsx.path)
+
+    elapsed = time.perf_counter() - start
+    for path in written:
+        print(f"📄 {path} ({path.stat().st_size / 1e6:.1f} MB)")
+    print(f"✅ Generated in {elapsed:.1f}s ({args.rows / elapsed if elapsed else 0:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
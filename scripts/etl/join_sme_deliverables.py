@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Assign SMEs to deliverables by joining on functional area.
+
+The SGD sheet names each deliverable's owning "Functional Area/Subteam"; the
+SME sheet names the primary and backup contacts per "Functional Area of
+Responsibility". The two spellings differ ("Material Sciences (MS)" vs
+"Material Sciences", "Dossier Development Operations (DDO)" vs "Dossier
+Development and Operations (DDO)"), so both sides are normalised to join
+keys: case-folded words with '&' read as 'and', stopwords and plural 's'
+dropped, plus the name without its parenthesised parts and each parenthesised
+part on its own. Pairs normalisation cannot line up are listed in
+data/required_ttl_files/functional_area_aliases.json.
+
+The SME areas are the build side of a hash join keyed by (value stream, join
+key); each deliverable row probes it once (memoised per distinct area name).
+Matches are written to output/current/cmc_stagegate_sme_assignments.ttl as
+``ex:inFunctionalArea`` / ``ex:assignedSME`` / ``ex:assignedBackupSME`` on the
+deliverable GUPRI, and deliverables per SME per stage to
+output/current/sme_workload.csv.
+
+Usage:
+  python3 scripts/etl/join_sme_deliverables.py
+  python3 scripts/etl/join_sme_deliverables.py --unmatched
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generate_cmc_ttl_gupri as gupri  # noqa: E402
+import generate_sme_ttl as sme  # noqa: E402
+
+ALIASES_FILE = gupri.BASE_DIR / "data" / "required_ttl_files" / "functional_area_aliases.json"
+OUTPUT_FILE = gupri.OUTPUT_DIR / "cmc_stagegate_sme_assignments.ttl"
+WORKLOAD_FILE = gupri.OUTPUT_DIR / "sme_workload.csv"
+STOPWORDS = {"and", "of", "the", "for"}
+# Rank of each kind of join key; a key shared by two areas at the same rank is ambiguous
+FULL, BASE, PART = 0, 1, 2
+
+
+def normalise(text: str) -> str:
+    """Case-folded words, '&' as 'and', stopwords and plural 's' dropped."""
+    words = re.sub(r"[^a-z0-9]+", " ", text.casefold().replace("&", " and ")).split()
+    return " ".join(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+                    for w in words if w not in STOPWORDS)
+
+
+def area_keys(name: str) -> List[Tuple[int, str]]:
+    """(rank, join key) for a functional-area name: full name, name without parentheses, each parenthesised part."""
+    base, parts = name, []
+    while True:
+        inner = re.findall(r"\(([^()]*)\)", base)
+        if not inner:
+            break
+        parts.extend(inner)
+        base = re.sub(r"\([^()]*\)", " ", base)
+    keys: List[Tuple[int, str]] = []
+    for rank, text in [(FULL, name), (BASE, base)] + [(PART, part) for part in parts]:
+        key = normalise(text)
+        if key and all(key != k for _, k in keys):
+            keys.append((rank, key))
+    return keys
+
+
+class AreaIndex:
+    """Hash table from (value stream, join key) to the SME sheet's functional-area name."""
+
+    def __init__(self, functional_areas: Dict[str, Dict[str, Dict[str, List[str]]]],
+                 aliases: Optional[Dict[str, Dict[str, str]]] = None):
+        self.areas = functional_areas
+        self.iris = sme.functional_area_iris(functional_areas)
+        self.table: Dict[Tuple[str, str], Tuple[int, Optional[str]]] = {}
+        for stream, areas in functional_areas.items():
+            for area in areas:
+                for rank, key in area_keys(area):
+                    held = self.table.get((stream, key))
+                    if held is None or rank < held[0]:
+                        self.table[(stream, key)] = (rank, area)
+                    elif rank == held[0] and held[1] != area:
+                        self.table[(stream, key)] = (rank, None)
+        self.aliases: Dict[Tuple[str, str], str] = {}
+        for stream, mapping in (aliases or {}).items():
+            for source, target in mapping.items():
+                self.aliases[(stream, normalise(source))] = target
+        self.memo: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def probe(self, stream: str, name: str) -> Optional[str]:
+        """SME functional area for an SGD area name in ``stream``, or None."""
+        memo_key = (stream, name)
+        if memo_key not in self.memo:
+            self.memo[memo_key] = self._probe(stream, name)
+        return self.memo[memo_key]
+
+    def _probe(self, stream: str, name: str) -> Optional[str]:
+        if not name:
+            return None
+        full = normalise(name)
+        target = self.aliases.get((stream, full)) or self.aliases.get(("*", full))
+        for candidate in ([target] if target else []) + [name]:
+            for _, key in area_keys(candidate):
+                area = self.table.get((stream, key), (0, None))[1]
+                if area:
+                    return area
+        return None
+
+    def smes(self, stream: str, area: str) -> Tuple[List[str], List[str]]:
+        """(primary, backup) SME names for an area, in sheet order without repeats."""
+        contacts = self.areas[stream][area]
+        primary = list(dict.fromkeys(contacts["primary"]))
+        backup = [name for name in dict.fromkeys(contacts["secondary"]) if name not in primary]
+        return primary, backup
+
+
+def load_aliases(path: Path = ALIASES_FILE) -> Dict[str, Dict[str, str]]:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("aliases", {})
+
+
+def join_rows(rows: List[Dict[str, str]], index: AreaIndex) -> Tuple[Dict[str, Dict[str, Dict[str, None]]], Counter, Dict]:
+    """
+    Deliverable GUPRI -> {'areas', 'primary', 'backup'} IRIs, the workload
+    counter keyed by (value stream, stage, SME name, role), and join statistics.
+    """
+    assignments: Dict[str, Dict[str, Dict[str, None]]] = {}
+    workload: Counter = Counter()
+    counted = set()
+    stats = {"rows": 0, "matched": 0, "unmatched": Counter()}
+    for row in rows:
+        value_stream = gupri.get_value(row, "Value Stream")
+        stage_num = gupri.get_value(row, "Stage Gate")
+        deliverable = gupri.get_value(row, "Deliverable")
+        # Same rows generate_cmc_ttl_gupri.py turns into deliverables
+        if not stage_num or not value_stream or not deliverable:
+            continue
+        stats["rows"] += 1
+        area_name = gupri.get_value(row, "Functional Area/Subteam")
+        area = index.probe(value_stream, area_name)
+        if area is None:
+            stats["unmatched"][(value_stream, area_name)] += 1
+            continue
+        stats["matched"] += 1
+        qa_gupri = gupri.create_gupri("QualityAttribute", value_stream, stage_num, deliverable,
+                                      readable_hint=gupri.safe_id(deliverable)[:30])
+        entry = assignments.setdefault(qa_gupri, {"areas": {}, "primary": {}, "backup": {}})
+        entry["areas"][index.iris[(value_stream, area)]] = None
+        primary, backup = index.smes(value_stream, area)
+        for role, names in (("primary", primary), ("backup", backup)):
+            for name in names:
+                entry[role][sme.sme_iri(name)] = None
+                if (qa_gupri, name, role) not in counted:
+                    counted.add((qa_gupri, name, role))
+                    workload[(value_stream, stage_num, name, role)] += 1
+    return assignments, workload, stats
+
+
+def write_assignments(assignments: Dict[str, Dict[str, Dict[str, None]]], sources: List[Path], path: Path) -> int:
+    """Write the assignment triples; returns the number of SME links."""
+    count = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(gupri.PREFIXES + "\n")
+        f.write("#################################################################\n")
+        f.write("#    Deliverable -> Functional Area / SME Assignments\n")
+        f.write(f"#    Generated from: {', '.join(p.name for p in sources)}\n")
+        f.write("#################################################################\n\n")
+        for qa in sorted(assignments):
+            entry = assignments[qa]
+            props = [f"ex:inFunctionalArea {', '.join(sorted(entry['areas']))}"]
+            if entry["primary"]:
+                props.append(f"ex:assignedSME {', '.join(sorted(entry['primary']))}")
+            if entry["backup"]:
+                props.append(f"ex:assignedBackupSME {', '.join(sorted(entry['backup']))}")
+            count += len(entry["primary"]) + len(entry["backup"])
+            f.write(f"{qa} " + " ;\n    ".join(props) + " .\n")
+    return count
+
+
+def stage_sort_key(stage: str) -> Tuple[int, str]:
+    return (int(stage), "") if stage.isdigit() else (10 ** 6, stage)
+
+
+def write_workload(workload: Counter, path: Path) -> None:
+    """Deliverables per SME per stage, one row per (value stream, stage, SME, role)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Value Stream", "Stage Gate", "SME", "SME IRI", "Role", "Deliverables"])
+        for (stream, stage, name, role), count in sorted(
+                workload.items(), key=lambda kv: (kv[0][0], stage_sort_key(kv[0][1]), kv[0][2], kv[0][3])):
+            writer.writerow([stream, stage, name, sme.sme_iri(name), role, count])
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Join SGD deliverables to their functional area's SMEs.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="Output TTL file")
+    parser.add_argument("--workload", type=Path, default=WORKLOAD_FILE, help="Workload CSV (deliverables per SME per stage)")
+    parser.add_argument("--unmatched", action="store_true", help="List every functional area with no SME match")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None, sgd_rows: Optional[List[Dict[str, str]]] = None,
+         id_mappings: Optional[Dict[str, str]] = None) -> int:
+    """Entry point; the in-process pipeline runner passes parsed SGD rows and the live mappings."""
+    args = parse_args(argv)
+    print("SME Assignment Join")
+    print("=" * 50)
+    if not sme.SME_FILE.exists():
+        print(f"Error: SME file not found at {sme.SME_FILE}")
+        return 1
+    if sgd_rows is None and not gupri.SGD_FILE.exists():
+        print(f"Error: SGD file not found at {gupri.SGD_FILE}")
+        return 1
+
+    if id_mappings is None:
+        gupri.load_id_mappings()
+    else:
+        gupri.ID_MAPPINGS = id_mappings
+    start = time.perf_counter()
+    functional_areas, _ = sme.load_sme_assignments(sme.SME_FILE)
+    index = AreaIndex(functional_areas, load_aliases())
+    built = time.perf_counter()
+    rows = sgd_rows if sgd_rows is not None else gupri.read_sgd_rows(gupri.SGD_FILE)
+    assignments, workload, stats = join_rows(rows, index)
+    joined = time.perf_counter()
+    count = write_assignments(assignments, [gupri.SGD_FILE, sme.SME_FILE], args.output)
+    write_workload(workload, args.workload)
+
+    areas = sum(len(a) for a in functional_areas.values())
+    print(f"SME areas: {areas} ({len(index.table)} join keys) built in {(built - start) * 1000:.1f} ms")
+    print(f"Joined {stats['rows']} deliverable rows in {(joined - built) * 1000:.0f} ms: "
+          f"{stats['matched']} matched, {stats['rows'] - stats['matched']} unmatched "
+          f"({len(index.memo)} distinct area names probed)")
+    print(f"✅ Wrote {count} SME links for {len(assignments)} deliverables to {args.output.name}")
+    print(f"✅ Wrote {len(workload)} workload rows to {args.workload.name}")
+    per_sme = Counter()
+    for (_, _, name, role), n in workload.items():
+        if role == "primary":
+            per_sme[name] += n
+    if per_sme:
+        print("   Most deliverables (primary): " + ", ".join(f"{name} ({n})" for name, n in per_sme.most_common(5)))
+    unmatched = stats["unmatched"].most_common(None if args.unmatched else 5)
+    if unmatched:
+        print("   Unmatched areas: " + ", ".join(f"{stream}/{area or '(blank)'} ({n})" for (stream, area), n in unmatched))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Link deliverables to the lexicon terms they mention.
+
+Every lexicon abbreviation (plus each part of slash-separated entries such as
+"MoA/MoT") is compiled into one Aho-Corasick automaton (term_matcher.py). The
+Deliverable, Explanation/Translation and Comments/Document reference cells of
+every SGD row are then scanned once each, so the run is linear in the amount
+of text and does not slow down as the lexicon grows. Abbreviations match case
+sensitively and only as whole words.
+
+Each deliverable that mentions a term gets ``ex:mentionsTerm`` links to the
+term's GUPRI (the inverse of ``ex:relatedToDeliverable``), written to
+output/current/cmc_stagegate_term_links.ttl. Deliverable and term IDs are
+minted exactly as generate_cmc_ttl_gupri.py and generate_lexicon_ttl.py mint
+them, so the links join the instance data.
+
+Usage:
+  python3 scripts/etl/link_lexicon_terms.py
+  python3 scripts/etl/link_lexicon_terms.py --top 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generate_cmc_ttl_gupri as gupri  # noqa: E402
+import generate_lexicon_ttl as lexicon  # noqa: E402
+from term_matcher import AhoCorasick  # noqa: E402
+
+TEXT_FIELDS = ("Deliverable", "Explanation/Translation", "Comments/Document reference")
+OUTPUT_FILE = gupri.OUTPUT_DIR / "cmc_stagegate_term_links.ttl"
+
+
+def load_terms(path: Path) -> List[Tuple[str, str]]:
+    """(abbreviation, term GUPRI) for every lexicon row the lexicon generator emits."""
+    terms = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            abbr = (row.get("Abbreviation & Nomenclature") or "").strip()
+            if abbr and (row.get("Definition") or "").strip():
+                terms.append((abbr, lexicon.generate_lexicon_gupri(abbr)))
+    return terms
+
+
+def build_matcher(terms: List[Tuple[str, str]]) -> AhoCorasick[str]:
+    patterns = []
+    for abbr, term_id in terms:
+        patterns.append((abbr, term_id))
+        if "/" in abbr:
+            patterns.extend((part.strip(), term_id) for part in abbr.split("/") if part.strip())
+    return AhoCorasick(patterns)
+
+
+def link_rows(rows: List[Dict[str, str]], matcher: AhoCorasick[str]) -> Tuple[Dict[str, List[str]], Dict]:
+    """Deliverable GUPRI -> mentioned term GUPRIs, plus scan statistics."""
+    links: Dict[str, Dict[str, None]] = {}
+    stats = {"rows": 0, "chars": 0, "mentions": 0, "fields": Counter()}
+    for row in rows:
+        value_stream = gupri.get_value(row, "Value Stream")
+        stage_num = gupri.get_value(row, "Stage Gate")
+        deliverable = gupri.get_value(row, "Deliverable")
+        # Same rows generate_cmc_ttl_gupri.py turns into deliverables
+        if not stage_num or not value_stream or not deliverable:
+            continue
+        stats["rows"] += 1
+        found: Dict[str, None] = {}
+        for field in TEXT_FIELDS:
+            text = gupri.get_value(row, field)
+            if not text:
+                continue
+            stats["chars"] += len(text)
+            for _, _, term_id in matcher.iter_matches(text, whole_words=True):
+                stats["mentions"] += 1
+                stats["fields"][field] += 1
+                found[term_id] = None
+        if found:
+            qa_gupri = gupri.create_gupri("QualityAttribute", value_stream, stage_num, deliverable,
+                                          readable_hint=gupri.safe_id(deliverable)[:30])
+            links.setdefault(qa_gupri, {}).update(found)
+    return {qa: list(terms) for qa, terms in links.items()}, stats
+
+
+def write_links(links: Dict[str, List[str]], sources: List[Path], path: Path) -> int:
+    """Write ``ex:mentionsTerm`` triples; returns the number of links."""
+    count = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(gupri.PREFIXES + "\n")
+        f.write("#################################################################\n")
+        f.write("#    Deliverable -> Lexicon Term Links\n")
+        f.write(f"#    Generated from: {', '.join(p.name for p in sources)}\n")
+        f.write("#################################################################\n\n")
+        for qa in sorted(links):
+            terms = sorted(links[qa])
+            count += len(terms)
+            f.write(f"{qa} ex:mentionsTerm {', '.join(terms)} .\n")
+    return count
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Link deliverables to the lexicon terms they mention.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="Output TTL file")
+    parser.add_argument("--top", type=int, default=10, help="Most mentioned terms to print (default: 10)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None, sgd_rows: Optional[List[Dict[str, str]]] = None,
+         id_mappings: Optional[Dict[str, str]] = None) -> int:
+    """Entry point; the in-process pipeline runner passes parsed SGD rows and the live mappings."""
+    args = parse_args(argv)
+    print("Lexicon Term Linker")
+    print("=" * 50)
+    lexicon_files = sorted(lexicon.DATA_DIR.glob("*Lexicon.csv"))
+    if not lexicon_files:
+        print(f"Error: No Lexicon CSV file found in {lexicon.DATA_DIR}")
+        return 1
+    if sgd_rows is None and not gupri.SGD_FILE.exists():
+        print(f"Error: SGD file not found at {gupri.SGD_FILE}")
+        return 1
+
+    if id_mappings is None:
+        gupri.load_id_mappings()
+    else:
+        gupri.ID_MAPPINGS = id_mappings
+    start = time.perf_counter()
+    terms = load_terms(lexicon_files[0])
+    matcher = build_matcher(terms)
+    built = time.perf_counter()
+    rows = sgd_rows if sgd_rows is not None else gupri.read_sgd_rows(gupri.SGD_FILE)
+    links, stats = link_rows(rows, matcher)
+    scanned = time.perf_counter()
+    count = write_links(links, [gupri.SGD_FILE, lexicon_files[0]], args.output)
+
+    print(f"Terms: {len(terms)} ({matcher.size} patterns, {len(matcher.goto)} automaton states) "
+          f"built in {(built - start) * 1000:.1f} ms")
+    print(f"Scanned {stats['rows']} deliverables ({stats['chars']:,} chars) in {(scanned - built) * 1000:.0f} ms")
+    print(f"Mentions: {stats['mentions']} "
+          f"({', '.join(f'{field}: {n}' for field, n in stats['fields'].most_common())})")
+    print(f"✅ Wrote {count} ex:mentionsTerm links for {len(links)} deliverables to {args.output.name}")
+    if args.top:
+        abbr_of = {term_id: abbr for abbr, term_id in terms}
+        usage = Counter(term_id for found in links.values() for term_id in found)
+        print(f"   Unused terms: {len(terms) - len(usage)}")
+        print("   Most linked: " + ", ".join(f"{abbr_of[t]} ({n})" for t, n in usage.most_common(args.top)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Aho-Corasick multi-pattern matcher for lexicon terms.
+
+All patterns are compiled once into a single automaton (a trie with failure
+links), so scanning a text is one left-to-right pass whose cost depends on the
+length of the text and the number of matches, not on how many patterns there
+are. With ``whole_words`` a match only counts when it is not glued to a
+letter or digit on either side, which is what abbreviations need ("AD" must
+not match inside "ADVANCED").
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Generic, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class AhoCorasick(Generic[T]):
+    """Automaton over ``(pattern, value)`` pairs; a pattern may carry several values."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, T]], case_sensitive: bool = True):
+        self.case_sensitive = case_sensitive
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # Per state: (pattern length, value) for every pattern ending there, longest first
+        self.out: List[List[Tuple[int, T]]] = [[]]
+        self.size = 0
+        for pattern, value in patterns:
+            if pattern:
+                self._add(pattern if case_sensitive else pattern.lower(), value)
+        self._link()
+
+    def _add(self, pattern: str, value: T) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((len(pattern), value))
+        self.size += 1
+
+    def _link(self) -> None:
+        """Breadth-first failure links; each state inherits the outputs of its fallback."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter_matches(self, text: str, whole_words: bool = False) -> Iterator[Tuple[int, int, T]]:
+        """``(start, end, value)`` for every occurrence, in order of end position."""
+        if not self.case_sensitive:
+            text = text.lower()
+        goto, fail, out = self.goto, self.fail, self.out
+        n = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            if whole_words and end < n and text[end].isalnum():
+                continue
+            for length, value in out[state]:
+                start = end - length
+                if whole_words and start > 0 and text[start - 1].isalnum():
+                    continue
+                yield start, end, value
+
+    def find_all(self, text: str, whole_words: bool = False) -> List[T]:
+        """Distinct values found in ``text``, in order of first occurrence."""
+        seen: Dict[T, None] = {}
+        for _, _, value in self.iter_matches(text, whole_words):
+            seen.setdefault(value, None)
+        return list(seen)
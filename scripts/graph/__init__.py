@@ -0,0 +1,12 @@
+"""
+In-process RDF tooling for the CMC Stage-Gate graph.
+
+Shared by the local GraphDB stand-in server, the offline query tools and the
+analysis scripts so that none of them need a running GraphDB instance.
+
+Scripts outside this package import it by putting ``scripts/`` on
+``sys.path``::
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from graph.triple_store import TripleStore
+"""
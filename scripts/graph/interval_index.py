@@ -0,0 +1,114 @@
+"""
+Static interval index for point, range and overlap queries.
+
+Intervals are closed ``[start, end]`` integer ranges (dates as ordinals) with an
+integer payload. They are sorted by start and laid out as an implicit
+augmented binary search tree over the sorted array: the node at position ``i``
+sits at level ``k`` when the lowest ``k`` bits of ``i`` are set, and each node
+stores the largest end point in its subtree. An overlap query descends only
+into subtrees whose maximum end reaches the query start and stops at nodes
+starting after the query end, so it costs O(log n + k) for k hits. The whole
+index is four flat ``array`` columns.
+
+Open intervals (still running) can be stored with ``OPEN_END``.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+OPEN_END = date.max.toordinal()
+
+# Subtrees at or below this level are scanned linearly (at most 16 entries).
+_SCAN_LEVEL = 3
+
+
+class IntervalIndex:
+    """Immutable index over ``(start, end, payload)`` intervals."""
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, int]]):
+        rows = sorted((s, e, p) for s, e, p in intervals if e >= s)
+        self.starts = array("l", (r[0] for r in rows))
+        self.ends = array("l", (r[1] for r in rows))
+        self.payloads = array("l", (r[2] for r in rows))
+        self.max_ends = array("l", self.ends)
+        self.max_level = self._build()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build(self) -> int:
+        n = len(self.starts)
+        if n == 0:
+            return -1
+        ends, max_ends = self.ends, self.max_ends
+        last_i = (n - 1) & ~1  # last leaf
+        last = max_ends[last_i]
+        k = 1
+        while (1 << k) <= n:
+            x = 1 << (k - 1)
+            for i in range((x << 1) - 1, n, x << 2):
+                left = max_ends[i - x]
+                right = max_ends[i + x] if i + x < n else last
+                max_ends[i] = max(ends[i], left, right)
+            last_i = last_i - x if (last_i >> k) & 1 else last_i + x
+            if last_i < n and max_ends[last_i] > last:
+                last = max_ends[last_i]
+            k += 1
+        return k - 1
+
+    def _overlap_positions(self, lo: int, hi: int) -> List[int]:
+        n = len(self.starts)
+        if n == 0 or hi < lo:
+            return []
+        starts, ends, max_ends = self.starts, self.ends, self.max_ends
+        found: List[int] = []
+        stack = [(self.max_level, (1 << self.max_level) - 1, False)]
+        while stack:
+            k, x, left_done = stack.pop()
+            if k <= _SCAN_LEVEL:
+                i0 = (x >> k) << k
+                for i in range(i0, min(i0 + (1 << (k + 1)) - 1, n)):
+                    if starts[i] > hi:
+                        break
+                    if ends[i] >= lo:
+                        found.append(i)
+            elif not left_done:
+                stack.append((k, x, True))
+                y = x - (1 << (k - 1))
+                if y >= n or max_ends[y] >= lo:
+                    stack.append((k - 1, y, False))
+            elif x < n and starts[x] <= hi:
+                if ends[x] >= lo:
+                    found.append(x)
+                stack.append((k - 1, x + (1 << (k - 1)), False))
+        return found
+
+    def overlapping(self, lo: int, hi: int) -> List[int]:
+        """Payloads of intervals sharing at least one day with ``[lo, hi]``."""
+        payloads = self.payloads
+        return [payloads[i] for i in self._overlap_positions(lo, hi)]
+
+    def at(self, point: int) -> List[int]:
+        """Payloads of intervals containing ``point``."""
+        return self.overlapping(point, point)
+
+    def within(self, lo: int, hi: int) -> List[int]:
+        """Payloads of intervals lying entirely inside ``[lo, hi]``."""
+        starts, ends, payloads = self.starts, self.ends, self.payloads
+        first, last = bisect_left(starts, lo), bisect_right(starts, hi)
+        return [payloads[i] for i in range(first, last) if ends[i] <= hi]
+
+    def starting_between(self, lo: int, hi: int) -> List[int]:
+        """Payloads of intervals that begin inside ``[lo, hi]``."""
+        first, last = bisect_left(self.starts, lo), bisect_right(self.starts, hi)
+        return list(self.payloads[first:last])
+
+    def span(self) -> Optional[Tuple[int, int]]:
+        """Earliest start and latest end over all intervals."""
+        if not self.starts:
+            return None
+        return self.starts[0], max(self.ends)
@@ -0,0 +1,190 @@
+"""
+In-memory abbreviation index over the lexicon.
+
+Built from ``cmc_stagegate_lexicon_instances.ttl`` (``ex:DefinedTerm``
+resources) or straight from the extracted Lexicon CSV, and answers the lookups
+``queries/lexicon/01_lookup_abbreviation.sparql`` needs a GraphDB round trip
+for:
+
+- exact: dict keyed by the abbreviation as written
+- case-insensitive: dict keyed by the case-folded abbreviation
+- prefix: ``bisect`` over the sorted case-folded keys, O(log n + k)
+- fuzzy: symmetric-deletion index. Every key is stored under each string
+  reachable by deleting up to ``INDEXED_DISTANCE`` characters; two strings
+  within edit distance d share such a string with at most d deletions on
+  each side, so a query only generates its own deletions, collects the keys
+  filed under them and verifies those with a bounded Levenshtein distance.
+  Abbreviations are short, so this touches a handful of candidates instead
+  of every key (larger distances fall back to a length-filtered scan)
+
+``lookup`` runs one of them by mode name (``exact``, ``ci``, ``prefix``,
+``fuzzy``) or, in ``auto`` mode, tries them in that order and returns the first
+tier with hits.
+"""
+
+from __future__ import annotations
+
+import csv
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .terms import term_value
+from .turtle_parser import parse_file
+
+EX = "https://w3id.org/cmc-stagegate#"
+RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+DEFINED_TERM = f"<{EX}DefinedTerm>"
+# Edit distance covered by the deletion index
+INDEXED_DISTANCE = 2
+LOOKUP_MODES = ("auto", "exact", "ci", "prefix", "fuzzy")
+TERM_PROPERTIES = {
+    f"<{EX}hasAbbreviation>": "abbreviation",
+    f"<{EX}hasDefinition>": "definition",
+    f"<{EX}hasTermCategory>": "category",
+    f"<{EX}isCritical>": "critical",
+    f"<{EX}isRegulatory>": "regulatory",
+}
+
+
+@dataclass
+class LexiconEntry:
+    abbreviation: str
+    definition: str
+    category: str = ""
+    term_id: str = ""
+    critical: bool = False
+    regulatory: bool = False
+
+    def to_dict(self) -> Dict[str, Union[str, bool]]:
+        return dict(self.__dict__)
+
+
+def bounded_levenshtein(a: str, b: str, bound: int) -> int:
+    """Edit distance between ``a`` and ``b``, or ``bound + 1`` once it must exceed ``bound``."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1]
+
+
+def deletions(word: str, depth: int) -> Set[str]:
+    """``word`` and every string obtained from it by deleting up to ``depth`` characters."""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))} - found
+        found |= frontier
+    return found
+
+
+class LexiconIndex:
+    """Exact, case-insensitive, prefix and fuzzy abbreviation lookup."""
+
+    def __init__(self, entries: Iterable[LexiconEntry]):
+        self.entries = list(entries)
+        self.exact_map: Dict[str, List[LexiconEntry]] = {}
+        self.folded_map: Dict[str, List[LexiconEntry]] = {}
+        for entry in self.entries:
+            self.exact_map.setdefault(entry.abbreviation, []).append(entry)
+            self.folded_map.setdefault(entry.abbreviation.casefold(), []).append(entry)
+        self.sorted_keys = sorted(self.folded_map)
+        self.deletion_map: Dict[str, List[str]] = {}
+        for key in self.sorted_keys:
+            for variant in deletions(key, INDEXED_DISTANCE):
+                self.deletion_map.setdefault(variant, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def from_ttl(cls, path: Union[str, Path]) -> "LexiconIndex":
+        """Index the ``ex:DefinedTerm`` resources of a lexicon TTL file."""
+        terms: Dict[str, Dict[str, str]] = {}
+        defined = set()
+        for s, p, o in parse_file(path):
+            if p == RDF_TYPE and o == DEFINED_TERM:
+                defined.add(s)
+            elif p in TERM_PROPERTIES:
+                terms.setdefault(s, {})[TERM_PROPERTIES[p]] = term_value(o)
+        entries = []
+        for subject in sorted(defined):
+            fields = terms.get(subject, {})
+            if not fields.get("abbreviation"):
+                continue
+            category = fields.get("category", "")
+            entries.append(LexiconEntry(
+                abbreviation=fields["abbreviation"],
+                definition=fields.get("definition", ""),
+                category=category[len(EX):] if category.startswith(EX) else category,
+                term_id=f"ex:{term_value(subject)[len(EX):]}" if subject.startswith(f"<{EX}") else subject,
+                critical=fields.get("critical") == "true",
+                regulatory=fields.get("regulatory") == "true",
+            ))
+        return cls(entries)
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path]) -> "LexiconIndex":
+        """Index the extracted Lexicon sheet (abbreviations and definitions only)."""
+        entries = []
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                abbr = (row.get("Abbreviation & Nomenclature") or "").strip()
+                definition = (row.get("Definition") or "").strip()
+                if abbr and definition:
+                    entries.append(LexiconEntry(abbr, definition))
+        return cls(entries)
+
+    def exact(self, abbr: str) -> List[LexiconEntry]:
+        return list(self.exact_map.get(abbr.strip(), []))
+
+    def case_insensitive(self, abbr: str) -> List[LexiconEntry]:
+        return list(self.folded_map.get(abbr.strip().casefold(), []))
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[LexiconEntry]:
+        key = prefix.strip().casefold()
+        hits: List[LexiconEntry] = []
+        for i in range(bisect_left(self.sorted_keys, key), len(self.sorted_keys)):
+            if not self.sorted_keys[i].startswith(key) or len(hits) >= limit:
+                break
+            hits.extend(self.folded_map[self.sorted_keys[i]])
+        return hits[:limit]
+
+    def fuzzy(self, abbr: str, max_distance: int = 1, limit: int = 10) -> List[Tuple[int, LexiconEntry]]:
+        """``(edit distance, entry)`` pairs within ``max_distance``, closest first."""
+        query = abbr.strip().casefold()
+        if max_distance <= INDEXED_DISTANCE:
+            candidates = {key for variant in deletions(query, max_distance)
+                          for key in self.deletion_map.get(variant, ())}
+        else:
+            candidates = {key for key in self.sorted_keys if abs(len(key) - len(query)) <= max_distance}
+        scored = sorted((bounded_levenshtein(query, key, max_distance), key) for key in candidates)
+        hits = [(distance, entry) for distance, key in scored if distance <= max_distance
+                for entry in self.folded_map[key]]
+        return hits[:limit]
+
+    def lookup(self, query: str, mode: str = "auto", max_distance: int = 1,
+               limit: int = 10) -> Tuple[str, List[Tuple[Optional[int], LexiconEntry]]]:
+        """
+        ``(match kind, [(edit distance or None, entry)])`` for one mode of
+        ``LOOKUP_MODES``; ``auto`` returns the first tier with hits, or ``none``.
+        """
+        if mode not in LOOKUP_MODES:
+            raise ValueError(f"unknown lookup mode {mode!r}; expected one of {', '.join(LOOKUP_MODES)}")
+        tiers = {"exact": lambda: self.exact(query),
+                 "ci": lambda: self.case_insensitive(query),
+                 "prefix": lambda: self.prefix(query, limit)}
+        for kind in (tiers if mode == "auto" else [mode] if mode in tiers else []):
+            entries = tiers[kind]()
+            if entries or mode != "auto":
+                return kind, [(None, e) for e in entries[:limit]]
+        hits = self.fuzzy(query, max_distance, limit)
+        return ("fuzzy" if hits or mode == "fuzzy" else "none"), hits
@@ -0,0 +1,216 @@
+"""
+Result cache for SPARQL queries, keyed by query text and graph version.
+
+A cache key is the SHA-256 of the graph version plus the normalised query text
+(comments dropped, whitespace collapsed), so reformatting a query still hits
+and any change to the deployed data misses. Entries are the serialised SPARQL
+JSON results, kept in an in-memory LRU and optionally mirrored to a directory
+(where file mtimes drive LRU eviction), each bounded by a byte budget.
+
+The graph version of each endpoint is recorded in ``output/cache/deployments.json``
+whenever data is deployed (``record_deploy``). The version is part of every
+key, so results cached before a deploy are never served after it; they are
+left to age out of the LRU rather than cleared, since the result directory is
+shared by every endpoint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+BASE_DIR = Path(os.getenv("STAGED_BASE_DIR", Path(__file__).resolve().parents[2]))
+CACHE_DIR = BASE_DIR / "output" / "cache"
+DEFAULT_RESULT_DIR = CACHE_DIR / "query_results"
+DEPLOYMENTS_FILE = CACHE_DIR / "deployments.json"
+
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_DISK_BYTES = 128 * 1024 * 1024
+
+_QUERY_TOKEN_RE = re.compile(
+    r'(?P<iri><[^<>"{}|^`\\\s]*>)'
+    r'|(?P<string>"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\''
+    r'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\')'
+    r'|(?P<comment>#[^\n]*)'
+    r'|(?P<ws>\s+)',
+    re.DOTALL,
+)
+
+
+def normalize_query(text: str) -> str:
+    """Drop comments and collapse whitespace outside IRIs and string literals."""
+    out = []
+    pos = 0
+    for m in _QUERY_TOKEN_RE.finditer(text):
+        if m.start() > pos:
+            out.append(text[pos:m.start()])
+        if m.lastgroup in ("comment", "ws"):
+            if out and out[-1] != " ":
+                out.append(" ")
+        else:
+            out.append(m.group())
+        pos = m.end()
+    out.append(text[pos:])
+    return "".join(out).strip()
+
+
+def file_digest(paths: Iterable[Union[str, Path]]) -> str:
+    """SHA-256 over the contents of several files, in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def chain_version(previous: Optional[str], content_digest: str) -> str:
+    """Version after appending content with the given digest to a graph."""
+    return hashlib.sha256(f"{previous or ''}:{content_digest}".encode("ascii")).hexdigest()
+
+
+def _endpoint_key(url: str) -> str:
+    return url.rstrip("/").replace("://127.0.0.1", "://localhost")
+
+
+def _read_deployments() -> Dict[str, Dict]:
+    try:
+        return json.loads(DEPLOYMENTS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def deployed_version(repository_url: str) -> Optional[str]:
+    """Graph version last deployed to a repository URL, if recorded."""
+    entry = _read_deployments().get(_endpoint_key(repository_url))
+    return entry.get("version") if entry else None
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    """Write through a uniquely named temporary file, so concurrent writers never share one."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False) as tmp:
+        tmp.write(payload)
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
+
+
+def record_deploy(repository_url: str, version: str) -> None:
+    """Record a new graph version for a repository; its older cached results stop matching."""
+    deployments = _read_deployments()
+    deployments[_endpoint_key(repository_url)] = {
+        "version": version,
+        "deployed": datetime.now().isoformat(timespec="seconds"),
+    }
+    DEPLOYMENTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic(DEPLOYMENTS_FILE, json.dumps(deployments, indent=2).encode("utf-8"))
+
+
+class QueryCache:
+    """LRU cache of serialised query results within a byte budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES, directory: Optional[Union[str, Path]] = None,
+                 max_disk_bytes: int = DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query: str, graph_version: str) -> str:
+        return hashlib.sha256(f"{graph_version}\n{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = payload
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def get(self, query: str, graph_version: str) -> Optional[dict]:
+        """Cached SPARQL JSON result, or ``None`` on a miss."""
+        key = self.key(query, graph_version)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+        if payload is None and self.directory is not None:
+            path = self.directory / f"{key}.json"
+            try:
+                payload = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                payload = None
+            if payload is not None:
+                with self._lock:
+                    self._remember(key, payload)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(payload)
+
+    def put(self, query: str, graph_version: str, result: dict) -> None:
+        key = self.key(query, graph_version)
+        payload = json.dumps(result, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._remember(key, payload)
+        if self.directory is not None and len(payload) <= self.max_disk_bytes:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _write_atomic(self.directory / f"{key}.json", payload)
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        files = []
+        total = 0
+        for path in self.directory.glob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_disk_bytes:
+            return
+        for _, size, path in sorted(files):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self.directory is not None and self.directory.exists():
+            for path in self.directory.glob("*.json"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
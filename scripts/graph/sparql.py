@@ -0,0 +1,1268 @@
+"""
+SPARQL query evaluation over a ``TripleStore``.
+
+Queries are parsed by ``graph.sparql_parser`` and evaluated bottom-up over
+solution mappings (``dict`` of variable name -> encoded term). Group elements
+are evaluated left to right, passing the current solutions into the next
+element the way RDF4J's evaluation strategy does, so OPTIONAL and BIND blocks
+can see variables bound earlier in the enclosing group.
+
+Date arithmetic follows the convention used throughout ``queries/``: the
+difference between two ``xsd:date``/``xsd:dateTime`` values is the whole
+number of days between them, and adding a number to a date adds that many days.
+
+Usage::
+
+    store = TripleStore.from_files(["output/current/cmc_stagegate_all.ttl"])
+    result = run_query(store, "SELECT ?s WHERE { ?s a ex:Stage } LIMIT 5")
+    print(result.to_json())
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import math
+import re
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import ROUND_FLOOR, Decimal, InvalidOperation
+from functools import cmp_to_key
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from .sparql_parser import (
+    BGP, Aggregate, Bind, Const, Exists, Filter, Group, Minus, Op, Optional_,
+    Path, Query, SparqlError, SubSelect, TriplePattern, Union_, Values, Var,
+    parse_query,
+)
+from .terms import (
+    FALSE, INTEGER_TYPES, NUMERIC_TYPES, RDF_LANGSTRING, TRUE, XSD_BOOLEAN,
+    XSD_DATE, XSD_DATETIME, XSD_DECIMAL, XSD_DOUBLE, XSD_FLOAT, XSD_STRING,
+    from_python, is_bnode, is_iri, is_literal, literal, split_literal,
+    term_value, to_python, to_sparql_json,
+)
+
+Solution = Dict[str, str]
+
+
+class ExprError(Exception):
+    """Expression evaluation error; makes FILTERs false and BINDs unbound."""
+
+
+class QueryResult:
+    """Result of a SELECT (``vars``/``rows``) or ASK (``boolean``) query."""
+
+    def __init__(self, vars_: List[str], rows: Optional[List[Solution]] = None,
+                 boolean: Optional[bool] = None):
+        self.vars = vars_
+        self.rows = rows if rows is not None else []
+        self.boolean = boolean
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def to_json(self) -> dict:
+        """SPARQL 1.1 Query Results JSON."""
+        if self.boolean is not None:
+            return {"head": {}, "boolean": self.boolean}
+        return {
+            "head": {"vars": list(self.vars)},
+            "results": {"bindings": [
+                {v: to_sparql_json(row[v]) for v in self.vars if v in row}
+                for row in self.rows
+            ]},
+        }
+
+    def to_csv(self) -> str:
+        """SPARQL 1.1 Query Results CSV (plain values)."""
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\r\n")
+        if self.boolean is not None:
+            writer.writerow(["boolean"])
+            writer.writerow(["true" if self.boolean else "false"])
+            return buf.getvalue()
+        writer.writerow(self.vars)
+        for row in self.rows:
+            writer.writerow([term_value(row[v]) if v in row else "" for v in self.vars])
+        return buf.getvalue()
+
+
+class Context:
+    """Per-execution state shared by all operators."""
+
+    def __init__(self, store, now: Optional[datetime] = None):
+        self.store = store
+        self.now = now or datetime.now().replace(microsecond=0)
+        self.group: Optional[List[Solution]] = None
+        self.agg_cache: Dict[int, str] = {}
+        self.subselect_cache: Dict[int, List[Solution]] = {}
+        self.plan_cache: Dict[Tuple[int, frozenset], list] = {}
+        self.encoded_bgps: Dict[int, Optional[list]] = {}
+        self._bnodes = 0
+
+    def new_bnode(self) -> str:
+        self._bnodes += 1
+        return f"_:q{self._bnodes}"
+
+
+# ============================================================ value helpers
+def _literal_value(term: str):
+    if term is None or not is_literal(term):
+        raise ExprError("Not a literal")
+    try:
+        return to_python(term)
+    except ValueError as exc:
+        raise ExprError(str(exc))
+
+
+def _category(value) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float, Decimal)):
+        return "num"
+    if isinstance(value, datetime):
+        return "datetime"
+    if isinstance(value, date):
+        return "date"
+    return "str"
+
+
+def _naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        return value.replace(tzinfo=None) - (value.utcoffset() or timedelta(0))
+    return value
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return _naive(value)
+    return datetime(value.year, value.month, value.day)
+
+
+def _comparable(term: str):
+    """Value and category of a literal for ordering comparisons."""
+    value = _literal_value(term)
+    cat = _category(value)
+    if cat == "str":
+        _, datatype, lang = split_literal(term)
+        if datatype not in (XSD_STRING, RDF_LANGSTRING):
+            raise ExprError(f"Cannot compare values of type {datatype}")
+        return value, cat
+    if cat in ("date", "datetime"):
+        return _as_datetime(value), "temporal"
+    return value, cat
+
+
+def compare_values(a: str, b: str) -> int:
+    """Compare two literals by value; raises ``ExprError`` if incomparable."""
+    va, ca = _comparable(a)
+    vb, cb = _comparable(b)
+    if ca != cb:
+        raise ExprError("Incomparable values")
+    if ca == "num" and (isinstance(va, float) or isinstance(vb, float)):
+        va, vb = float(va), float(vb)
+    return (va > vb) - (va < vb)
+
+
+def terms_equal(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if is_literal(a) and is_literal(b):
+        try:
+            return compare_values(a, b) == 0
+        except ExprError:
+            return False
+    return False
+
+
+def ebv(term: str) -> bool:
+    """Effective boolean value."""
+    if term is None or not is_literal(term):
+        raise ExprError("No effective boolean value")
+    lexical, datatype, _ = split_literal(term)
+    if datatype == XSD_BOOLEAN:
+        return lexical.strip() in ("true", "1")
+    if datatype in NUMERIC_TYPES:
+        try:
+            value = to_python(term)
+        except ValueError:
+            return False
+        return bool(value) and not (isinstance(value, float) and math.isnan(value))
+    if datatype in (XSD_STRING, RDF_LANGSTRING):
+        return lexical != ""
+    raise ExprError(f"No effective boolean value for {datatype}")
+
+
+def _numeric(term: str):
+    value = _literal_value(term)
+    if _category(value) != "num":
+        raise ExprError("Not a number")
+    return value
+
+
+def _promote(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return float(a), float(b)
+    if isinstance(a, Decimal) or isinstance(b, Decimal):
+        return Decimal(a), Decimal(b)
+    return a, b
+
+
+def _arith(op: str, a: str, b: str) -> str:
+    va = _literal_value(a)
+    vb = _literal_value(b)
+    ca, cb = _category(va), _category(vb)
+    if ca in ("date", "datetime") or cb in ("date", "datetime"):
+        return _temporal_arith(op, va, ca, vb, cb)
+    if ca != "num" or cb != "num":
+        raise ExprError("Arithmetic on non-numeric values")
+    va, vb = _promote(va, vb)
+    if op == "+":
+        return from_python(va + vb)
+    if op == "-":
+        return from_python(va - vb)
+    if op == "*":
+        return from_python(va * vb)
+    if isinstance(va, float):
+        if vb == 0:
+            return from_python(math.copysign(math.inf, va) if va else math.nan)
+        return from_python(va / vb)
+    if vb == 0:
+        raise ExprError("Division by zero")
+    try:
+        return from_python(Decimal(va) / Decimal(vb))
+    except InvalidOperation as exc:
+        raise ExprError(str(exc))
+
+
+def _temporal_arith(op: str, va, ca: str, vb, cb: str) -> str:
+    temporal = ("date", "datetime")
+    if op == "-" and ca in temporal and cb in temporal:
+        return from_python((_as_datetime(va) - _as_datetime(vb)).days)
+    if op in ("+", "-") and ca in temporal and cb == "num":
+        days = float(vb) if op == "+" else -float(vb)
+        if ca == "date":
+            return from_python(va + timedelta(days=round(days)))
+        return from_python(_naive(va) + timedelta(days=days))
+    if op == "+" and ca == "num" and cb in temporal:
+        return _temporal_arith("+", vb, cb, va, ca)
+    raise ExprError("Unsupported date arithmetic")
+
+
+def _string_arg(term: str) -> Tuple[str, Optional[str]]:
+    if term is None or not is_literal(term):
+        raise ExprError("Expected a string literal")
+    lexical, datatype, lang = split_literal(term)
+    if datatype not in (XSD_STRING, RDF_LANGSTRING):
+        raise ExprError("Expected a string literal")
+    return lexical, lang
+
+
+def _string_result(value: str, lang: Optional[str]) -> str:
+    return literal(value, lang=lang)
+
+
+def _regex_flags(flags: str) -> int:
+    result = 0
+    for flag in flags:
+        if flag == "i":
+            result |= re.IGNORECASE
+        elif flag == "s":
+            result |= re.DOTALL
+        elif flag == "m":
+            result |= re.MULTILINE
+        elif flag == "x":
+            result |= re.VERBOSE
+        elif flag != "q":
+            raise ExprError(f"Unsupported regex flag {flag!r}")
+    return result
+
+
+_REGEX_CACHE: Dict[Tuple[str, int], "re.Pattern"] = {}
+
+
+def _compile(pattern: str, flags: int) -> "re.Pattern":
+    key = (pattern, flags)
+    compiled = _REGEX_CACHE.get(key)
+    if compiled is None:
+        try:
+            compiled = _REGEX_CACHE[key] = re.compile(pattern, flags)
+        except re.error as exc:
+            raise ExprError(f"Invalid regex: {exc}")
+    return compiled
+
+
+def _xpath_replacement(template: str):
+    """Translate an XPath replacement string (``$1``, ``\\$``) to a function."""
+    parts: list = []
+    buf = []
+    i = 0
+    while i < len(template):
+        ch = template[i]
+        if ch == "\\" and i + 1 < len(template) and template[i + 1] in "\\$":
+            buf.append(template[i + 1])
+            i += 2
+            continue
+        if ch == "$":
+            m = re.match(r"\d+", template[i + 1:])
+            if not m:
+                raise ExprError("Invalid replacement string")
+            if buf:
+                parts.append("".join(buf))
+                buf = []
+            parts.append(int(m.group(0)))
+            i += 1 + len(m.group(0))
+            continue
+        buf.append(ch)
+        i += 1
+    if buf:
+        parts.append("".join(buf))
+
+    def _expand(match: re.Match) -> str:
+        return "".join(p if isinstance(p, str) else (match.group(p) or "") for p in parts)
+
+    return _expand
+
+
+# ================================================================ functions
+def _cast(datatype: str, term: str) -> str:
+    if term is None:
+        raise ExprError("Cast of unbound value")
+    if datatype == XSD_STRING:
+        return literal(term_value(term))
+    if not is_literal(term):
+        raise ExprError("Cannot cast an IRI or blank node")
+    lexical, source_type, _ = split_literal(term)
+    lexical = lexical.strip()
+    try:
+        if datatype in INTEGER_TYPES:
+            if source_type in NUMERIC_TYPES:
+                return literal(str(int(to_python(term))), datatype)
+            if source_type == XSD_BOOLEAN:
+                return literal("1" if ebv(term) else "0", datatype)
+            return literal(str(int(lexical)), datatype)
+        if datatype == XSD_DECIMAL:
+            if source_type == XSD_BOOLEAN:
+                return literal("1.0" if ebv(term) else "0.0", XSD_DECIMAL)
+            value = Decimal(str(to_python(term))) if source_type in NUMERIC_TYPES else Decimal(lexical)
+            if not value.is_finite():
+                raise ExprError("Cannot cast non-finite value to xsd:decimal")
+            return from_python(value)
+        if datatype in (XSD_DOUBLE, XSD_FLOAT):
+            if source_type == XSD_BOOLEAN:
+                return literal("1.0E0" if ebv(term) else "0.0E0", datatype)
+            return literal(repr(float(lexical if source_type not in NUMERIC_TYPES else to_python(term))), datatype)
+        if datatype == XSD_BOOLEAN:
+            if source_type in NUMERIC_TYPES:
+                return TRUE if ebv(term) else FALSE
+            if lexical in ("true", "1"):
+                return TRUE
+            if lexical in ("false", "0"):
+                return FALSE
+            raise ExprError(f"Cannot cast {lexical!r} to xsd:boolean")
+        if datatype == XSD_DATE:
+            value = to_python(term) if source_type in (XSD_DATE, XSD_DATETIME) else None
+            if isinstance(value, datetime):
+                return from_python(value.date())
+            if isinstance(value, date):
+                return term
+            return from_python(date.fromisoformat(lexical[:10]))
+        if datatype == XSD_DATETIME:
+            if source_type == XSD_DATE:
+                return from_python(_as_datetime(to_python(term)))
+            if source_type == XSD_DATETIME:
+                return term
+            return from_python(datetime.fromisoformat(lexical.replace("Z", "+00:00")))
+    except (ValueError, InvalidOperation, ArithmeticError) as exc:
+        raise ExprError(f"Invalid cast: {exc}")
+    raise ExprError(f"Unsupported cast to {datatype}")
+
+
+CASTABLE = {XSD_STRING, XSD_DECIMAL, XSD_DOUBLE, XSD_FLOAT, XSD_BOOLEAN,
+            XSD_DATE, XSD_DATETIME} | INTEGER_TYPES
+
+
+def _call(name: str, args: List[str], ctx: Context) -> str:
+    if name == "STR":
+        if is_bnode(args[0]):
+            raise ExprError("STR of blank node")
+        return literal(term_value(args[0]))
+    if name == "LANG":
+        if not is_literal(args[0]):
+            raise ExprError("LANG of non-literal")
+        return literal(split_literal(args[0])[2] or "")
+    if name == "DATATYPE":
+        if not is_literal(args[0]):
+            raise ExprError("DATATYPE of non-literal")
+        return f"<{split_literal(args[0])[1]}>"
+    if name in ("IRI", "URI"):
+        if is_iri(args[0]):
+            return args[0]
+        return f"<{_string_arg(args[0])[0]}>"
+    if name == "BNODE":
+        return ctx.new_bnode()
+    if name == "STRLEN":
+        return from_python(len(_string_arg(args[0])[0]))
+    if name in ("UCASE", "LCASE"):
+        value, lang = _string_arg(args[0])
+        return _string_result(value.upper() if name == "UCASE" else value.lower(), lang)
+    if name in ("CONTAINS", "STRSTARTS", "STRENDS", "STRBEFORE", "STRAFTER"):
+        a, lang_a = _string_arg(args[0])
+        b, lang_b = _string_arg(args[1])
+        if lang_b and lang_a != lang_b:
+            raise ExprError("Incompatible language tags")
+        if name == "CONTAINS":
+            return TRUE if b in a else FALSE
+        if name == "STRSTARTS":
+            return TRUE if a.startswith(b) else FALSE
+        if name == "STRENDS":
+            return TRUE if a.endswith(b) else FALSE
+        idx = a.find(b)
+        if idx < 0:
+            return literal("")
+        if name == "STRBEFORE":
+            return _string_result(a[:idx], lang_a)
+        return _string_result(a[idx + len(b):], lang_a)
+    if name == "CONCAT":
+        parts = [_string_arg(a) for a in args]
+        langs = {lang for _, lang in parts}
+        lang = langs.pop() if len(langs) == 1 else None
+        return _string_result("".join(v for v, _ in parts), lang)
+    if name == "SUBSTR":
+        value, lang = _string_arg(args[0])
+        start = round(float(_numeric(args[1])))
+        if len(args) > 2:
+            length = round(float(_numeric(args[2])))
+            begin = max(start, 1)
+            end = start + length
+            return _string_result(value[begin - 1:max(end - 1, begin - 1)], lang)
+        return _string_result(value[max(start, 1) - 1:], lang)
+    if name == "ENCODE_FOR_URI":
+        return literal(quote(_string_arg(args[0])[0], safe=""))
+    if name == "REGEX":
+        text = _string_arg(args[0])[0]
+        flags = _regex_flags(_string_arg(args[2])[0]) if len(args) > 2 else 0
+        return TRUE if _compile(_string_arg(args[1])[0], flags).search(text) else FALSE
+    if name == "REPLACE":
+        text, lang = _string_arg(args[0])
+        flags = _regex_flags(_string_arg(args[3])[0]) if len(args) > 3 else 0
+        pattern = _compile(_string_arg(args[1])[0], flags)
+        return _string_result(pattern.sub(_xpath_replacement(_string_arg(args[2])[0]), text), lang)
+    if name == "ABS":
+        return from_python(abs(_numeric(args[0])))
+    if name in ("CEIL", "FLOOR", "ROUND"):
+        value = _numeric(args[0])
+        if isinstance(value, int):
+            return args[0]
+        if isinstance(value, Decimal):
+            if name == "ROUND":
+                value = value + Decimal("0.5")
+            rounding = "ROUND_CEILING" if name == "CEIL" else ROUND_FLOOR
+            return from_python(value.to_integral_value(rounding=rounding))
+        if math.isnan(value) or math.isinf(value):
+            return args[0]
+        fn = {"CEIL": math.ceil, "FLOOR": math.floor, "ROUND": lambda v: math.floor(v + 0.5)}[name]
+        return from_python(float(fn(value)))
+    if name == "RAND":
+        import random
+        return from_python(random.random())
+    if name == "NOW":
+        return from_python(ctx.now)
+    if name in ("YEAR", "MONTH", "DAY", "HOURS", "MINUTES", "SECONDS"):
+        value = _literal_value(args[0])
+        if not isinstance(value, date):
+            raise ExprError(f"{name} expects a date or dateTime")
+        if name in ("YEAR", "MONTH", "DAY"):
+            return from_python(getattr(value, name.lower()))
+        if not isinstance(value, datetime):
+            raise ExprError(f"{name} expects a dateTime")
+        if name == "SECONDS":
+            return from_python(Decimal(value.second) + Decimal(value.microsecond) / Decimal(1000000))
+        return from_python(value.hour if name == "HOURS" else value.minute)
+    if name in ("UUID", "STRUUID"):
+        value = str(uuid.uuid4())
+        return f"<urn:uuid:{value}>" if name == "UUID" else literal(value)
+    if name in ("MD5", "SHA1", "SHA256"):
+        digest = getattr(hashlib, name.lower())(_string_arg(args[0])[0].encode("utf-8"))
+        return literal(digest.hexdigest())
+    if name == "STRLANG":
+        return literal(_string_arg(args[0])[0], lang=_string_arg(args[1])[0])
+    if name == "STRDT":
+        if not is_iri(args[1]):
+            raise ExprError("STRDT expects a datatype IRI")
+        return literal(_string_arg(args[0])[0], args[1][1:-1])
+    if name == "SAMETERM":
+        return TRUE if args[0] == args[1] else FALSE
+    if name in ("ISIRI", "ISURI"):
+        return TRUE if is_iri(args[0]) else FALSE
+    if name == "ISBLANK":
+        return TRUE if is_bnode(args[0]) else FALSE
+    if name == "ISLITERAL":
+        return TRUE if is_literal(args[0]) else FALSE
+    if name == "ISNUMERIC":
+        if not is_literal(args[0]):
+            return FALSE
+        try:
+            to_python(args[0])
+        except ValueError:
+            return FALSE
+        return TRUE if split_literal(args[0])[1] in NUMERIC_TYPES else FALSE
+    if name == "LANGMATCHES":
+        tag = _string_arg(args[0])[0].lower()
+        rng = _string_arg(args[1])[0].lower()
+        if rng == "*":
+            return TRUE if tag else FALSE
+        return TRUE if tag == rng or tag.startswith(rng + "-") else FALSE
+    if name == "TZ":
+        lexical = term_value(args[0])
+        m = re.search(r"(Z|[+-]\d\d:\d\d)$", lexical)
+        return literal(m.group(1) if m else "")
+    if name.startswith("<"):
+        datatype = name[1:-1]
+        if datatype in CASTABLE:
+            if len(args) != 1:
+                raise ExprError("Casts take one argument")
+            return _cast(datatype, args[0])
+        raise ExprError(f"Unknown function {name}")
+    raise ExprError(f"Unsupported function {name}")
+
+
+# ============================================================== expressions
+def eval_expr(expr, sol: Solution, ctx: Context) -> str:
+    """Evaluate an expression to a term; raises ``ExprError`` on failure."""
+    if isinstance(expr, Var):
+        try:
+            return sol[expr.name]
+        except KeyError:
+            raise ExprError(f"Unbound variable ?{expr.name}")
+    if isinstance(expr, Const):
+        return expr.term
+    if isinstance(expr, Aggregate):
+        return _eval_aggregate(expr, ctx)
+    if isinstance(expr, Exists):
+        found = next(iter(_eval_group(expr.group, [sol], ctx)), None) is not None
+        return TRUE if found != expr.negated else FALSE
+    name = expr.name
+    args = expr.args
+    if name == "||":
+        error = None
+        for arg in args:
+            try:
+                if ebv(eval_expr(arg, sol, ctx)):
+                    return TRUE
+            except ExprError as exc:
+                error = exc
+        if error:
+            raise error
+        return FALSE
+    if name == "&&":
+        error = None
+        for arg in args:
+            try:
+                if not ebv(eval_expr(arg, sol, ctx)):
+                    return FALSE
+            except ExprError as exc:
+                error = exc
+        if error:
+            raise error
+        return TRUE
+    if name == "!":
+        return FALSE if ebv(eval_expr(args[0], sol, ctx)) else TRUE
+    if name == "BOUND":
+        return TRUE if args[0].name in sol else FALSE
+    if name == "IF":
+        cond = ebv(eval_expr(args[0], sol, ctx))
+        return eval_expr(args[1] if cond else args[2], sol, ctx)
+    if name == "COALESCE":
+        for arg in args:
+            try:
+                return eval_expr(arg, sol, ctx)
+            except ExprError:
+                continue
+        raise ExprError("COALESCE: no bound argument")
+    if name in ("IN", "NOT IN"):
+        left = eval_expr(args[0], sol, ctx)
+        error = None
+        for arg in args[1:]:
+            try:
+                if terms_equal(left, eval_expr(arg, sol, ctx)):
+                    return FALSE if name == "NOT IN" else TRUE
+            except ExprError as exc:
+                error = exc
+        if error:
+            raise error
+        return TRUE if name == "NOT IN" else FALSE
+    values = [eval_expr(a, sol, ctx) for a in args]
+    if name in ("=", "!="):
+        a, b = values
+        equal = a == b
+        if not equal and is_literal(a) and is_literal(b):
+            try:
+                equal = compare_values(a, b) == 0
+            except ExprError:
+                if split_literal(a)[1] == split_literal(b)[1]:
+                    raise
+                equal = False
+        return TRUE if equal == (name == "=") else FALSE
+    if name in ("<", ">", "<=", ">="):
+        cmp = compare_values(values[0], values[1])
+        result = {"<": cmp < 0, ">": cmp > 0, "<=": cmp <= 0, ">=": cmp >= 0}[name]
+        return TRUE if result else FALSE
+    if name in ("+", "-", "*", "/"):
+        return _arith(name, values[0], values[1])
+    if name == "NEG":
+        return from_python(-_numeric(values[0]))
+    return _call(name, values, ctx)
+
+
+def _eval_or_none(expr, sol: Solution, ctx: Context) -> Optional[str]:
+    try:
+        return eval_expr(expr, sol, ctx)
+    except ExprError:
+        return None
+
+
+def _filter_passes(expr, sol: Solution, ctx: Context) -> bool:
+    try:
+        return ebv(eval_expr(expr, sol, ctx))
+    except ExprError:
+        return False
+
+
+def _eval_aggregate(agg: Aggregate, ctx: Context) -> str:
+    if ctx.group is None:
+        raise ExprError("Aggregate outside of a group")
+    key = id(agg)
+    if key in ctx.agg_cache:
+        cached = ctx.agg_cache[key]
+        if cached is None:
+            raise ExprError("Aggregate error")
+        return cached
+    try:
+        result = _compute_aggregate(agg, ctx)
+    except ExprError:
+        ctx.agg_cache[key] = None
+        raise
+    ctx.agg_cache[key] = result
+    return result
+
+
+def _compute_aggregate(agg: Aggregate, ctx: Context) -> str:
+    rows = ctx.group
+    if agg.name == "COUNT" and agg.expr is None:
+        if agg.distinct:
+            return from_python(len({tuple(sorted(r.items())) for r in rows}))
+        return from_python(len(rows))
+    saved = ctx.group
+    ctx.group = None
+    try:
+        values = []
+        for row in rows:
+            try:
+                values.append(eval_expr(agg.expr, row, ctx))
+            except ExprError:
+                if agg.name not in ("COUNT", "SAMPLE", "GROUP_CONCAT"):
+                    raise
+    finally:
+        ctx.group = saved
+    if agg.distinct:
+        values = list(dict.fromkeys(values))
+    name = agg.name
+    if name == "COUNT":
+        return from_python(len(values))
+    if name == "SAMPLE":
+        if not values:
+            raise ExprError("SAMPLE of empty group")
+        return values[0]
+    if name == "GROUP_CONCAT":
+        return literal(agg.separator.join(term_value(v) for v in values))
+    if name in ("SUM", "AVG"):
+        if not values:
+            return from_python(0)
+        total = values[0]
+        _numeric(total)
+        for value in values[1:]:
+            total = _arith("+", total, value)
+        if name == "SUM":
+            return total
+        return _arith("/", total, from_python(len(values)))
+    if name in ("MIN", "MAX"):
+        if not values:
+            raise ExprError(f"{name} of empty group")
+        ordered = sorted(values, key=cmp_to_key(order_compare))
+        return ordered[0] if name == "MIN" else ordered[-1]
+    raise ExprError(f"Unknown aggregate {name}")
+
+
+def order_compare(a: Optional[str], b: Optional[str]) -> int:
+    """ORDER BY comparison: unbound < blank nodes < IRIs < literals."""
+    def rank(t):
+        if t is None:
+            return 0
+        if is_bnode(t):
+            return 1
+        if is_iri(t):
+            return 2
+        return 3
+
+    ra, rb = rank(a), rank(b)
+    if ra != rb:
+        return (ra > rb) - (ra < rb)
+    if ra == 0:
+        return 0
+    if ra == 3:
+        try:
+            return compare_values(a, b)
+        except ExprError:
+            ka = split_literal(a)
+            kb = split_literal(b)
+            ka = (ka[1], ka[0])
+            kb = (kb[1], kb[0])
+            return (ka > kb) - (ka < kb)
+    return (a > b) - (a < b)
+
+
+# ================================================================= patterns
+def _merge(a: Solution, b: Solution) -> Optional[Solution]:
+    if len(b) > len(a):
+        a, b = b, a
+    for key, value in b.items():
+        existing = a.get(key)
+        if existing is not None and existing != value:
+            return None
+    merged = dict(a)
+    merged.update(b)
+    return merged
+
+
+def _join_rows(sols: Iterable[Solution], rows: List[Solution]) -> Iterator[Solution]:
+    """Hash join solutions against a materialised list of rows."""
+    if not rows:
+        return
+    always = set(rows[0])
+    for row in rows[1:]:
+        always &= row.keys()
+    indexes: Dict[Tuple[str, ...], Dict[tuple, List[Solution]]] = {}
+    for sol in sols:
+        keys = tuple(sorted(k for k in always if k in sol))
+        if keys:
+            index = indexes.get(keys)
+            if index is None:
+                index = defaultdict(list)
+                for row in rows:
+                    index[tuple(row[k] for k in keys)].append(row)
+                indexes[keys] = index
+            candidates = index.get(tuple(sol[k] for k in keys), ())
+        else:
+            candidates = rows
+        for row in candidates:
+            merged = _merge(sol, row)
+            if merged is not None:
+                yield merged
+
+
+def pattern_bound_score(tp: TriplePattern, bound: set) -> int:
+    """How selective a pattern is likely to be given already-bound variables."""
+    score = 0
+    for node, weight in ((tp.s, 4), (tp.o, 2), (tp.p, 1)):
+        if isinstance(node, Path):
+            continue
+        if not isinstance(node, Var) or node.name in bound:
+            score += weight
+    return score
+
+
+def plan_bgp(patterns: List[TriplePattern], bound: set, store) -> List[TriplePattern]:
+    """Greedy join order: always take the most constrained pattern next."""
+    remaining = list(patterns)
+    ordered = []
+    bound = set(bound)
+    while remaining:
+        best = max(range(len(remaining)), key=lambda i: (pattern_bound_score(remaining[i], bound), -i))
+        tp = remaining.pop(best)
+        ordered.append(tp)
+        bound.update(tp.vars())
+    return ordered
+
+
+def _resolve(node, sol: Solution) -> Tuple[Optional[str], Optional[str]]:
+    """Return ``(term, unbound var name)`` for a pattern position."""
+    if isinstance(node, Var):
+        value = sol.get(node.name)
+        return (value, None) if value is not None else (None, node.name)
+    return node, None
+
+
+def _match_pattern(tp: TriplePattern, sol: Solution, ctx: Context) -> Iterator[Solution]:
+    s, s_var = _resolve(tp.s, sol)
+    o, o_var = _resolve(tp.o, sol)
+    if isinstance(tp.p, Path):
+        pairs = ((a, None, b) for a, b in _eval_path(tp.p, s, o, ctx))
+        p, p_var = "", None
+    else:
+        p, p_var = _resolve(tp.p, sol)
+        pairs = ctx.store.match(s, p, o)
+    for ts, tp_, to in pairs:
+        new = dict(sol)
+        if s_var:
+            new[s_var] = ts
+        if p_var:
+            if p_var in new and new[p_var] != tp_:
+                continue
+            new[p_var] = tp_
+        if o_var:
+            if o_var in new and new[o_var] != to:
+                continue
+            new[o_var] = to
+        yield new
+
+
+def _encode_bgp(bgp: BGP) -> Optional[List[Tuple[str, str, str]]]:
+    """Patterns in ``TripleStore.solve`` form, or ``None`` if a path is used."""
+    encoded = []
+    for tp in bgp.patterns:
+        if isinstance(tp.p, Path):
+            return None
+        encoded.append(tuple("?" + n.name if isinstance(n, Var) else n for n in (tp.s, tp.p, tp.o)))
+    return encoded
+
+
+def _eval_bgp(bgp: BGP, sols: Iterable[Solution], ctx: Context) -> Iterator[Solution]:
+    key = id(bgp)
+    if key not in ctx.encoded_bgps:
+        ctx.encoded_bgps[key] = _encode_bgp(bgp)
+    encoded = ctx.encoded_bgps[key]
+    for sol in sols:
+        plan_key = (key, frozenset(sol))
+        order = ctx.plan_cache.get(plan_key)
+        if encoded is not None:
+            if order is None:
+                order = ctx.plan_cache[plan_key] = ctx.store.plan(encoded, ["?" + v for v in sol])
+            yield from ctx.store.solve(encoded, sol, order)
+            continue
+        if order is None:
+            order = ctx.plan_cache[plan_key] = plan_bgp(bgp.patterns, set(sol), ctx.store)
+        current: Iterable[Solution] = [sol]
+        for tp in order:
+            current = [new for prev in current for new in _match_pattern(tp, prev, ctx)]
+            if not current:
+                break
+        yield from current
+
+
+def _eval_path(path, s: Optional[str], o: Optional[str], ctx: Context) -> Iterator[Tuple[str, str]]:
+    """Yield ``(subject, object)`` pairs connected by a property path."""
+    if isinstance(path, str):
+        for ts, _, to in ctx.store.match(s, path, o):
+            yield ts, to
+        return
+    kind = path.kind
+    if kind == "link":
+        yield from _eval_path(path.args[0], s, o, ctx)
+    elif kind == "inv":
+        for a, b in _eval_path(path.args[0], o, s, ctx):
+            yield b, a
+    elif kind == "alt":
+        for option in path.args:
+            yield from _eval_path(option, s, o, ctx)
+    elif kind == "seq":
+        first = path.args[0]
+        rest = path.args[1] if len(path.args) == 2 else Path("seq", path.args[1:])
+        if s is None and o is not None:
+            for mid, b in _eval_path(rest, None, o, ctx):
+                for a, _ in _eval_path(first, None, mid, ctx):
+                    yield a, b
+        else:
+            for a, mid in _eval_path(first, s, None, ctx):
+                for _, b in _eval_path(rest, mid, o, ctx):
+                    yield a, b
+    elif kind == "neg":
+        forward = {iri for iri, inverse in path.args if not inverse}
+        backward = {iri for iri, inverse in path.args if inverse}
+        if forward or not backward:
+            for ts, tp, to in ctx.store.match(s, None, o):
+                if tp not in forward:
+                    yield ts, to
+        if backward:
+            for ts, tp, to in ctx.store.match(o, None, s):
+                if tp not in backward:
+                    yield to, ts
+    elif kind == "mod":
+        yield from _eval_path_mod(path, s, o, ctx)
+    else:
+        raise SparqlError(f"Unknown path kind {kind}")
+
+
+def _reach(path, start: str, include_start: bool, ctx: Context) -> Iterator[str]:
+    visited = {start} if include_start else set()
+    if include_start:
+        yield start
+    frontier = [start]
+    while frontier:
+        nxt = []
+        for node in frontier:
+            for _, target in _eval_path(path, node, None, ctx):
+                if target not in visited:
+                    visited.add(target)
+                    nxt.append(target)
+                    yield target
+        frontier = nxt
+
+
+def _eval_path_mod(path: Path, s: Optional[str], o: Optional[str], ctx: Context) -> Iterator[Tuple[str, str]]:
+    inner = path.args[0]
+    if path.mod == "?":
+        seen = set()
+        if s is not None:
+            if o is None or o == s:
+                seen.add((s, s))
+                yield s, s
+        elif o is not None:
+            seen.add((o, o))
+            yield o, o
+        else:
+            for node in ctx.store.nodes():
+                seen.add((node, node))
+                yield node, node
+        for pair in _eval_path(inner, s, o, ctx):
+            if pair not in seen:
+                seen.add(pair)
+                yield pair
+        return
+    include_start = path.mod == "*"
+    if s is not None:
+        for target in _reach(inner, s, include_start, ctx):
+            if o is None or target == o:
+                yield s, target
+                if o is not None:
+                    return
+    elif o is not None:
+        for source in _reach(Path("inv", [inner]), o, include_start, ctx):
+            yield source, o
+    else:
+        for node in ctx.store.nodes():
+            for target in _reach(inner, node, include_start, ctx):
+                yield node, target
+
+
+def _eval_element(element, sols: Iterable[Solution], ctx: Context) -> Iterator[Solution]:
+    if isinstance(element, BGP):
+        return _eval_bgp(element, sols, ctx)
+    if isinstance(element, Group):
+        return _eval_group(element, sols, ctx)
+    if isinstance(element, Optional_):
+        return _eval_optional(element.group, sols, ctx)
+    if isinstance(element, Union_):
+        return (row for sol in sols for g in element.groups for row in _eval_group(g, [sol], ctx))
+    if isinstance(element, Minus):
+        return _eval_minus(element.group, sols, ctx)
+    if isinstance(element, Bind):
+        return _eval_bind(element, sols, ctx)
+    if isinstance(element, Values):
+        return _join_rows(sols, _values_rows(element))
+    if isinstance(element, SubSelect):
+        return _join_rows(sols, _subselect_rows(element, ctx))
+    raise SparqlError(f"Unknown pattern element {element!r}")
+
+
+def _eval_group(group: Group, sols: Iterable[Solution], ctx: Context) -> Iterator[Solution]:
+    filters = []
+    current: Iterable[Solution] = sols
+    for element in group.elements:
+        if isinstance(element, Filter):
+            filters.append(element.expr)
+            continue
+        current = _eval_element(element, current, ctx)
+    if not filters:
+        return iter(current)
+    return (sol for sol in current if all(_filter_passes(f, sol, ctx) for f in filters))
+
+
+def _eval_optional(group: Group, sols: Iterable[Solution], ctx: Context) -> Iterator[Solution]:
+    for sol in sols:
+        found = False
+        for row in _eval_group(group, [sol], ctx):
+            found = True
+            yield row
+        if not found:
+            yield sol
+
+
+def _eval_minus(group: Group, sols: Iterable[Solution], ctx: Context) -> Iterator[Solution]:
+    right = list(_eval_group(group, [{}], ctx))
+    for sol in sols:
+        excluded = False
+        for row in right:
+            shared = sol.keys() & row.keys()
+            if shared and all(sol[k] == row[k] for k in shared):
+                excluded = True
+                break
+        if not excluded:
+            yield sol
+
+
+def _eval_bind(bind: Bind, sols: Iterable[Solution], ctx: Context) -> Iterator[Solution]:
+    name = bind.var.name
+    for sol in sols:
+        if name not in sol:
+            value = _eval_or_none(bind.expr, sol, ctx)
+            if value is not None:
+                sol = dict(sol)
+                sol[name] = value
+        yield sol
+
+
+def _values_rows(values: Values) -> List[Solution]:
+    rows = []
+    for row in values.rows:
+        rows.append({v.name: t for v, t in zip(values.vars, row) if t is not None})
+    return rows
+
+
+def _subselect_rows(sub: SubSelect, ctx: Context) -> List[Solution]:
+    key = id(sub)
+    rows = ctx.subselect_cache.get(key)
+    if rows is None:
+        rows = ctx.subselect_cache[key] = _select(sub.query, ctx).rows
+    return rows
+
+
+# ================================================================ modifiers
+def pattern_vars(group: Group) -> List[str]:
+    """In-scope variables of a group pattern, in order of appearance."""
+    names: List[str] = []
+
+    def add(name: str) -> None:
+        if name not in names and not name.startswith("_:"):
+            names.append(name)
+
+    def walk(element) -> None:
+        if isinstance(element, BGP):
+            for tp in element.patterns:
+                for name in tp.vars():
+                    add(name)
+        elif isinstance(element, Group):
+            for child in element.elements:
+                walk(child)
+        elif isinstance(element, (Optional_, Minus)):
+            if isinstance(element, Optional_):
+                walk(element.group)
+        elif isinstance(element, Union_):
+            for g in element.groups:
+                walk(g)
+        elif isinstance(element, Bind):
+            add(element.var.name)
+        elif isinstance(element, Values):
+            for v in element.vars:
+                add(v.name)
+        elif isinstance(element, SubSelect):
+            q = element.query
+            if q.projection is None:
+                for name in pattern_vars(q.where):
+                    add(name)
+            else:
+                for v, _ in q.projection:
+                    add(v.name)
+
+    walk(group)
+    return names
+
+
+def _sort(pairs: List[Tuple[Solution, Optional[List[Solution]]]], order_by, ctx: Context) -> None:
+    keys = []
+    for sol, group in pairs:
+        ctx.group = group
+        ctx.agg_cache = {}
+        keys.append([_eval_or_none(expr, sol, ctx) for expr, _ in order_by])
+    ctx.group = None
+    directions = [desc for _, desc in order_by]
+
+    def compare(i: int, j: int) -> int:
+        for a, b, desc in zip(keys[i], keys[j], directions):
+            c = order_compare(a, b)
+            if c:
+                return -c if desc else c
+        return 0
+
+    order = sorted(range(len(pairs)), key=cmp_to_key(compare))
+    pairs[:] = [pairs[i] for i in order]
+
+
+def _select(query: Query, ctx: Context) -> QueryResult:
+    sols: Iterable[Solution] = _eval_group(query.where, [{}], ctx)
+    if query.values is not None:
+        sols = _join_rows(sols, _values_rows(query.values))
+
+    if query.projection is None:
+        head = pattern_vars(query.where)
+        if query.values is not None:
+            head += [v.name for v in query.values.vars if v.name not in head]
+    else:
+        head = [v.name for v, _ in query.projection]
+
+    pairs: List[Tuple[Solution, Optional[List[Solution]]]]
+    if query.is_aggregate:
+        pairs = _group(query, list(sols), ctx)
+    else:
+        extensions = [(v.name, e) for v, e in (query.projection or []) if e is not None]
+        if extensions:
+            extended = []
+            for sol in sols:
+                sol = dict(sol)
+                for name, expr in extensions:
+                    value = _eval_or_none(expr, sol, ctx)
+                    if value is not None:
+                        sol[name] = value
+                extended.append(sol)
+            sols = extended
+        if not query.order_by and not query.distinct and query.limit is not None:
+            rows = []
+            skip = query.offset
+            for sol in sols:
+                if skip:
+                    skip -= 1
+                    continue
+                if len(rows) >= query.limit:
+                    break
+                rows.append({k: sol[k] for k in head if k in sol})
+            return QueryResult(head, rows)
+        pairs = [(sol, None) for sol in sols]
+
+    if query.order_by:
+        _sort(pairs, query.order_by, ctx)
+
+    rows = [{k: sol[k] for k in head if k in sol} for sol, _ in pairs]
+    if query.distinct:
+        seen = set()
+        unique = []
+        for row in rows:
+            key = tuple(row.get(k) for k in head)
+            if key not in seen:
+                seen.add(key)
+                unique.append(row)
+        rows = unique
+    if query.offset:
+        rows = rows[query.offset:]
+    if query.limit is not None:
+        rows = rows[:query.limit]
+    return QueryResult(head, rows)
+
+
+def _group(query: Query, sols: List[Solution], ctx: Context) -> List[Tuple[Solution, List[Solution]]]:
+    groups: Dict[tuple, List[Solution]] = {}
+    if query.group_by:
+        for sol in sols:
+            key = tuple(_eval_or_none(expr, sol, ctx) for expr, _ in query.group_by)
+            groups.setdefault(key, []).append(sol)
+    else:
+        groups[()] = sols
+
+    out = []
+    for key, rows in groups.items():
+        base: Solution = dict(rows[0]) if rows else {}
+        for (expr, alias), value in zip(query.group_by, key):
+            name = alias.name if alias is not None else (expr.name if isinstance(expr, Var) else None)
+            if name is None:
+                continue
+            if value is None:
+                base.pop(name, None)
+            else:
+                base[name] = value
+        ctx.group = rows
+        ctx.agg_cache = {}
+        if query.having and not all(_filter_passes(h, base, ctx) for h in query.having):
+            continue
+        for var, expr in query.projection or []:
+            if expr is not None:
+                value = _eval_or_none(expr, base, ctx)
+                if value is None:
+                    base.pop(var.name, None)
+                else:
+                    base[var.name] = value
+        out.append((base, rows))
+    ctx.group = None
+    return out
+
+
+# ==================================================================== entry
+def _expr_exists(expr) -> Iterator[Exists]:
+    if isinstance(expr, Exists):
+        yield expr
+    elif isinstance(expr, Op):
+        for arg in expr.args:
+            yield from _expr_exists(arg)
+
+
+def plan_query(query: Query, store) -> Dict[Tuple[int, frozenset], list]:
+    """
+    Choose join orders for every BGP ahead of execution.
+
+    Variables certainly bound when a BGP is reached (by earlier elements of its
+    group) are tracked statically; BGPs reached with other bindings at run time
+    (e.g. after an OPTIONAL) are planned lazily during execution.
+    """
+    plans: Dict[Tuple[int, frozenset], list] = {}
+
+    def plan_group(group: Group, bound: frozenset) -> frozenset:
+        for element in group.elements:
+            if isinstance(element, BGP):
+                encoded = _encode_bgp(element)
+                if encoded is None:
+                    plans[(id(element), bound)] = plan_bgp(element.patterns, set(bound), store)
+                else:
+                    plans[(id(element), bound)] = store.plan(encoded, ["?" + v for v in bound])
+                bound = bound | {n for tp in element.patterns for n in tp.vars()}
+            elif isinstance(element, Group):
+                bound = plan_group(element, bound)
+            elif isinstance(element, Optional_):
+                plan_group(element.group, bound)
+            elif isinstance(element, Union_):
+                for g in element.groups:
+                    plan_group(g, bound)
+            elif isinstance(element, Minus):
+                plan_group(element.group, frozenset())
+            elif isinstance(element, Bind):
+                for exists in _expr_exists(element.expr):
+                    plan_group(exists.group, bound)
+                bound = bound | {element.var.name}
+            elif isinstance(element, Values):
+                bound = bound | {v.name for v in element.vars}
+            elif isinstance(element, SubSelect):
+                plan_select(element.query)
+        for element in group.elements:
+            if isinstance(element, Filter):
+                for exists in _expr_exists(element.expr):
+                    plan_group(exists.group, bound)
+        return bound
+
+    def plan_select(q: Query) -> None:
+        plan_group(q.where, frozenset())
+        for expr in list(q.having) + [e for _, e in q.projection or [] if e is not None]:
+            for exists in _expr_exists(expr):
+                plan_group(exists.group, frozenset())
+
+    plan_select(query)
+    return plans
+
+
+def execute(query: Query, store, now: Optional[datetime] = None,
+            plans: Optional[Dict[Tuple[int, frozenset], list]] = None) -> QueryResult:
+    """Evaluate a parsed query against a store, optionally with precomputed plans."""
+    ctx = Context(store, now)
+    if plans:
+        ctx.plan_cache.update(plans)
+    if query.form == "ASK":
+        sols = _eval_group(query.where, [{}], ctx)
+        if query.values is not None:
+            sols = _join_rows(sols, _values_rows(query.values))
+        return QueryResult([], boolean=next(iter(sols), None) is not None)
+    return _select(query, ctx)
+
+
+def run_query(store, text: str, prefixes: Optional[Dict[str, str]] = None,
+              now: Optional[datetime] = None) -> QueryResult:
+    """Parse and evaluate query text; ``prefixes`` act as predeclared namespaces."""
+    return execute(parse_query(text, prefixes), store, now)
@@ -0,0 +1,932 @@
+"""
+SPARQL 1.1 query parser.
+
+Turns query text into a small algebra tree that ``graph.sparql`` evaluates.
+Supported: SELECT (DISTINCT, expressions, ``*``) and ASK; OPTIONAL, UNION,
+MINUS, FILTER, BIND, VALUES, nested groups and sub-selects; property paths
+(``/``, ``|``, ``^``, ``?``, ``*``, ``+``); GROUP BY / HAVING with COUNT, SUM,
+AVG, MIN, MAX, SAMPLE and GROUP_CONCAT; ORDER BY, LIMIT and OFFSET; EXISTS /
+NOT EXISTS and the common built-in functions and XSD casts.
+
+Not supported: CONSTRUCT/DESCRIBE, FROM/GRAPH/SERVICE, and SPARQL Update.
+"""
+
+from __future__ import annotations
+
+import itertools
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+from .terms import (
+    RDF_TYPE, XSD_BOOLEAN, XSD_DECIMAL, XSD_DOUBLE, XSD_INTEGER, literal,
+)
+from .turtle_parser import unescape_string
+
+
+class SparqlError(ValueError):
+    """Base class for query errors."""
+
+
+class SparqlSyntaxError(SparqlError):
+    """Raised when query text cannot be parsed."""
+
+
+# --------------------------------------------------------------------- algebra
+class Var:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"?{self.name}"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Var) and other.name == self.name
+
+    def __hash__(self) -> int:
+        return hash(("var", self.name))
+
+
+Node = Union[Var, str]
+
+
+class Path:
+    """Property path: ``kind`` is link/inv/seq/alt/mod/neg."""
+    __slots__ = ("kind", "args", "mod")
+
+    def __init__(self, kind: str, args: list, mod: Optional[str] = None):
+        self.kind = kind
+        self.args = args
+        self.mod = mod
+
+    def __repr__(self) -> str:
+        return f"Path({self.kind}, {self.args!r}, {self.mod!r})"
+
+
+class TriplePattern:
+    __slots__ = ("s", "p", "o")
+
+    def __init__(self, s: Node, p: Union[Node, Path], o: Node):
+        self.s, self.p, self.o = s, p, o
+
+    def vars(self) -> List[str]:
+        return [n.name for n in (self.s, self.p, self.o) if isinstance(n, Var)]
+
+    def __repr__(self) -> str:
+        return f"({self.s!r} {self.p!r} {self.o!r})"
+
+
+class BGP:
+    __slots__ = ("patterns",)
+
+    def __init__(self, patterns: List[TriplePattern]):
+        self.patterns = patterns
+
+
+class Group:
+    __slots__ = ("elements",)
+
+    def __init__(self, elements: list):
+        self.elements = elements
+
+
+class Filter:
+    __slots__ = ("expr",)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+
+class Optional_:
+    __slots__ = ("group",)
+
+    def __init__(self, group: Group):
+        self.group = group
+
+
+class Minus:
+    __slots__ = ("group",)
+
+    def __init__(self, group: Group):
+        self.group = group
+
+
+class Union_:
+    __slots__ = ("groups",)
+
+    def __init__(self, groups: List[Group]):
+        self.groups = groups
+
+
+class Bind:
+    __slots__ = ("expr", "var")
+
+    def __init__(self, expr, var: Var):
+        self.expr, self.var = expr, var
+
+
+class Values:
+    __slots__ = ("vars", "rows")
+
+    def __init__(self, vars_: List[Var], rows: List[List[Optional[str]]]):
+        self.vars, self.rows = vars_, rows
+
+
+class SubSelect:
+    __slots__ = ("query",)
+
+    def __init__(self, query: "Query"):
+        self.query = query
+
+
+# ------------------------------------------------------------------ expressions
+class Const:
+    __slots__ = ("term",)
+
+    def __init__(self, term: str):
+        self.term = term
+
+    def __repr__(self) -> str:
+        return f"Const({self.term})"
+
+
+class Op:
+    """Operator or function call; ``name`` is upper-cased (or an IRI for casts)."""
+    __slots__ = ("name", "args")
+
+    def __init__(self, name: str, args: list):
+        self.name, self.args = name, args
+
+    def __repr__(self) -> str:
+        return f"{self.name}{tuple(self.args)!r}"
+
+
+class Aggregate:
+    __slots__ = ("name", "expr", "distinct", "separator")
+
+    def __init__(self, name: str, expr, distinct: bool = False, separator: str = " "):
+        self.name, self.expr, self.distinct, self.separator = name, expr, distinct, separator
+
+    def __repr__(self) -> str:
+        return f"{self.name}({'DISTINCT ' if self.distinct else ''}{self.expr!r})"
+
+
+class Exists:
+    __slots__ = ("group", "negated")
+
+    def __init__(self, group: Group, negated: bool):
+        self.group, self.negated = group, negated
+
+
+class Query:
+    def __init__(self):
+        self.form = "SELECT"
+        self.distinct = False
+        self.projection: Optional[List[Tuple[Var, object]]] = None  # None means SELECT *
+        self.where: Group = Group([])
+        self.group_by: List[Tuple[object, Optional[Var]]] = []
+        self.having: list = []
+        self.order_by: List[Tuple[object, bool]] = []
+        self.limit: Optional[int] = None
+        self.offset: int = 0
+        self.values: Optional[Values] = None
+        self.prefixes: Dict[str, str] = {}
+
+    @property
+    def is_aggregate(self) -> bool:
+        if self.group_by or self.having:
+            return True
+        exprs = [e for _, e in (self.projection or []) if e is not None]
+        exprs += [e for e, _ in self.order_by]
+        return any(contains_aggregate(e) for e in exprs)
+
+
+def contains_aggregate(expr) -> bool:
+    if isinstance(expr, Aggregate):
+        return True
+    if isinstance(expr, Op):
+        return any(contains_aggregate(a) for a in expr.args)
+    return False
+
+
+# ---------------------------------------------------------------------- lexer
+_PN_LOCAL = r"(?:[^\s.;,()\[\]{}\"'<>#^\\=!&|*+/?$]|\\.|\.(?=[^\s.;,()\[\]{}\"'<>#^=!&|*+/?$]))*"
+
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<ws>\s+|\#[^\n]*)
+    | (?P<iri><[^<>"{}|^`\\\x00-\x20]*>)
+    | (?P<lstring>\"\"\"(?:[^"\\]|\\.|"(?!""))*\"\"\"|'''(?:[^'\\]|\\.|'(?!''))*''')
+    | (?P<string>"(?:[^"\\\n\r]|\\.)*"|'(?:[^'\\\n\r]|\\.)*')
+    | (?P<var>[?$][A-Za-z0-9_]\w*)
+    | (?P<lang>@[A-Za-z]+(?:-[A-Za-z0-9]+)*)
+    | (?P<double>(?:\d+\.\d*[eE][+-]?\d+|\.\d+[eE][+-]?\d+|\d+[eE][+-]?\d+))
+    | (?P<decimal>\d*\.\d+)
+    | (?P<integer>\d+)
+    | (?P<bnode>_:[A-Za-z0-9_](?:[\w.-]*[\w-])?)
+    | (?P<pname>(?:[A-Za-z](?:[\w.-]*[\w-])?)?:""" + _PN_LOCAL + r""")
+    | (?P<word>[A-Za-z_]\w*)
+    | (?P<op>\^\^|&&|\|\||!=|<=|>=|[=<>!+\-*/^|?{}()\[\].;,])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_LOCAL_ESCAPE_RE = re.compile(r"\\(.)")
+
+BUILTINS = {
+    "STR", "LANG", "LANGMATCHES", "DATATYPE", "BOUND", "IRI", "URI", "BNODE",
+    "RAND", "ABS", "CEIL", "FLOOR", "ROUND", "CONCAT", "STRLEN", "UCASE",
+    "LCASE", "ENCODE_FOR_URI", "CONTAINS", "STRSTARTS", "STRENDS", "STRBEFORE",
+    "STRAFTER", "YEAR", "MONTH", "DAY", "HOURS", "MINUTES", "SECONDS",
+    "TIMEZONE", "TZ", "NOW", "UUID", "STRUUID", "MD5", "SHA1", "SHA256",
+    "COALESCE", "IF", "STRLANG", "STRDT", "SAMETERM", "ISIRI", "ISURI",
+    "ISBLANK", "ISLITERAL", "ISNUMERIC", "REGEX", "SUBSTR", "REPLACE",
+}
+AGGREGATES = {"COUNT", "SUM", "MIN", "MAX", "AVG", "SAMPLE", "GROUP_CONCAT"}
+
+
+class SparqlParser:
+    """Recursive-descent parser for one query string."""
+
+    def __init__(self, text: str, prefixes: Optional[Dict[str, str]] = None, base: Optional[str] = None):
+        self.text = text
+        self.prefixes: Dict[str, str] = dict(prefixes or {})
+        self.base = base
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+        self._anon = itertools.count()
+
+    def _tokenize(self, text: str) -> List[Tuple[str, str, int]]:
+        tokens = []
+        pos, end = 0, len(text)
+        while pos < end:
+            m = _TOKEN_RE.match(text, pos)
+            if m is None:
+                raise self._error(f"Unexpected character {text[pos]!r}", pos)
+            kind = m.lastgroup
+            if kind != "ws":
+                tokens.append((kind, m.group(kind), pos))
+            pos = m.end()
+        tokens.append(("eof", "", end))
+        return tokens
+
+    def _error(self, message: str, offset: Optional[int] = None) -> SparqlSyntaxError:
+        if offset is None:
+            offset = self.tokens[min(self.pos, len(self.tokens) - 1)][2]
+        line = self.text.count("\n", 0, offset) + 1
+        col = offset - (self.text.rfind("\n", 0, offset) + 1) + 1
+        return SparqlSyntaxError(f"line {line}, col {col}: {message}")
+
+    # ------------------------------------------------------------ token utils
+    def _peek(self, ahead: int = 0) -> Tuple[str, str, int]:
+        return self.tokens[min(self.pos + ahead, len(self.tokens) - 1)]
+
+    def _next(self) -> Tuple[str, str, int]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _is_op(self, value: str, ahead: int = 0) -> bool:
+        kind, text, _ = self._peek(ahead)
+        return kind == "op" and text == value
+
+    def _is_kw(self, *words: str, ahead: int = 0) -> bool:
+        kind, text, _ = self._peek(ahead)
+        return kind == "word" and text.upper() in words
+
+    def _expect_op(self, value: str) -> None:
+        if not self._is_op(value):
+            raise self._error(f"Expected {value!r}, found {self._peek()[1]!r}")
+        self.pos += 1
+
+    def _expect_kw(self, word: str) -> None:
+        if not self._is_kw(word):
+            raise self._error(f"Expected {word}, found {self._peek()[1]!r}")
+        self.pos += 1
+
+    def _fresh_var(self) -> Var:
+        return Var(f"_:anon{next(self._anon)}")
+
+    # ------------------------------------------------------------------ terms
+    def _iri(self, kind: str, text: str) -> str:
+        if kind == "iri":
+            value = text[1:-1]
+            if self.base and not re.match(r"[A-Za-z][A-Za-z0-9+.-]*:", value):
+                from urllib.parse import urljoin
+                value = urljoin(self.base, value)
+            return f"<{value}>"
+        prefix, _, local = text.partition(":")
+        if prefix not in self.prefixes:
+            raise self._error(f"Undefined prefix {prefix!r}")
+        if "\\" in local:
+            local = _LOCAL_ESCAPE_RE.sub(r"\1", local)
+        return f"<{self.prefixes[prefix]}{local}>"
+
+    def _literal(self, kind: str, text: str) -> str:
+        body = text[3:-3] if kind == "lstring" else text[1:-1]
+        lexical = unescape_string(body)
+        nkind, ntext, _ = self._peek()
+        if nkind == "lang":
+            self._next()
+            return literal(lexical, lang=ntext[1:])
+        if nkind == "op" and ntext == "^^":
+            self._next()
+            dkind, dtext, _ = self._next()
+            if dkind not in ("iri", "pname"):
+                raise self._error("Expected datatype IRI")
+            return literal(lexical, self._iri(dkind, dtext)[1:-1])
+        return literal(lexical)
+
+    def _numeric(self, kind: str, text: str, sign: str = "") -> str:
+        datatype = {"integer": XSD_INTEGER, "decimal": XSD_DECIMAL, "double": XSD_DOUBLE}[kind]
+        return literal(sign + text, datatype)
+
+    def _term_or_var(self) -> Node:
+        """VarOrTerm in a triple pattern or VALUES block."""
+        kind, text, _ = self._next()
+        if kind == "var":
+            return Var(text[1:])
+        if kind in ("iri", "pname"):
+            return self._iri(kind, text)
+        if kind in ("string", "lstring"):
+            return self._literal(kind, text)
+        if kind in ("integer", "decimal", "double"):
+            return self._numeric(kind, text)
+        if kind == "op" and text in ("+", "-") and self._peek()[0] in ("integer", "decimal", "double"):
+            nkind, ntext, _ = self._next()
+            return self._numeric(nkind, ntext, "-" if text == "-" else "")
+        if kind == "word" and text.lower() in ("true", "false"):
+            return literal(text.lower(), XSD_BOOLEAN)
+        if kind == "bnode":
+            return Var(f"_:{text[2:]}")
+        self.pos -= 1
+        raise self._error(f"Unexpected token {text!r}")
+
+    # ------------------------------------------------------------------ query
+    def parse(self) -> Query:
+        self._prologue()
+        if self._is_kw("SELECT"):
+            query = self._select_query()
+        elif self._is_kw("ASK"):
+            self._next()
+            query = Query()
+            query.form = "ASK"
+            self._dataset_clause()
+            if self._is_kw("WHERE"):
+                self._next()
+            query.where = self._group_graph_pattern()
+            self._solution_modifier(query)
+        elif self._is_kw("CONSTRUCT", "DESCRIBE", "INSERT", "DELETE", "LOAD", "CLEAR", "DROP"):
+            raise SparqlError(f"Unsupported query form: {self._peek()[1].upper()}")
+        else:
+            raise self._error(f"Expected SELECT or ASK, found {self._peek()[1]!r}")
+        if self._is_kw("VALUES"):
+            self._next()
+            query.values = self._data_block()
+        if self._peek()[0] != "eof":
+            raise self._error(f"Unexpected trailing input {self._peek()[1]!r}")
+        query.prefixes = dict(self.prefixes)
+        return query
+
+    def _prologue(self) -> None:
+        while True:
+            if self._is_kw("PREFIX"):
+                self._next()
+                kind, text, _ = self._next()
+                if kind != "pname" or not text.endswith(":"):
+                    raise self._error(f"Expected prefix name, found {text!r}")
+                ikind, itext, _ = self._next()
+                if ikind != "iri":
+                    raise self._error(f"Expected IRI, found {itext!r}")
+                self.prefixes[text[:-1]] = self._iri(ikind, itext)[1:-1]
+            elif self._is_kw("BASE"):
+                self._next()
+                ikind, itext, _ = self._next()
+                if ikind != "iri":
+                    raise self._error(f"Expected IRI, found {itext!r}")
+                self.base = itext[1:-1]
+            else:
+                return
+
+    def _dataset_clause(self) -> None:
+        if self._is_kw("FROM"):
+            raise SparqlError("FROM / FROM NAMED datasets are not supported")
+
+    def _select_query(self) -> Query:
+        query = self._select_clause()
+        self._dataset_clause()
+        if self._is_kw("WHERE"):
+            self._next()
+        query.where = self._group_graph_pattern()
+        self._solution_modifier(query)
+        return query
+
+    def _select_clause(self) -> Query:
+        self._expect_kw("SELECT")
+        query = Query()
+        if self._is_kw("DISTINCT", "REDUCED"):
+            query.distinct = self._next()[1].upper() == "DISTINCT"
+        if self._is_op("*"):
+            self._next()
+            query.projection = None
+            return query
+        projection = []
+        while True:
+            kind, text, _ = self._peek()
+            if kind == "var":
+                self._next()
+                projection.append((Var(text[1:]), None))
+            elif kind == "op" and text == "(":
+                self._next()
+                expr = self._expression()
+                self._expect_kw("AS")
+                vkind, vtext, _ = self._next()
+                if vkind != "var":
+                    raise self._error("Expected variable after AS")
+                self._expect_op(")")
+                projection.append((Var(vtext[1:]), expr))
+            else:
+                break
+        if not projection:
+            raise self._error("Empty SELECT clause")
+        query.projection = projection
+        return query
+
+    def _solution_modifier(self, query: Query) -> None:
+        if self._is_kw("GROUP"):
+            self._next()
+            self._expect_kw("BY")
+            while True:
+                kind, text, _ = self._peek()
+                if kind == "var":
+                    self._next()
+                    query.group_by.append((Var(text[1:]), None))
+                elif kind == "op" and text == "(":
+                    self._next()
+                    expr = self._expression()
+                    alias = None
+                    if self._is_kw("AS"):
+                        self._next()
+                        alias = Var(self._next()[1][1:])
+                    self._expect_op(")")
+                    query.group_by.append((expr, alias))
+                elif kind in ("word", "pname", "iri") and self._is_call_start():
+                    query.group_by.append((self._primary(), None))
+                else:
+                    break
+            if not query.group_by:
+                raise self._error("Empty GROUP BY clause")
+        if self._is_kw("HAVING"):
+            self._next()
+            while self._is_op("(") or self._is_call_start():
+                query.having.append(self._constraint())
+            if not query.having:
+                raise self._error("Empty HAVING clause")
+        if self._is_kw("ORDER"):
+            self._next()
+            self._expect_kw("BY")
+            while True:
+                kind, text, _ = self._peek()
+                if kind == "word" and text.upper() in ("ASC", "DESC"):
+                    self._next()
+                    if not self._is_op("("):
+                        raise self._error(f"Expected '(' after {text.upper()}")
+                    query.order_by.append((self._bracketted(), text.upper() == "DESC"))
+                elif kind == "var":
+                    self._next()
+                    query.order_by.append((Var(text[1:]), False))
+                elif self._is_op("(") or self._is_call_start():
+                    query.order_by.append((self._constraint(), False))
+                else:
+                    break
+            if not query.order_by:
+                raise self._error("Empty ORDER BY clause")
+        for _ in range(2):
+            if self._is_kw("LIMIT"):
+                self._next()
+                query.limit = self._integer()
+            elif self._is_kw("OFFSET"):
+                self._next()
+                query.offset = self._integer()
+
+    def _integer(self) -> int:
+        kind, text, _ = self._next()
+        if kind != "integer":
+            raise self._error(f"Expected integer, found {text!r}")
+        return int(text)
+
+    def _is_call_start(self) -> bool:
+        kind, text, _ = self._peek()
+        if kind == "word":
+            name = text.upper()
+            return name in BUILTINS or name in AGGREGATES or name in ("EXISTS", "NOT")
+        if kind in ("pname", "iri"):
+            return self._is_op("(", ahead=1)
+        return False
+
+    def _constraint(self):
+        if self._is_op("("):
+            return self._bracketted()
+        return self._primary()
+
+    # ---------------------------------------------------------- graph patterns
+    def _group_graph_pattern(self) -> Group:
+        self._expect_op("{")
+        if self._is_kw("SELECT"):
+            sub = self._select_query()
+            if self._is_kw("VALUES"):
+                self._next()
+                sub.values = self._data_block()
+            self._expect_op("}")
+            return Group([SubSelect(sub)])
+        elements: list = []
+        triples: List[TriplePattern] = []
+
+        def flush():
+            if triples:
+                elements.append(BGP(list(triples)))
+                triples.clear()
+
+        while not self._is_op("}"):
+            kind, text, _ = self._peek()
+            if kind == "eof":
+                raise self._error("Unterminated group pattern")
+            word = text.upper() if kind == "word" else None
+            if word == "FILTER":
+                self._next()
+                flush()
+                elements.append(Filter(self._constraint()))
+            elif word == "OPTIONAL":
+                self._next()
+                flush()
+                elements.append(Optional_(self._group_graph_pattern()))
+            elif word == "MINUS":
+                self._next()
+                flush()
+                elements.append(Minus(self._group_graph_pattern()))
+            elif word == "BIND":
+                self._next()
+                flush()
+                self._expect_op("(")
+                expr = self._expression()
+                self._expect_kw("AS")
+                vkind, vtext, _ = self._next()
+                if vkind != "var":
+                    raise self._error("Expected variable after AS")
+                self._expect_op(")")
+                elements.append(Bind(expr, Var(vtext[1:])))
+            elif word == "VALUES":
+                self._next()
+                flush()
+                elements.append(self._data_block())
+            elif word in ("GRAPH", "SERVICE"):
+                raise SparqlError(f"{word} patterns are not supported")
+            elif kind == "op" and text == "{":
+                flush()
+                groups = [self._group_graph_pattern()]
+                while self._is_kw("UNION"):
+                    self._next()
+                    groups.append(self._group_graph_pattern())
+                elements.append(groups[0] if len(groups) == 1 else Union_(groups))
+            elif kind == "op" and text == ".":
+                self._next()
+            else:
+                self._triples_same_subject(triples)
+                if self._is_op("."):
+                    self._next()
+                elif not self._is_op("}") and not (self._peek()[0] == "word" or self._is_op("{")):
+                    raise self._error(f"Expected '.' or '}}', found {self._peek()[1]!r}")
+        self._next()
+        flush()
+        return Group(elements)
+
+    def _data_block(self) -> Values:
+        vars_: List[Var] = []
+        rows: List[List[Optional[str]]] = []
+        kind, text, _ = self._peek()
+        if kind == "var":
+            self._next()
+            vars_.append(Var(text[1:]))
+            self._expect_op("{")
+            while not self._is_op("}"):
+                rows.append([self._data_value()])
+            self._next()
+            return Values(vars_, rows)
+        self._expect_op("(")
+        while not self._is_op(")"):
+            vkind, vtext, _ = self._next()
+            if vkind != "var":
+                raise self._error("Expected variable in VALUES")
+            vars_.append(Var(vtext[1:]))
+        self._next()
+        self._expect_op("{")
+        while not self._is_op("}"):
+            self._expect_op("(")
+            row = []
+            while not self._is_op(")"):
+                row.append(self._data_value())
+            self._next()
+            if len(row) != len(vars_):
+                raise self._error("VALUES row length does not match variables")
+            rows.append(row)
+        self._next()
+        return Values(vars_, rows)
+
+    def _data_value(self) -> Optional[str]:
+        if self._is_kw("UNDEF"):
+            self._next()
+            return None
+        value = self._term_or_var()
+        if isinstance(value, Var):
+            raise self._error("Variables are not allowed in VALUES data")
+        return value
+
+    def _triples_same_subject(self, out: List[TriplePattern]) -> None:
+        if self._is_op("["):
+            subject = self._blank_node_property_list(out)
+            if self._is_op(".") or self._is_op("}"):
+                return
+        elif self._is_op("("):
+            raise self._error("RDF collections are not supported in query patterns")
+        else:
+            subject = self._term_or_var()
+        self._property_list(subject, out)
+
+    def _blank_node_property_list(self, out: List[TriplePattern]) -> Var:
+        self._expect_op("[")
+        node = self._fresh_var()
+        if not self._is_op("]"):
+            self._property_list(node, out)
+        self._expect_op("]")
+        return node
+
+    def _property_list(self, subject: Node, out: List[TriplePattern]) -> None:
+        while True:
+            predicate = self._verb()
+            self._object_list(subject, predicate, out)
+            if not self._is_op(";"):
+                return
+            while self._is_op(";"):
+                self._next()
+            if self._is_op(".") or self._is_op("}") or self._is_op("]"):
+                return
+
+    def _object_list(self, subject: Node, predicate, out: List[TriplePattern]) -> None:
+        while True:
+            if self._is_op("["):
+                obj = self._blank_node_property_list(out)
+            else:
+                obj = self._term_or_var()
+            out.append(TriplePattern(subject, predicate, obj))
+            if not self._is_op(","):
+                return
+            self._next()
+
+    def _verb(self):
+        kind, text, _ = self._peek()
+        if kind == "var":
+            self._next()
+            return Var(text[1:])
+        path = self._path_alternative()
+        if path.kind == "link":
+            return path.args[0]
+        return path
+
+    def _path_alternative(self) -> Path:
+        options = [self._path_sequence()]
+        while self._is_op("|"):
+            self._next()
+            options.append(self._path_sequence())
+        return options[0] if len(options) == 1 else Path("alt", options)
+
+    def _path_sequence(self) -> Path:
+        steps = [self._path_elt_or_inverse()]
+        while self._is_op("/"):
+            self._next()
+            steps.append(self._path_elt_or_inverse())
+        return steps[0] if len(steps) == 1 else Path("seq", steps)
+
+    def _path_elt_or_inverse(self) -> Path:
+        if self._is_op("^"):
+            self._next()
+            return Path("inv", [self._path_elt()])
+        return self._path_elt()
+
+    def _path_elt(self) -> Path:
+        primary = self._path_primary()
+        kind, text, _ = self._peek()
+        if kind == "op" and text in ("?", "*", "+"):
+            self._next()
+            return Path("mod", [primary], text)
+        return primary
+
+    def _path_primary(self) -> Path:
+        kind, text, _ = self._next()
+        if kind in ("iri", "pname"):
+            return Path("link", [self._iri(kind, text)])
+        if kind == "word" and text == "a":
+            return Path("link", [f"<{RDF_TYPE}>"])
+        if kind == "op" and text == "(":
+            path = self._path_alternative()
+            self._expect_op(")")
+            return path
+        if kind == "op" and text == "!":
+            return Path("neg", self._negated_set())
+        self.pos -= 1
+        raise self._error(f"Unexpected predicate {text!r}")
+
+    def _negated_set(self) -> List[Tuple[str, bool]]:
+        def one() -> Tuple[str, bool]:
+            inverse = False
+            if self._is_op("^"):
+                self._next()
+                inverse = True
+            kind, text, _ = self._next()
+            if kind in ("iri", "pname"):
+                return self._iri(kind, text), inverse
+            if kind == "word" and text == "a":
+                return f"<{RDF_TYPE}>", inverse
+            raise self._error(f"Unexpected token in negated property set {text!r}")
+
+        if not self._is_op("("):
+            return [one()]
+        self._next()
+        items = []
+        while not self._is_op(")"):
+            items.append(one())
+            if self._is_op("|"):
+                self._next()
+        self._next()
+        return items
+
+    # ------------------------------------------------------------ expressions
+    def _expression(self):
+        left = self._and_expression()
+        while self._is_op("||"):
+            self._next()
+            left = Op("||", [left, self._and_expression()])
+        return left
+
+    def _and_expression(self):
+        left = self._relational()
+        while self._is_op("&&"):
+            self._next()
+            left = Op("&&", [left, self._relational()])
+        return left
+
+    def _relational(self):
+        left = self._additive()
+        kind, text, _ = self._peek()
+        if kind == "op" and text in ("=", "!=", "<", ">", "<=", ">="):
+            self._next()
+            return Op(text, [left, self._additive()])
+        if self._is_kw("IN"):
+            self._next()
+            return Op("IN", [left] + self._expression_list())
+        if self._is_kw("NOT") and self._is_kw("IN", ahead=1):
+            self._next()
+            self._next()
+            return Op("NOT IN", [left] + self._expression_list())
+        return left
+
+    def _expression_list(self) -> list:
+        self._expect_op("(")
+        items = []
+        while not self._is_op(")"):
+            items.append(self._expression())
+            if self._is_op(","):
+                self._next()
+        self._next()
+        return items
+
+    def _additive(self):
+        left = self._multiplicative()
+        while True:
+            kind, text, _ = self._peek()
+            if kind == "op" and text in ("+", "-"):
+                self._next()
+                left = Op(text, [left, self._multiplicative()])
+            else:
+                return left
+
+    def _multiplicative(self):
+        left = self._unary()
+        while True:
+            kind, text, _ = self._peek()
+            if kind == "op" and text in ("*", "/"):
+                self._next()
+                left = Op(text, [left, self._unary()])
+            else:
+                return left
+
+    def _unary(self):
+        kind, text, _ = self._peek()
+        if kind == "op" and text == "!":
+            self._next()
+            return Op("!", [self._unary()])
+        if kind == "op" and text == "-":
+            self._next()
+            return Op("NEG", [self._unary()])
+        if kind == "op" and text == "+":
+            self._next()
+            return self._unary()
+        return self._primary()
+
+    def _bracketted(self):
+        self._expect_op("(")
+        expr = self._expression()
+        self._expect_op(")")
+        return expr
+
+    def _arg_list(self) -> list:
+        self._expect_op("(")
+        args = []
+        if self._is_kw("DISTINCT"):
+            raise self._error("DISTINCT is only allowed in aggregates")
+        while not self._is_op(")"):
+            args.append(self._expression())
+            if self._is_op(","):
+                self._next()
+            elif not self._is_op(")"):
+                raise self._error(f"Expected ',' or ')', found {self._peek()[1]!r}")
+        self._next()
+        return args
+
+    def _primary(self):
+        kind, text, _ = self._peek()
+        if kind == "op" and text == "(":
+            return self._bracketted()
+        if kind == "var":
+            self._next()
+            return Var(text[1:])
+        if kind in ("string", "lstring"):
+            self._next()
+            return Const(self._literal(kind, text))
+        if kind in ("integer", "decimal", "double"):
+            self._next()
+            return Const(self._numeric(kind, text))
+        if kind in ("iri", "pname"):
+            self._next()
+            iri = self._iri(kind, text)
+            if self._is_op("("):
+                return Op(iri, self._arg_list())
+            return Const(iri)
+        if kind == "word":
+            name = text.upper()
+            if name in ("TRUE", "FALSE"):
+                self._next()
+                return Const(literal(name.lower(), XSD_BOOLEAN))
+            if name in AGGREGATES:
+                self._next()
+                return self._aggregate(name)
+            if name == "EXISTS":
+                self._next()
+                return Exists(self._group_graph_pattern(), False)
+            if name == "NOT" and self._is_kw("EXISTS", ahead=1):
+                self._next()
+                self._next()
+                return Exists(self._group_graph_pattern(), True)
+            if name in BUILTINS:
+                self._next()
+                if name == "BOUND":
+                    self._expect_op("(")
+                    vkind, vtext, _ = self._next()
+                    if vkind != "var":
+                        raise self._error("BOUND expects a variable")
+                    self._expect_op(")")
+                    return Op("BOUND", [Var(vtext[1:])])
+                if name in ("NOW", "RAND", "UUID", "STRUUID") and self._is_op("("):
+                    self._next()
+                    self._expect_op(")")
+                    return Op(name, [])
+                return Op(name, self._arg_list())
+        raise self._error(f"Unexpected token {text!r} in expression")
+
+    def _aggregate(self, name: str) -> Aggregate:
+        self._expect_op("(")
+        distinct = False
+        if self._is_kw("DISTINCT"):
+            self._next()
+            distinct = True
+        if name == "COUNT" and self._is_op("*"):
+            self._next()
+            self._expect_op(")")
+            return Aggregate(name, None, distinct)
+        expr = self._expression()
+        separator = " "
+        if name == "GROUP_CONCAT" and self._is_op(";"):
+            self._next()
+            self._expect_kw("SEPARATOR")
+            self._expect_op("=")
+            skind, stext, _ = self._next()
+            if skind not in ("string", "lstring"):
+                raise self._error("Expected separator string")
+            separator = unescape_string(stext[3:-3] if skind == "lstring" else stext[1:-1])
+        self._expect_op(")")
+        return Aggregate(name, expr, distinct, separator)
+
+
+def parse_query(text: str, prefixes: Optional[Dict[str, str]] = None, base: Optional[str] = None) -> Query:
+    """Parse SPARQL query text into a ``Query``."""
+    return SparqlParser(text, prefixes, base).parse()
@@ -0,0 +1,215 @@
+"""
+RDF term encoding shared by the parser, the store and the SPARQL engine.
+
+Terms are kept as plain strings in an N-Triples-like shape so they hash and
+compare cheaply and can be used directly as dictionary keys:
+
+- IRI:        ``<https://w3id.org/cmc-stagegate#Stage>``
+- blank node: ``_:b12``
+- literal:    ``"lexical"``, ``"lexical"@en`` or ``"lexical"^^<datatype>``
+
+The lexical form of a literal is stored unescaped. The closing quote is always
+the last ``"`` in the string because language tags and datatype IRIs never
+contain one, so ``split_literal`` can recover the parts with a single ``rfind``.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Optional, Tuple
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+
+XSD_STRING = XSD + "string"
+XSD_BOOLEAN = XSD + "boolean"
+XSD_INTEGER = XSD + "integer"
+XSD_DECIMAL = XSD + "decimal"
+XSD_DOUBLE = XSD + "double"
+XSD_FLOAT = XSD + "float"
+XSD_DATE = XSD + "date"
+XSD_DATETIME = XSD + "dateTime"
+RDF_TYPE = RDF + "type"
+RDF_LANGSTRING = RDF + "langString"
+
+INTEGER_TYPES = {
+    XSD_INTEGER, XSD + "int", XSD + "long", XSD + "short", XSD + "byte",
+    XSD + "nonNegativeInteger", XSD + "positiveInteger",
+    XSD + "nonPositiveInteger", XSD + "negativeInteger",
+    XSD + "unsignedInt", XSD + "unsignedLong", XSD + "unsignedShort", XSD + "unsignedByte",
+}
+NUMERIC_TYPES = INTEGER_TYPES | {XSD_DECIMAL, XSD_DOUBLE, XSD_FLOAT}
+
+# Namespaces GraphDB predeclares in every repository
+STANDARD_PREFIXES = {
+    "rdf": RDF,
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "xsd": XSD,
+}
+
+TRUE = '"true"^^<' + XSD_BOOLEAN + '>'
+FALSE = '"false"^^<' + XSD_BOOLEAN + '>'
+
+_NT_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+_NT_ESCAPE_RE = re.compile(r'[\\"\n\r\t]')
+
+
+def iri(value: str) -> str:
+    """Encode an IRI."""
+    return f"<{value}>"
+
+
+def bnode(label: str) -> str:
+    """Encode a blank node label."""
+    return f"_:{label}"
+
+
+def literal(lexical: str, datatype: Optional[str] = None, lang: Optional[str] = None) -> str:
+    """Encode a literal; ``xsd:string`` is folded into the plain form."""
+    if lang:
+        return f'"{lexical}"@{lang.lower()}'
+    if datatype and datatype != XSD_STRING:
+        return f'"{lexical}"^^<{datatype}>'
+    return f'"{lexical}"'
+
+
+def is_iri(term: str) -> bool:
+    return term[:1] == "<"
+
+
+def is_bnode(term: str) -> bool:
+    return term[:2] == "_:"
+
+
+def is_literal(term: str) -> bool:
+    return term[:1] == '"'
+
+
+def split_literal(term: str) -> Tuple[str, str, Optional[str]]:
+    """Return ``(lexical, datatype IRI, language)`` for a literal term."""
+    end = term.rfind('"')
+    lexical = term[1:end]
+    suffix = term[end + 1:]
+    if not suffix:
+        return lexical, XSD_STRING, None
+    if suffix[0] == "@":
+        return lexical, RDF_LANGSTRING, suffix[1:]
+    return lexical, suffix[3:-1], None
+
+
+def term_value(term: str) -> str:
+    """Lexical form of a literal, the IRI string, or the blank node label."""
+    if is_literal(term):
+        return term[1:term.rfind('"')]
+    if is_iri(term):
+        return term[1:-1]
+    return term[2:]
+
+
+def parse_date(lexical: str) -> date:
+    """Parse an ``xsd:date`` lexical form, tolerating a trailing timezone."""
+    return date.fromisoformat(lexical.strip()[:10])
+
+
+def parse_datetime(lexical: str) -> datetime:
+    """Parse an ``xsd:dateTime`` lexical form."""
+    text = lexical.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    return datetime.fromisoformat(text)
+
+
+def to_python(term: str):
+    """
+    Convert a literal to the closest Python value.
+
+    Numbers become ``int``/``Decimal``/``float``, booleans ``bool`` and dates
+    ``date``/``datetime``. Anything else (including IRIs) is returned as its
+    string value. Raises ``ValueError`` for malformed typed literals.
+    """
+    if not is_literal(term):
+        return term_value(term)
+    lexical, datatype, _ = split_literal(term)
+    if datatype in INTEGER_TYPES:
+        return int(lexical.strip())
+    if datatype == XSD_DECIMAL:
+        try:
+            return Decimal(lexical.strip())
+        except InvalidOperation:
+            raise ValueError(f"Invalid xsd:decimal: {lexical!r}")
+    if datatype in (XSD_DOUBLE, XSD_FLOAT):
+        return float(lexical.strip())
+    if datatype == XSD_BOOLEAN:
+        value = lexical.strip()
+        if value in ("true", "1"):
+            return True
+        if value in ("false", "0"):
+            return False
+        raise ValueError(f"Invalid xsd:boolean: {lexical!r}")
+    if datatype == XSD_DATE:
+        return parse_date(lexical)
+    if datatype == XSD_DATETIME:
+        return parse_datetime(lexical)
+    return lexical
+
+
+def from_python(value) -> str:
+    """Encode a Python value as a typed literal."""
+    if isinstance(value, bool):
+        return TRUE if value else FALSE
+    if isinstance(value, int):
+        return literal(str(value), XSD_INTEGER)
+    if isinstance(value, Decimal):
+        text = format(value, "f")
+        if "." not in text:
+            text += ".0"
+        return literal(text, XSD_DECIMAL)
+    if isinstance(value, float):
+        return literal(repr(value), XSD_DOUBLE)
+    if isinstance(value, datetime):
+        return literal(value.isoformat(), XSD_DATETIME)
+    if isinstance(value, date):
+        return literal(value.isoformat(), XSD_DATE)
+    return literal(str(value))
+
+
+def escape_ntriples(lexical: str) -> str:
+    """Escape a lexical form for N-Triples / Turtle single-quoted output."""
+    return _NT_ESCAPE_RE.sub(lambda m: _NT_ESCAPES[m.group(0)], lexical)
+
+
+def to_ntriples(term: str) -> str:
+    """Serialise a term in N-Triples syntax."""
+    if not is_literal(term):
+        return term
+    end = term.rfind('"')
+    return f'"{escape_ntriples(term[1:end])}"{term[end + 1:]}'
+
+
+def to_sparql_json(term: str) -> Dict[str, str]:
+    """Serialise a term as a SPARQL 1.1 JSON results binding."""
+    if is_iri(term):
+        return {"type": "uri", "value": term[1:-1]}
+    if is_bnode(term):
+        return {"type": "bnode", "value": term[2:]}
+    lexical, datatype, lang = split_literal(term)
+    binding = {"type": "literal", "value": lexical}
+    if lang:
+        binding["xml:lang"] = lang
+    elif datatype != XSD_STRING:
+        binding["datatype"] = datatype
+    return binding
+
+
+def compact(term: str, prefixes: Dict[str, str]) -> str:
+    """Shorten an IRI with the first matching prefix (for display only)."""
+    if not is_iri(term):
+        return term_value(term)
+    value = term[1:-1]
+    for prefix, namespace in prefixes.items():
+        if value.startswith(namespace):
+            return f"{prefix}:{value[len(namespace):]}"
+    return value
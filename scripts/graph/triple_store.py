@@ -0,0 +1,357 @@
+"""
+Embedded in-memory triple store over dictionary-encoded terms.
+
+Every distinct term (see ``graph.terms``) is assigned a small integer id. A
+triple is packed into one 63-bit integer and kept in three sorted ``array('Q')``
+permutation indexes -- SPO, POS and OSP -- so any triple pattern is a prefix of
+one index and is answered with two binary searches. The indexes are the only
+copy of the triples, giving 24 bytes per triple plus the term dictionary.
+
+Inserts go to a small pending buffer that is merged into the sorted indexes on
+the next read, so bulk loads sort once instead of shifting arrays per triple.
+
+Basic graph patterns can be answered directly at the id level with ``solve``;
+variables are written as ``"?name"`` strings.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from .turtle_parser import parse_file, parse_turtle
+
+Triple = Tuple[str, str, str]
+Pattern = Tuple[str, str, str]
+
+ID_BITS = 21
+MAX_TERMS = 1 << ID_BITS
+_MASK = MAX_TERMS - 1
+_SHIFT_1 = ID_BITS
+_SHIFT_2 = 2 * ID_BITS
+
+
+def _pack(a: int, b: int, c: int) -> int:
+    return (a << _SHIFT_2) | (b << _SHIFT_1) | c
+
+
+def _is_var(node: str) -> bool:
+    return node[:1] == "?"
+
+
+class TripleStore:
+    """Set-semantics triple store with SPO/POS/OSP permutation indexes."""
+
+    def __init__(self, triples: Optional[Iterable[Triple]] = None):
+        self._terms: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._spo = array("Q")
+        self._pos = array("Q")
+        self._osp = array("Q")
+        self._pending: Set[int] = set()
+        if triples is not None:
+            self.add_all(triples)
+
+    @classmethod
+    def from_files(cls, paths: Iterable[Union[str, Path]]) -> "TripleStore":
+        store = cls()
+        for path in paths:
+            store.add_all(parse_file(path))
+        return store
+
+    # ----------------------------------------------------------- dictionary
+    def _encode(self, term: str) -> int:
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            if term_id >= MAX_TERMS:
+                raise OverflowError(f"TripleStore supports at most {MAX_TERMS} distinct terms")
+            self._ids[term] = term_id
+            self._terms.append(term)
+        return term_id
+
+    def lookup(self, term: str) -> Optional[int]:
+        """Id of a term, or ``None`` if it never occurred."""
+        return self._ids.get(term)
+
+    def term(self, term_id: int) -> str:
+        return self._terms[term_id]
+
+    # ------------------------------------------------------------ mutation
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        keys = self._pending
+        self._pending = set()
+        if self._spo:
+            keys.update(self._spo)
+        spo = sorted(keys)
+        pos = []
+        osp = []
+        for k in spo:
+            s, p, o = k >> _SHIFT_2, (k >> _SHIFT_1) & _MASK, k & _MASK
+            pos.append(_pack(p, o, s))
+            osp.append(_pack(o, s, p))
+        pos.sort()
+        osp.sort()
+        self._spo = array("Q", spo)
+        self._pos = array("Q", pos)
+        self._osp = array("Q", osp)
+
+    def _indexed(self, key: int) -> bool:
+        spo = self._spo
+        i = bisect_left(spo, key)
+        return i < len(spo) and spo[i] == key
+
+    def add(self, s: str, p: str, o: str) -> bool:
+        """Add a triple; returns ``False`` if it was already present."""
+        key = _pack(self._encode(s), self._encode(p), self._encode(o))
+        if key in self._pending or self._indexed(key):
+            return False
+        self._pending.add(key)
+        return True
+
+    def add_all(self, triples: Iterable[Triple]) -> int:
+        """Add triples, returning how many were new."""
+        encode = self._encode
+        pending = self._pending
+        indexed = self._indexed if self._spo else None
+        added = 0
+        for s, p, o in triples:
+            key = _pack(encode(s), encode(p), encode(o))
+            if key in pending or (indexed is not None and indexed(key)):
+                continue
+            pending.add(key)
+            added += 1
+        return added
+
+    def load_turtle(self, text: str, base: Optional[str] = None) -> int:
+        return self.add_all(parse_turtle(text, base))
+
+    def remove(self, s: Optional[str] = None, p: Optional[str] = None, o: Optional[str] = None) -> int:
+        """Remove every triple matching the pattern, returning the count."""
+        self._flush()
+        doomed = {_pack(a, b, c) for a, b, c in self.match_ids(*self._pattern_ids(s, p, o))} \
+            if self._known(s, p, o) else set()
+        if doomed:
+            self._pending = {k for k in self._spo if k not in doomed}
+            self._spo = array("Q")
+            self._pos = array("Q")
+            self._osp = array("Q")
+            self._flush()
+        return len(doomed)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    # --------------------------------------------------------------- reads
+    def __len__(self) -> int:
+        self._flush()
+        return len(self._spo)
+
+    def __contains__(self, triple: Triple) -> bool:
+        ids = [self._ids.get(t) for t in triple]
+        if None in ids:
+            return False
+        key = _pack(*ids)
+        return key in self._pending or self._indexed(key)
+
+    def _known(self, *terms: Optional[str]) -> bool:
+        return all(t is None or t in self._ids for t in terms)
+
+    def _pattern_ids(self, s, p, o) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        ids = self._ids
+        return (None if s is None else ids[s], None if p is None else ids[p], None if o is None else ids[o])
+
+    def _range(self, s: Optional[int], p: Optional[int], o: Optional[int]) -> Tuple[array, int, int, int]:
+        """Pick the index whose key prefix is bound; returns ``(index, lo, hi, kind)``."""
+        if s is not None:
+            if p is not None:
+                if o is not None:
+                    index, prefix, width = self._spo, _pack(s, p, o), 1
+                else:
+                    index, prefix, width = self._spo, _pack(s, p, 0), 1 << _SHIFT_1
+                kind = 0
+            elif o is not None:
+                index, prefix, width, kind = self._osp, _pack(o, s, 0), 1 << _SHIFT_1, 2
+            else:
+                index, prefix, width, kind = self._spo, _pack(s, 0, 0), 1 << _SHIFT_2, 0
+        elif p is not None:
+            if o is not None:
+                index, prefix, width = self._pos, _pack(p, o, 0), 1 << _SHIFT_1
+            else:
+                index, prefix, width = self._pos, _pack(p, 0, 0), 1 << _SHIFT_2
+            kind = 1
+        elif o is not None:
+            index, prefix, width, kind = self._osp, _pack(o, 0, 0), 1 << _SHIFT_2, 2
+        else:
+            return self._spo, 0, len(self._spo), 0
+        lo = bisect_left(index, prefix)
+        hi = bisect_left(index, prefix + width, lo)
+        return index, lo, hi, kind
+
+    def match_ids(self, s: Optional[int] = None, p: Optional[int] = None,
+                  o: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(s, p, o)`` id triples matching an id pattern."""
+        self._flush()
+        index, lo, hi, kind = self._range(s, p, o)
+        for i in range(lo, hi):
+            k = index[i]
+            a, b, c = k >> _SHIFT_2, (k >> _SHIFT_1) & _MASK, k & _MASK
+            if kind == 0:
+                yield a, b, c
+            elif kind == 1:
+                yield c, a, b
+            else:
+                yield b, c, a
+
+    def count_ids(self, s: Optional[int] = None, p: Optional[int] = None, o: Optional[int] = None) -> int:
+        self._flush()
+        _, lo, hi, _ = self._range(s, p, o)
+        return hi - lo
+
+    def match(self, s: Optional[str] = None, p: Optional[str] = None, o: Optional[str] = None) -> Iterator[Triple]:
+        """Yield triples matching a pattern; ``None`` is a wildcard."""
+        if not self._known(s, p, o):
+            return
+        terms = self._terms
+        for a, b, c in self.match_ids(*self._pattern_ids(s, p, o)):
+            yield terms[a], terms[b], terms[c]
+
+    def count(self, s: Optional[str] = None, p: Optional[str] = None, o: Optional[str] = None) -> int:
+        """Number of triples matching a pattern (two binary searches)."""
+        if not self._known(s, p, o):
+            return 0
+        return self.count_ids(*self._pattern_ids(s, p, o))
+
+    def nodes(self) -> Set[str]:
+        """All terms used in subject or object position."""
+        self._flush()
+        ids = {k >> _SHIFT_2 for k in self._spo}
+        ids.update(k >> _SHIFT_2 for k in self._osp)
+        return {self._terms[i] for i in ids}
+
+    def triples(self) -> Iterator[Triple]:
+        return self.match()
+
+    def stats(self) -> Dict[str, int]:
+        """Sizes of the store's structures in bytes."""
+        self._flush()
+        index_bytes = sum(a.itemsize * len(a) for a in (self._spo, self._pos, self._osp))
+        return {
+            "triples": len(self._spo),
+            "terms": len(self._terms),
+            "index_bytes": index_bytes,
+            "term_bytes": sum(len(t) for t in self._terms),
+        }
+
+    # ----------------------------------------------------- graph patterns
+    def plan(self, patterns: Sequence[Pattern], bound: Iterable[str] = ()) -> List[Pattern]:
+        """
+        Order patterns for a left-deep index nested-loop join.
+
+        Greedily takes the pattern connected to already-bound variables with
+        the most bound positions, breaking ties by its index cardinality.
+        """
+        self._flush()
+        bound = set(bound)
+        remaining = list(patterns)
+        ordered: List[Pattern] = []
+        while remaining:
+            best_key = None
+            best = 0
+            for i, pattern in enumerate(remaining):
+                key = self._plan_key(pattern, bound, bool(ordered) or bool(bound))
+                if best_key is None or key < best_key:
+                    best_key, best = key, i
+            pattern = remaining.pop(best)
+            ordered.append(pattern)
+            bound.update(node for node in pattern if _is_var(node))
+        return ordered
+
+    def _plan_key(self, pattern: Pattern, bound: Set[str], need_connection: bool) -> Tuple[int, int, int]:
+        ids = []
+        bound_positions = 0
+        connected = False
+        for node in pattern:
+            if _is_var(node):
+                ids.append(None)
+                if node in bound:
+                    bound_positions += 1
+                    connected = True
+            else:
+                term_id = self._ids.get(node)
+                if term_id is None:
+                    return (0, -3, 0)  # matches nothing: run it first
+                ids.append(term_id)
+                bound_positions += 1
+        estimate = self.count_ids(*ids)
+        return (1 if need_connection and not connected else 0, -bound_positions, estimate)
+
+    def solve(self, patterns: Sequence[Pattern], binding: Optional[Dict[str, str]] = None,
+              order: Optional[Sequence[Pattern]] = None) -> Iterator[Dict[str, str]]:
+        """
+        Answer a basic graph pattern.
+
+        ``patterns`` are ``(s, p, o)`` tuples of terms and ``"?var"`` names;
+        ``binding`` maps variable names (without ``?``) to terms already fixed
+        by the caller. Yields one dict per solution, extending ``binding``.
+        """
+        binding = binding or {}
+        order = order if order is not None else self.plan(patterns, ("?" + v for v in binding))
+        self._flush()
+        env: Dict[str, int] = {}
+        compiled = []
+        for pattern in order:
+            nodes = []
+            for node in pattern:
+                if _is_var(node):
+                    name = node[1:]
+                    if name in binding:
+                        term_id = self._ids.get(binding[name])
+                        if term_id is None:
+                            return
+                        env[name] = term_id
+                    nodes.append(name)
+                else:
+                    term_id = self._ids.get(node)
+                    if term_id is None:
+                        return
+                    nodes.append(term_id)
+            compiled.append(nodes)
+
+        terms = self._terms
+        new_vars = [v for v in dict.fromkeys(n for nodes in compiled for n in nodes if isinstance(n, str))
+                    if v not in binding]
+        for result in self._join(compiled, 0, env):
+            solution = dict(binding)
+            for name in new_vars:
+                solution[name] = terms[result[name]]
+            yield solution
+
+    def _join(self, compiled: List[list], depth: int, env: Dict[str, int]) -> Iterator[Dict[str, int]]:
+        if depth == len(compiled):
+            yield env
+            return
+        nodes = compiled[depth]
+        ids = [env.get(n) if isinstance(n, str) else n for n in nodes]
+        free = [(i, n) for i, n in enumerate(nodes) if isinstance(n, str) and ids[i] is None]
+        for triple in self.match_ids(*ids):
+            if free:
+                new_env = dict(env)
+                ok = True
+                for i, name in free:
+                    value = triple[i]
+                    seen = new_env.get(name)
+                    if seen is None:
+                        new_env[name] = value
+                    elif seen != value:
+                        ok = False
+                        break
+                if not ok:
+                    continue
+            else:
+                new_env = env
+            yield from self._join(compiled, depth + 1, new_env)
@@ -0,0 +1,329 @@
+"""
+Dependency-free Turtle / N-Triples parser.
+
+Covers the Turtle used across this repository: ``@prefix``/``@base`` and the
+SPARQL-style ``PREFIX``/``BASE`` directives, prefixed names, ``a``, predicate
+and object lists, blank node property lists, collections, long (triple-quoted)
+strings, language tags, typed literals and numeric/boolean shorthand.
+
+Triples are produced as ``(subject, predicate, object)`` tuples of encoded
+terms (see ``graph.terms``).
+"""
+
+from __future__ import annotations
+
+import itertools
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urljoin
+
+from .terms import (
+    RDF, XSD_BOOLEAN, XSD_DECIMAL, XSD_DOUBLE, XSD_INTEGER, literal,
+)
+
+Triple = Tuple[str, str, str]
+
+RDF_TYPE_IRI = f"<{RDF}type>"
+RDF_FIRST = f"<{RDF}first>"
+RDF_REST = f"<{RDF}rest>"
+RDF_NIL = f"<{RDF}nil>"
+
+_PN_LOCAL = r"(?:[^\s.;,()\[\]{}\"'<>#^\\]|\\.|\.(?=[^\s.;,()\[\]{}\"'<>#^]))*"
+
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<ws>\s+|\#[^\n]*)
+    | (?P<iri><[^<>"{}|^`\\\x00-\x20]*>)
+    | (?P<lstring>\"\"\"(?:[^"\\]|\\.|"(?!""))*\"\"\"|'''(?:[^'\\]|\\.|'(?!''))*''')
+    | (?P<string>"(?:[^"\\\n\r]|\\.)*"|'(?:[^'\\\n\r]|\\.)*')
+    | (?P<dtype>\^\^)
+    | (?P<at>@[A-Za-z]+(?:-[A-Za-z0-9]+)*)
+    | (?P<double>[+-]?(?:\d+\.\d*[eE][+-]?\d+|\.\d+[eE][+-]?\d+|\d+[eE][+-]?\d+))
+    | (?P<decimal>[+-]?\d*\.\d+)
+    | (?P<integer>[+-]?\d+)
+    | (?P<bnode>_:[A-Za-z0-9_](?:[\w.-]*[\w-])?)
+    | (?P<pname>(?:[A-Za-z](?:[\w.-]*[\w-])?)?:""" + _PN_LOCAL + r""")
+    | (?P<word>[A-Za-z]+)
+    | (?P<punct>[.;,\[\]()])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_ESCAPE_RE = re.compile(r"\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)", re.DOTALL)
+_SIMPLE_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f",
+                   '"': '"', "'": "'", "\\": "\\"}
+_LOCAL_ESCAPE_RE = re.compile(r"\\(.)")
+
+_parser_ids = itertools.count()
+
+
+class TurtleError(ValueError):
+    """Raised for malformed Turtle input."""
+
+
+def unescape_string(text: str) -> str:
+    """Resolve ECHAR and UCHAR escapes in a string body."""
+    if "\\" not in text:
+        return text
+
+    def _sub(match: re.Match) -> str:
+        esc = match.group(1)
+        if esc[0] in "uU" and len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        if esc in _SIMPLE_ESCAPES:
+            return _SIMPLE_ESCAPES[esc]
+        raise TurtleError(f"Invalid escape sequence: \\{esc}")
+
+    return _ESCAPE_RE.sub(_sub, text)
+
+
+class TurtleParser:
+    """Recursive-descent Turtle parser; one instance per document."""
+
+    def __init__(self, base: Optional[str] = None):
+        self.base = base
+        self.prefixes: Dict[str, str] = {}
+        self._bnode_prefix = f"t{next(_parser_ids)}"
+        self._bnode_counter = itertools.count()
+        self._tokens: List[Tuple[str, str, int]] = []
+        self._pos = 0
+        self._text = ""
+        self._out: List[Triple] = []
+
+    # ------------------------------------------------------------------ lexer
+    def _tokenize(self, text: str) -> List[Tuple[str, str, int]]:
+        tokens = []
+        append = tokens.append
+        pos = 0
+        # finditer skips unmatchable characters, so a gap means a lexing error
+        for m in _TOKEN_RE.finditer(text):
+            start = m.start()
+            if start != pos:
+                raise self._error(f"Unexpected character {text[pos]!r}", pos)
+            kind = m.lastgroup
+            if kind != "ws":
+                append((kind, m.group(), start))
+            pos = m.end()
+        if pos != len(text):
+            raise self._error(f"Unexpected character {text[pos]!r}", pos)
+        append(("eof", "", pos))
+        return tokens
+
+    def _error(self, message: str, offset: Optional[int] = None) -> TurtleError:
+        if offset is None:
+            offset = self._tokens[min(self._pos, len(self._tokens) - 1)][2] if self._tokens else 0
+        line = self._text.count("\n", 0, offset) + 1
+        return TurtleError(f"line {line}: {message}")
+
+    # ----------------------------------------------------------------- helpers
+    def _peek(self) -> Tuple[str, str, int]:
+        return self._tokens[self._pos]
+
+    def _next(self) -> Tuple[str, str, int]:
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def _expect(self, value: str) -> None:
+        kind, text, _ = self._next()
+        if text != value or kind not in ("punct",):
+            self._pos -= 1
+            raise self._error(f"Expected {value!r}, found {text!r}")
+
+    def _new_bnode(self) -> str:
+        return f"_:{self._bnode_prefix}g{next(self._bnode_counter)}"
+
+    def _resolve(self, value: str) -> str:
+        if self.base and not re.match(r"[A-Za-z][A-Za-z0-9+.-]*:", value):
+            return urljoin(self.base, value)
+        return value
+
+    def _iri_token(self, kind: str, text: str) -> str:
+        if kind == "iri":
+            return f"<{self._resolve(unescape_string(text[1:-1]))}>"
+        prefix, _, local = text.partition(":")
+        if prefix not in self.prefixes:
+            raise self._error(f"Undefined prefix {prefix!r}")
+        if "\\" in local:
+            local = _LOCAL_ESCAPE_RE.sub(r"\1", local)
+        return f"<{self.prefixes[prefix]}{local}>"
+
+    # ----------------------------------------------------------------- grammar
+    def parse(self, text: str) -> List[Triple]:
+        """Parse a whole document and return its triples."""
+        self._text = text
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+        self._out = []
+        while self._peek()[0] != "eof":
+            self._statement()
+        triples = self._out
+        self._out = []
+        self._tokens = []
+        return triples
+
+    def _statement(self) -> None:
+        kind, text, _ = self._peek()
+        if kind == "at":
+            self._next()
+            if text == "@prefix":
+                self._prefix_directive()
+            elif text == "@base":
+                self._base_directive()
+            else:
+                raise self._error(f"Unknown directive {text}")
+            self._expect(".")
+            return
+        if kind == "word" and text.upper() in ("PREFIX", "BASE"):
+            self._next()
+            if text.upper() == "PREFIX":
+                self._prefix_directive()
+            else:
+                self._base_directive()
+            return
+        self._triples()
+        self._expect(".")
+
+    def _prefix_directive(self) -> None:
+        kind, text, _ = self._next()
+        if kind != "pname" or not text.endswith(":"):
+            raise self._error(f"Expected prefix name, found {text!r}")
+        kind, iri_text, _ = self._next()
+        if kind != "iri":
+            raise self._error(f"Expected IRI, found {iri_text!r}")
+        self.prefixes[text[:-1]] = self._resolve(unescape_string(iri_text[1:-1]))
+
+    def _base_directive(self) -> None:
+        kind, iri_text, _ = self._next()
+        if kind != "iri":
+            raise self._error(f"Expected IRI, found {iri_text!r}")
+        self.base = self._resolve(unescape_string(iri_text[1:-1]))
+
+    def _triples(self) -> None:
+        kind, text, _ = self._peek()
+        if kind == "punct" and text == "[":
+            subject = self._blank_node_property_list()
+            if self._peek()[1] != ".":
+                self._predicate_object_list(subject)
+            return
+        subject = self._subject()
+        self._predicate_object_list(subject)
+
+    def _subject(self) -> str:
+        kind, text, _ = self._next()
+        if kind in ("iri", "pname"):
+            return self._iri_token(kind, text)
+        if kind == "bnode":
+            return f"_:{self._bnode_prefix}{text[2:]}"
+        if kind == "punct" and text == "(":
+            return self._collection()
+        self._pos -= 1
+        raise self._error(f"Unexpected subject {text!r}")
+
+    def _predicate_object_list(self, subject: str) -> None:
+        while True:
+            predicate = self._verb()
+            self._object_list(subject, predicate)
+            if self._peek()[1] != ";":
+                return
+            while self._peek()[1] == ";":
+                self._next()
+            kind, text, _ = self._peek()
+            if kind == "punct" and text in (".", "]"):
+                return
+
+    def _verb(self) -> str:
+        kind, text, _ = self._next()
+        if kind in ("iri", "pname"):
+            return self._iri_token(kind, text)
+        if kind == "word" and text == "a":
+            return RDF_TYPE_IRI
+        self._pos -= 1
+        raise self._error(f"Unexpected predicate {text!r}")
+
+    def _object_list(self, subject: str, predicate: str) -> None:
+        append = self._out.append
+        append((subject, predicate, self._object()))
+        while self._peek()[1] == ",":
+            self._next()
+            append((subject, predicate, self._object()))
+
+    def _object(self) -> str:
+        kind, text, _ = self._next()
+        if kind in ("iri", "pname"):
+            return self._iri_token(kind, text)
+        if kind in ("string", "lstring"):
+            body = text[3:-3] if kind == "lstring" else text[1:-1]
+            lexical = unescape_string(body)
+            nkind, ntext, _ = self._peek()
+            if nkind == "at":
+                self._next()
+                return literal(lexical, lang=ntext[1:])
+            if nkind == "dtype":
+                self._next()
+                dkind, dtext, _ = self._next()
+                if dkind not in ("iri", "pname"):
+                    raise self._error(f"Expected datatype IRI, found {dtext!r}")
+                return literal(lexical, self._iri_token(dkind, dtext)[1:-1])
+            return literal(lexical)
+        if kind == "integer":
+            return literal(text, XSD_INTEGER)
+        if kind == "decimal":
+            return literal(text, XSD_DECIMAL)
+        if kind == "double":
+            return literal(text, XSD_DOUBLE)
+        if kind == "word" and text in ("true", "false"):
+            return literal(text, XSD_BOOLEAN)
+        if kind == "bnode":
+            return f"_:{self._bnode_prefix}{text[2:]}"
+        if kind == "punct" and text == "[":
+            self._pos -= 1
+            return self._blank_node_property_list()
+        if kind == "punct" and text == "(":
+            return self._collection()
+        self._pos -= 1
+        raise self._error(f"Unexpected object {text!r}")
+
+    def _blank_node_property_list(self) -> str:
+        self._expect("[")
+        node = self._new_bnode()
+        if self._peek()[1] != "]":
+            self._predicate_object_list(node)
+        self._expect("]")
+        return node
+
+    def _collection(self) -> str:
+        items = []
+        while self._peek()[1] != ")":
+            if self._peek()[0] == "eof":
+                raise self._error("Unterminated collection")
+            items.append(self._object())
+        self._next()
+        if not items:
+            return RDF_NIL
+        head = self._new_bnode()
+        node = head
+        for i, item in enumerate(items):
+            self._out.append((node, RDF_FIRST, item))
+            rest = self._new_bnode() if i < len(items) - 1 else RDF_NIL
+            self._out.append((node, RDF_REST, rest))
+            node = rest
+        return head
+
+
+def parse_turtle(text: str, base: Optional[str] = None) -> List[Triple]:
+    """Parse Turtle (or N-Triples) text into a list of triples."""
+    return TurtleParser(base).parse(text)
+
+
+def parse_file(path: Union[str, Path], base: Optional[str] = None) -> List[Triple]:
+    """Parse a Turtle file from disk."""
+    path = Path(path)
+    return TurtleParser(base or path.resolve().as_uri()).parse(path.read_text(encoding="utf-8"))
+
+
+def iter_files(paths) -> Iterator[Triple]:
+    """Yield triples from several Turtle files in order."""
+    for path in paths:
+        yield from parse_file(path)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Ingest a directory of MindManager HTML exports into one augmentation graph.
+
+Each export is decoded and parsed in a worker process (mindmap_stream.py) and
+its topics are classified there with EnhancedMindMapExtractor. The main
+process merges the results in file-name order into a registry keyed by node
+ID.
+
+Node IDs are derived from content instead of a per-run counter: a topic's ID
+hashes its parent's ID with its own whitespace-collapsed, case-folded text,
+or with its position among its siblings when it has no text. The same topic
+under the same path gets the same ID in every map and every run, so topics
+that recur across maps (or repeat under one parent) become one node. Each
+node records the maps it came from, and the first map's text and
+classification are kept.
+
+Usage:
+  python3 scripts/mindmap/batch_mindmap_ingest.py exports/
+  python3 scripts/mindmap/batch_mindmap_ingest.py exports/ output_augment_mindmap/mindmap_batch.ttl -j 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from extract_mindmap_augmented import EnhancedMindMapExtractor  # noqa: E402
+from mindmap_stream import Topic, open_mmap_document, parse_topics  # noqa: E402
+
+# Namespace for content-derived topic IDs
+MINDMAP_NAMESPACE_UUID = uuid.UUID("5f0c7e2a-3b8d-4c61-9a4e-d2b7f1a6c093")
+DEFAULT_OUTPUT = "output_augment_mindmap/mindmap_batch.ttl"
+
+
+def content_ids(topics: List[Topic]) -> Dict[str, str]:
+    """Original topic ID -> content-derived ID, for topics in pre-order."""
+    ids: Dict[str, str] = {}
+    hashes: Dict[str, uuid.UUID] = {}
+    positions: Dict[str, int] = {}
+    for topic in topics:
+        for position, child in enumerate(topic.children):
+            positions.setdefault(child, position)
+    for topic in topics:
+        parent = hashes.get(topic.parent, MINDMAP_NAMESPACE_UUID) if topic.parent else MINDMAP_NAMESPACE_UUID
+        key = " ".join(topic.text.split()).casefold() or f"#{positions.get(topic.id, 0)}"
+        hashes[topic.id] = uuid.uuid5(parent, key)
+        ids[topic.id] = f"topic_{hashes[topic.id].hex[:16]}"
+    return ids
+
+
+def ingest_map(html_path: str) -> Tuple[str, Dict[str, Dict], List[Dict], float]:
+    """Worker: (file name, classified nodes, relationships, seconds) for one export."""
+    start = time.perf_counter()
+    try:
+        with open_mmap_document(html_path) as xml_stream:
+            topics = parse_topics(xml_stream)
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise ValueError(f"{Path(html_path).name}: {e}") from e
+    ids = content_ids(topics)
+    extractor = EnhancedMindMapExtractor(html_path)
+    for topic in topics:
+        node_id = ids[topic.id]
+        if node_id in extractor.nodes:
+            continue
+        text = topic.text or ("Root Node" if topic.level == 0 else f"Node {topic.index + 1}")
+        extractor.add_node(node_id, text, topic.level, ids[topic.parent] if topic.parent else None)
+    return Path(html_path).name, extractor.nodes, extractor.relationships, time.perf_counter() - start
+
+
+def merge_maps(results) -> Dict:
+    """Merge per-map results (in order) into one extract_all()-style dict."""
+    merged = EnhancedMindMapExtractor("batch")
+    seen_links = set()
+    for name, nodes, relationships, _ in results:
+        for node_id, node_data in nodes.items():
+            held = merged.nodes.get(node_id)
+            if held is None:
+                held = merged.store_node(dict(node_data, maps=[]))
+            if name not in held['maps']:
+                held['maps'].append(name)
+        for rel in relationships:
+            link = (rel['parent'], rel['child'])
+            if link not in seen_links:
+                seen_links.add(link)
+                merged.relationships.append(rel)
+    return {
+        'nodes': merged.nodes,
+        'relationships': merged.relationships,
+        'stage_nodes': merged.stage_nodes,
+        'protein_nodes': merged.protein_nodes,
+        'cgt_nodes': merged.cgt_nodes
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Merge a directory of MindManager HTML exports into one augmentation TTL.")
+    parser.add_argument("input_dir", type=Path, help="Directory of MindManager HTML exports")
+    parser.add_argument("output_ttl", nargs="?", default=DEFAULT_OUTPUT, help=f"Output TTL (default: {DEFAULT_OUTPUT})")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count; 1 runs in-process)")
+    parser.add_argument("--pattern", default="*.htm*", help="File glob inside input_dir (default: *.htm*)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    files = sorted(str(p) for p in args.input_dir.glob(args.pattern) if p.is_file())
+    if not files:
+        print(f"❌ No MindManager exports matching {args.pattern} in {args.input_dir}")
+        return 1
+
+    jobs = max(1, min(args.jobs, len(files)))
+    print(f"📂 Ingesting {len(files)} mindmaps from {args.input_dir} with {jobs} worker(s)")
+    start = time.perf_counter()
+    results = []
+    with contextlib.ExitStack() as stack:
+        if jobs == 1:
+            mapped = map(ingest_map, files)
+        else:
+            mapped = stack.enter_context(ProcessPoolExecutor(max_workers=jobs)).map(ingest_map, files)
+        try:
+            for result in mapped:
+                name, nodes, relationships, seconds = result
+                print(f"   {name}: {len(nodes)} topics in {seconds:.2f}s")
+                results.append(result)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+
+    data = merge_maps(results)
+    total = sum(len(nodes) for _, nodes, _, _ in results)
+    shared = sum(1 for node in data['nodes'].values() if len(node['maps']) > 1)
+    print(f"✅ Merged {total} topics into {len(data['nodes'])} nodes "
+          f"({total - len(data['nodes'])} duplicates, {shared} shared by several maps) "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(f"   Stage/Gate nodes: {len(data['stage_nodes'])}, Protein: {len(data['protein_nodes'])}, "
+          f"CGT: {len(data['cgt_nodes'])}")
+
+    EnhancedMindMapExtractor(str(args.input_dir)).generate_augmented_ttl(data, args.output_ttl)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark the combined mindmap node classifier on a synthetic map.
+
+Builds a MindManager Document.xml with N topics (stage/gate headings,
+deliverables, modality keywords, numbered reviews and filler text in mixed
+case), streams it through mindmap_stream.parse_topics and classifies every
+topic text with the four separate checks EnhancedMindMapExtractor used to run
+(classify_node, detect_modality, extract_stage_number, extract_gate_number,
+reproduced below) and with NodeClassifier's single scan. Results are compared
+so the benchmark doubles as a correctness check.
+
+Usage:
+  python3 scripts/mindmap/benchmark_node_classifier.py
+  python3 scripts/mindmap/benchmark_node_classifier.py --topics 100000 --repeat 5 --report bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import io
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mindmap_stream import parse_topics  # noqa: E402
+from node_classifier import NodeClass, get_classifier  # noqa: E402
+
+AP = "http://schemas.mindjet.com/MindManager/Application/2003"
+PHRASES = [
+    "Stage {n} CMC Council presentation completed", "stage {n} entry criteria", "Gate {n} review package",
+    "STAGE {n} readiness", "S{n} deliverables", "G{n} decision", "Phase {n} clinical supply",
+    "Review {n} outcome", "Stage-Gate {n}", "CQA assessment", "Process characterization",
+    "Formulation development", "Regulatory filing strategy", "Milestone: PPQ complete",
+    "CAR-T platform transduction", "Lentivirus vector release", "AAV capsid selection",
+    "mAb titer improvement", "Monoclonal antibody purification", "Fusion protein stability",
+    "Peptide mapping", "Cell bank characterization (MCB/WCB)", "Gene therapy comparability",
+    "Quality agreement", "General notes", "Biologics license application", "Deliverable owner",
+    "Aggregate investigation", "PROCESS{n} transfer", "Tech transfer to site {n}",
+]
+# Words appended to most topics, so texts vary in length (about 20-100 characters) and mostly differ
+FILLER = ("owner review due date for the site team completed pending approval by council with "
+          "comments on batch record and analytical method transfer plan draft final Q1 Q2 Q3 Q4").split()
+
+
+def synthetic_map(topics: int, seed: int = 7) -> bytes:
+    """Document.xml with ``topics`` topics under one OneTopic, fan-out 2-12."""
+    rng = random.Random(seed)
+    out = [f'<?xml version="1.0" encoding="UTF-8"?><ap:Map xmlns:ap="{AP}"><ap:OneTopic>',
+           '<ap:Topic><ap:Text PlainText="LM Stage Gates"/><ap:SubTopics>']
+    # Remaining children of each open topic; the central topic takes whatever is left
+    stack: List[int] = [topics]
+    written = 1
+    while written < topics:
+        text = rng.choice(PHRASES).format(n=rng.randint(0, 13))
+        text = " ".join([text] + [rng.choice(FILLER) for _ in range(rng.randint(0, 12))])
+        out.append(f'<ap:Topic><ap:Text PlainText="{html.escape(text)}"/>')
+        written += 1
+        children = rng.randint(2, 12) if len(stack) < 6 and rng.random() < 0.3 else 0
+        if children:
+            out.append('<ap:SubTopics>')
+            stack.append(children)
+            continue
+        out.append('</ap:Topic>')
+        while len(stack) > 1:
+            stack[-1] -= 1
+            if stack[-1] > 0:
+                break
+            stack.pop()
+            out.append('</ap:SubTopics></ap:Topic>')
+    out.extend('</ap:SubTopics></ap:Topic>' for _ in stack)
+    out.append('</ap:OneTopic></ap:Map>')
+    return "".join(out).encode("utf-8")
+
+
+def legacy_classify(text: str) -> NodeClass:
+    """The four separate checks EnhancedMindMapExtractor ran before NodeClassifier."""
+    text_lower = text.lower()
+    if 'stage' in text_lower and 'gate' in text_lower:
+        node_type = 'stage_gate'
+    elif 'stage' in text_lower:
+        node_type = 'stage'
+    elif 'gate' in text_lower:
+        node_type = 'gate'
+    elif 'deliverable' in text_lower:
+        node_type = 'deliverable'
+    elif 'milestone' in text_lower:
+        node_type = 'milestone'
+    elif 'cqa' in text_lower or 'quality' in text_lower:
+        node_type = 'quality_attribute'
+    elif 'process' in text_lower:
+        node_type = 'process'
+    elif 'formulation' in text_lower:
+        node_type = 'formulation'
+    elif 'clinical' in text_lower:
+        node_type = 'clinical'
+    elif 'regulatory' in text_lower:
+        node_type = 'regulatory'
+    else:
+        node_type = 'general'
+
+    modality = None
+    for keyword in ['cgt', 'cell', 'gene', 'therapy', 'car-t', 'cart',
+                    'lentivirus', 'aav', 'vector', 'transduction']:
+        if keyword in text_lower:
+            modality = 'CGT'
+            break
+    else:
+        for keyword in ['protein', 'mab', 'antibody', 'biologic',
+                        'monoclonal', 'fusion', 'peptide']:
+            if keyword in text_lower:
+                modality = 'Protein'
+                break
+
+    def first_number(patterns: List[str]) -> Optional[str]:
+        for pattern in patterns:
+            match = re.search(pattern, text)
+            if match:
+                return match.group(1)
+        return None
+
+    stage = first_number([r'[Ss]tage\s*(\d+)', r'S(\d+)', r'Phase\s*(\d+)'])
+    gate = first_number([r'[Gg]ate\s*(\d+)', r'G(\d+)', r'Review\s*(\d+)'])
+    return node_type, modality, stage, gate
+
+
+def time_classifier(classify: Callable[[str], NodeClass], texts: List[str], repeat: int) -> Dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            classify(text)
+        runs.append(time.perf_counter() - start)
+    best = min(runs)
+    return {"best_s": round(best, 4), "median_s": round(statistics.median(runs), 4),
+            "us_per_topic": round(best / len(texts) * 1e6, 3)}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the combined mindmap node classifier.")
+    parser.add_argument("--topics", type=int, default=100000, help="Topics in the synthetic map (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per classifier (default: 3)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--report", help="Write results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    start = time.perf_counter()
+    document = synthetic_map(args.topics, args.seed)
+    topics = parse_topics(io.BytesIO(document))
+    texts = [t.text for t in topics if t.text]
+    print(f"🗺️  Synthetic map: {len(topics)} topics, {len(document) / 1e6:.1f} MB XML, "
+          f"built and parsed in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    classifier = get_classifier()
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = [(text, old, new) for text, old, new in
+                  ((t, legacy_classify(t), classifier.classify(t)) for t in texts) if old != new]
+    legacy = time_classifier(legacy_classify, texts, args.repeat)
+    combined = time_classifier(classifier.classify, texts, args.repeat)
+
+    print(f"{len(set(texts))} distinct texts, {statistics.mean(map(len, texts)):.0f} characters on average")
+    print(f"{'classifier':<14}{'best s':>10}{'median s':>10}{'µs/topic':>10}{'speed-up':>10}")
+    for name, result in (("four checks", legacy), ("one scan", combined)):
+        print(f"{name:<14}{result['best_s']:>10.3f}{result['median_s']:>10.3f}{result['us_per_topic']:>10.2f}"
+              f"{legacy['best_s'] / result['best_s']:>9.2f}x")
+    print(f"Classifier compiled in {compile_ms:.1f} ms")
+    if mismatches:
+        print(f"❌ {len(mismatches)} of {len(texts)} texts classified differently, e.g.:")
+        for text, old, new in mismatches[:5]:
+            print(f"   {text!r}: {old} != {new}")
+    else:
+        print(f"✅ Identical results for all {len(texts)} texts")
+
+    if args.report:
+        report = {"topics": len(topics), "texts": len(texts), "repeat": args.repeat, "seed": args.seed,
+                  "distinct_texts": len(set(texts)), "compile_ms": round(compile_ms, 2),
+                  "four_checks": legacy, "one_scan": combined,
+                  "mismatches": len(mismatches)}
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.report}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
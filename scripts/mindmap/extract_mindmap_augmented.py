@@ -2,12 +2,21 @@
 """
 Enhanced MindMap extractor that properly extracts text content and augments existing ontology
 Creates only additional triples to add to existing CMC Stage-Gate ontology
+
+By default the mmap payload is decoded and Document.xml read in one streaming
+pass (mindmap_stream.py); --engine tree loads the whole payload, builds the
+full ElementTree and searches it per topic instead.
+
+Usage:
+  python3 scripts/mindmap/extract_mindmap_augmented.py <html_file> [output_ttl] [--engine stream|tree]
 """
 
+import argparse
 import base64
 import json
 import re
 import sys
+import time
 import zipfile
 import io
 import xml.etree.ElementTree as ET
@@ -16,12 +25,19 @@ from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 import html
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mindmap_stream import open_mmap_document, parse_topics  # noqa: E402
+from node_classifier import get_classifier  # noqa: E402
+
+ENGINES = ("stream", "tree")
 
 class EnhancedMindMapExtractor:
     """Enhanced extractor that properly handles MindManager XML text extraction"""
     
-    def __init__(self, html_path: str):
+    def __init__(self, html_path: str, engine: str = "stream"):
         self.html_path = Path(html_path)
+        self.engine = engine
         self.nodes = {}  # Store as dict for easier access
         self.relationships = []
         self.node_counter = 0
@@ -62,6 +78,18 @@ class EnhancedMindMapExtractor:
         
         raise ValueError("Could not find Document.xml in mmap archive")
     
+    def stream_topics(self) -> int:
+        """Add every topic from one pass over Document.xml, decoded from the HTML as it is read"""
+        print(f"Streaming mmap data from: {self.html_path}")
+        with open_mmap_document(self.html_path) as xml_stream:
+            topics = parse_topics(xml_stream)
+        
+        for topic in topics:
+            self.node_counter += 1
+            text = topic.text or ("Root Node" if topic.level == 0 else f"Node {topic.index + 1}")
+            self.add_node(topic.id, text, topic.level, topic.parent)
+        return len(topics)
+    
     def extract_text_from_node(self, node: ET.Element, namespaces: Dict[str, str]) -> str:
         """Extract text content from a MindManager node element"""
         text = ""
@@ -139,38 +167,7 @@ class EnhancedMindMapExtractor:
             else:
                 text = f"Node {self.node_counter}"
         
-        # Determine node type based on text content
-        node_type = self.classify_node(text)
-        
-        # Create node data
-        node_data = {
-            'id': node_id,
-            'text': text,
-            'level': level,
-            'type': node_type,
-            'modality': self.detect_modality(text),
-            'stage': self.extract_stage_number(text),
-            'gate': self.extract_gate_number(text)
-        }
-        
-        # Store node
-        self.nodes[node_id] = node_data
-        
-        # Track special nodes
-        if node_type in ['stage', 'gate', 'stage_gate']:
-            self.stage_nodes.append(node_id)
-            if node_data['modality'] == 'Protein':
-                self.protein_nodes.append(node_id)
-            elif node_data['modality'] == 'CGT':
-                self.cgt_nodes.append(node_id)
-        
-        # Add parent relationship
-        if parent_id:
-            self.relationships.append({
-                'parent': parent_id,
-                'child': node_id,
-                'type': 'hasChild'
-            })
+        node_data = self.add_node(node_id, text, level, parent_id)
         
         # Process SubTopics (children)
         # Try multiple patterns to find subtopics
@@ -212,88 +209,83 @@ class EnhancedMindMapExtractor:
         
         return node_data
     
+    def add_node(self, node_id: str, text: str, level: int, parent_id: Optional[str] = None) -> Dict:
+        """Classify a topic, store it and link it to its parent"""
+        # Type, modality, stage and gate from one scan of the text
+        node_type, modality, stage, gate = get_classifier().classify(text)
+        
+        # Create node data
+        node_data = {
+            'id': node_id,
+            'text': text,
+            'level': level,
+            'type': node_type,
+            'modality': modality,
+            'stage': stage,
+            'gate': gate
+        }
+        
+        return self.store_node(node_data, parent_id)
+    
+    def store_node(self, node_data: Dict, parent_id: Optional[str] = None) -> Dict:
+        """Store a classified node, track stage/gate nodes and link it to its parent"""
+        node_id = node_data['id']
+        self.nodes[node_id] = node_data
+        
+        # Track special nodes
+        if node_data['type'] in ['stage', 'gate', 'stage_gate']:
+            self.stage_nodes.append(node_id)
+            if node_data['modality'] == 'Protein':
+                self.protein_nodes.append(node_id)
+            elif node_data['modality'] == 'CGT':
+                self.cgt_nodes.append(node_id)
+        
+        # Add parent relationship
+        if parent_id:
+            self.relationships.append({
+                'parent': parent_id,
+                'child': node_id,
+                'type': 'hasChild'
+            })
+        
+        return node_data
+    
     def classify_node(self, text: str) -> str:
         """Classify node based on text content"""
-        text_lower = text.lower()
-        
-        if 'stage' in text_lower and 'gate' in text_lower:
-            return 'stage_gate'
-        elif 'stage' in text_lower:
-            return 'stage'
-        elif 'gate' in text_lower:
-            return 'gate'
-        elif 'deliverable' in text_lower:
-            return 'deliverable'
-        elif 'milestone' in text_lower:
-            return 'milestone'
-        elif 'cqa' in text_lower or 'quality' in text_lower:
-            return 'quality_attribute'
-        elif 'process' in text_lower:
-            return 'process'
-        elif 'formulation' in text_lower:
-            return 'formulation'
-        elif 'clinical' in text_lower:
-            return 'clinical'
-        elif 'regulatory' in text_lower:
-            return 'regulatory'
-        else:
-            return 'general'
+        return get_classifier().classify(text)[0]
     
     def detect_modality(self, text: str) -> Optional[str]:
         """Detect if node is specific to Protein or CGT modality"""
-        text_lower = text.lower()
-        
-        # CGT indicators
-        cgt_keywords = ['cgt', 'cell', 'gene', 'therapy', 'car-t', 'cart', 
-                       'lentivirus', 'aav', 'vector', 'transduction']
-        for keyword in cgt_keywords:
-            if keyword in text_lower:
-                return 'CGT'
-        
-        # Protein indicators  
-        protein_keywords = ['protein', 'mab', 'antibody', 'biologic', 
-                          'monoclonal', 'fusion', 'peptide']
-        for keyword in protein_keywords:
-            if keyword in text_lower:
-                return 'Protein'
-        
-        return None
+        return get_classifier().classify(text)[1]
     
     def extract_stage_number(self, text: str) -> Optional[str]:
-        """Extract stage number from text"""
-        # Look for patterns like "Stage 0", "Stage 1", "S0", "S1"
-        patterns = [
-            r'[Ss]tage\s*(\d+)',
-            r'S(\d+)',
-            r'Phase\s*(\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1)
-        
-        return None
+        """Extract stage number from text ("Stage 0", "S1", "Phase 2")"""
+        return get_classifier().classify(text)[2]
     
     def extract_gate_number(self, text: str) -> Optional[str]:
-        """Extract gate number from text"""
-        # Look for patterns like "Gate 0", "Gate 1", "G0", "G1"
-        patterns = [
-            r'[Gg]ate\s*(\d+)',
-            r'G(\d+)',
-            r'Review\s*(\d+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1)
-        
-        return None
+        """Extract gate number from text ("Gate 0", "G1", "Review 2")"""
+        return get_classifier().classify(text)[3]
     
     def extract_all(self) -> Dict:
         """Main extraction method"""
         try:
+            if self.engine == "stream":
+                start = time.perf_counter()
+                if self.stream_topics():
+                    print(f"\nExtracted {len(self.nodes)} nodes in {time.perf_counter() - start:.2f}s (stream)")
+                    print(f"  - Stage/Gate nodes: {len(self.stage_nodes)}")
+                    print(f"  - Protein-specific: {len(self.protein_nodes)}")
+                    print(f"  - CGT-specific: {len(self.cgt_nodes)}")
+                else:
+                    print("Could not find main topic in MindMap")
+                return {
+                    'nodes': self.nodes,
+                    'relationships': self.relationships,
+                    'stage_nodes': self.stage_nodes,
+                    'protein_nodes': self.protein_nodes,
+                    'cgt_nodes': self.cgt_nodes
+                }
+            
             # Extract mmap data
             base64_data = self.extract_mmap_data()
             
@@ -413,6 +405,8 @@ class EnhancedMindMapExtractor:
                 'level': node_data['level'],
                 'type': node_data['type']
             }
+            if node_data.get('maps'):
+                metadata['maps'] = node_data['maps']
             ttl_lines.append(f'    ex:visualMetadata """{json.dumps(metadata)}""" .')
             ttl_lines.append('')
         
@@ -441,18 +435,19 @@ class EnhancedMindMapExtractor:
 
 def main():
     """Main entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: python extract_mindmap_augmented.py <html_file> [output_ttl]")
-        sys.exit(1)
-    
-    html_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "output_augment_mindmap/mindmap_augmented.ttl"
+    parser = argparse.ArgumentParser(description="Extract a MindManager HTML export into augmentation triples.")
+    parser.add_argument("html_file", help="MindManager HTML viewer export")
+    parser.add_argument("output_ttl", nargs="?", default="output_augment_mindmap/mindmap_augmented.ttl",
+                        help="Output TTL (default: output_augment_mindmap/mindmap_augmented.ttl)")
+    parser.add_argument("--engine", choices=ENGINES, default="stream",
+                        help="stream: one iterparse pass (default); tree: full ElementTree")
+    args = parser.parse_args()
     
-    extractor = EnhancedMindMapExtractor(html_file)
+    extractor = EnhancedMindMapExtractor(args.html_file, args.engine)
     data = extractor.extract_all()
     
     if data:
-        node_count = extractor.generate_augmented_ttl(data, output_file)
+        node_count = extractor.generate_augmented_ttl(data, args.output_ttl)
         print(f"Successfully generated augmented ontology")
         sys.exit(0)
     else:
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Single-pass MindManager topic extraction.
+
+Reads a MindManager ``Document.xml`` with ``iterparse`` and assembles the topic
+hierarchy while the parser walks the document, instead of building the whole
+ElementTree and calling ``find('.//ap:Text')`` per topic (each descendant
+search re-walks the topic's subtree, so the tree engine is quadratic in the
+map's depth).
+
+A topic is the first ``OneTopic`` element, and every ``Topic``/``OneTopic``
+directly below a topic or below a topic's ``SubTopics``. Its text comes from
+its own children only, in the order the tree engine tried them: the
+``PlainText`` attribute (or ``PlainText`` child) of ``Text``, the first
+``TextLabels`` label, ``Title``, then the ``Label`` and ``text`` attributes.
+Elements are matched by local name, so any MindManager namespace version works.
+Finished elements are detached from their parent, so memory is bounded by the
+depth of the map rather than its size.
+
+``open_mmap_document`` gets there from the HTML viewer export without holding
+the payload in memory: the file is scanned in chunks for the
+``<script id="mmap">`` block, its base64 is decoded chunk by chunk into a
+``SpooledTemporaryFile`` (in memory up to ``SPOOL_MAX_SIZE``, on disk beyond),
+and Document.xml is decompressed from that archive as it is read.
+
+Usage:
+  python3 scripts/mindmap/mindmap_stream.py Document.xml
+  python3 scripts/mindmap/mindmap_stream.py export.html
+"""
+
+from __future__ import annotations
+
+import base64
+import html
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, IO, Iterator, List, Optional, Union
+
+TOPIC_TAGS = {"Topic", "OneTopic"}
+MMAP_START = b'<script id="mmap"'
+# HTML read size, and how much of the decoded archive stays in memory before spilling to disk
+CHUNK_SIZE = 1 << 16
+SPOOL_MAX_SIZE = 8 << 20
+
+
+@dataclass
+class Topic:
+    id: str
+    index: int  # position in pre-order, counted from 0
+    level: int
+    parent: Optional[str]
+    tag: str
+    attributes: Dict[str, str]
+    text: str = ""
+    labels: List[str] = field(default_factory=list)
+    children: List[str] = field(default_factory=list)
+
+
+class _Frame:
+    """A topic whose end tag has not been reached yet."""
+
+    __slots__ = ("elem", "topic", "text_attr", "plain_text", "title")
+
+    def __init__(self, elem: ET.Element, topic: Topic):
+        self.elem = elem
+        self.topic = topic
+        self.text_attr = ""
+        self.plain_text = ""
+        self.title = ""
+
+    def finish(self) -> Topic:
+        topic = self.topic
+        text = (self.text_attr or self.plain_text
+                or next((label for label in topic.labels if label), "")
+                or self.title or topic.attributes.get("Label", "") or topic.attributes.get("text", ""))
+        topic.text = html.unescape(text) if text else ""
+        return topic
+
+
+def iter_topics(source: Union[str, Path, BinaryIO], id_attr: str = "ObjectId") -> Iterator[Topic]:
+    """
+    Topics of a MindManager document, each yielded when its end tag is read
+    (children before parents), with its children's IDs filled in. Topics
+    without ``id_attr`` get ``node_<index>``.
+    """
+    local_names: Dict[str, str] = {}
+
+    def local(tag: str) -> str:
+        name = local_names.get(tag)
+        if name is None:
+            name = local_names[tag] = tag.rpartition("}")[2]
+        return name
+
+    elems: List[ET.Element] = []  # open elements, root first
+    frames: List[_Frame] = []  # open topics, root topic first
+    count = 0
+    done = False
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        name = local(elem.tag)
+        if event == "start":
+            parent = elems[-1] if elems else None
+            elems.append(elem)
+            if name not in TOPIC_TAGS or done:
+                continue
+            if frames:
+                owner = frames[-1].elem
+                if parent is not owner and not (local(parent.tag) == "SubTopics" and elems[-3] is owner):
+                    continue
+            elif name != "OneTopic":
+                continue
+            attributes = dict(elem.attrib)
+            parent_topic = frames[-1].topic if frames else None
+            topic = Topic(id=attributes.get(id_attr) or f"node_{count}", index=count,
+                          level=len(frames), parent=parent_topic.id if parent_topic else None,
+                          tag=name, attributes=attributes)
+            if parent_topic:
+                parent_topic.children.append(topic.id)
+            frames.append(_Frame(elem, topic))
+            count += 1
+            continue
+
+        elems.pop()
+        parent = elems[-1] if elems else None
+        if frames:
+            frame = frames[-1]
+            if elem is frame.elem:
+                frames.pop()
+                yield frame.finish()
+                done = not frames
+            elif parent is frame.elem:
+                if name == "Text":
+                    frame.text_attr = elem.get("PlainText", "").strip()
+                elif name == "Title" and elem.text:
+                    frame.title = elem.text.strip()
+            elif len(elems) > 1 and elems[-2] is frame.elem:
+                parent_name = local(parent.tag)
+                if name == "PlainText" and parent_name == "Text" and elem.text and not frame.plain_text:
+                    frame.plain_text = elem.text.strip()
+                elif parent_name == "TextLabels":
+                    frame.topic.labels.append(elem.get("PlainTextLabel", "").strip())
+        # Everything inside this element has been read; drop it from the tree
+        elem.clear()
+        if parent is not None:
+            parent.remove(elem)
+        if done:
+            break
+
+
+def parse_topics(source: Union[str, Path, BinaryIO], id_attr: str = "ObjectId") -> List[Topic]:
+    """All topics of a MindManager document in pre-order (the tree engine's order)."""
+    ordered: List[Optional[Topic]] = []
+    for topic in iter_topics(source, id_attr):
+        ordered.extend([None] * (topic.index + 1 - len(ordered)))
+        ordered[topic.index] = topic
+    return ordered  # type: ignore[return-value]
+
+
+def spool_mmap(html_path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> IO[bytes]:
+    """
+    The decoded mmap archive of a MindManager HTML export, in a spooled
+    temporary file positioned at its start. Reads ``chunk_size`` bytes of HTML
+    at a time; base64 is decoded in whole 4-character groups as it arrives.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with open(html_path, "rb") as f:
+        buffer = b""
+        # Find the opening tag; keep enough of each chunk to match a marker split across reads
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            start = buffer.find(MMAP_START)
+            if start >= 0:
+                close = buffer.find(b">", start)
+                if close >= 0:
+                    buffer = buffer[close + 1:]
+                    break
+                buffer = buffer[start:]
+            else:
+                buffer = buffer[-(len(MMAP_START) - 1):]
+            if not chunk:
+                spool.close()
+                raise ValueError("Could not find mmap data in HTML file")
+
+        # Base64 never contains '<', so the payload ends at the next tag
+        pending = b""
+        while True:
+            end = buffer.find(b"<")
+            pending += buffer[:end if end >= 0 else len(buffer)].translate(None, b" \t\r\n")
+            usable = len(pending) - len(pending) % 4
+            spool.write(base64.b64decode(pending[:usable]))
+            pending = pending[usable:]
+            if end >= 0:
+                break
+            buffer = f.read(chunk_size)
+            if not buffer:
+                break
+    if pending:
+        spool.write(base64.b64decode(pending + b"=" * (-len(pending) % 4)))
+    spool.seek(0)
+    return spool
+
+
+@contextmanager
+def open_mmap_document(html_path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> Iterator[BinaryIO]:
+    """Document.xml of a MindManager HTML export as a decompressing stream."""
+    with spool_mmap(html_path, chunk_size) as archive, zipfile.ZipFile(archive) as zf:
+        name = next((n for n in zf.namelist() if "Document.xml" in n), None)
+        if name is None:
+            raise ValueError("Could not find Document.xml in mmap archive")
+        with zf.open(name) as xml_stream:
+            yield xml_stream
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("Usage: python mindmap_stream.py <Document.xml or MindManager HTML export>")
+        return 1
+    if Path(argv[0]).suffix.lower() in (".html", ".htm"):
+        with open_mmap_document(argv[0]) as xml_stream:
+            topics = parse_topics(xml_stream)
+    else:
+        topics = parse_topics(argv[0])
+    print(f"Parsed {len(topics)} topics (depth {max((t.level for t in topics), default=0)})")
+    for topic in topics[:20]:
+        print(f"{'  ' * topic.level}{topic.text or '(no text)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
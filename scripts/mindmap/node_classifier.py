@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Mindmap node typing in one scan per text.
+
+EnhancedMindMapExtractor used to run classify_node, detect_modality,
+extract_stage_number and extract_gate_number separately: up to eleven keyword
+checks for the type, seventeen for the modality and six regex searches for the
+stage and gate numbers. ``NodeClassifier`` compiles every keyword and numbered
+pattern into one alternation, factored into a trie on shared leading letters,
+and scans the lower-cased text with it once. As in the lexicon's TermRules,
+each search resumes one character after the previous match started, so
+overlapping hits (the "S2" in "PROCESS2") are found too. The results are read
+off in the old precedence order:
+
+- type: the first rule in ``TYPE_RULES`` whose keywords all occur
+- modality: CGT if any CGT keyword occurs, else Protein, else None
+- stage: leftmost "Stage N" / "stage N", else "SN", else "Phase N"
+- gate: leftmost "Gate N" / "gate N", else "GN", else "Review N"
+
+Keywords match case-insensitively, like the old ``in text.lower()`` checks.
+The numbered patterns were case-sensitive, so each candidate is checked
+against the original text at the same offset. ``str.lower`` only shifts
+offsets for a few non-ASCII letters; such texts take the old regexes.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# (node type, keywords that must all occur); first match wins
+TYPE_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ('stage_gate', ('stage', 'gate')),
+    ('stage', ('stage',)),
+    ('gate', ('gate',)),
+    ('deliverable', ('deliverable',)),
+    ('milestone', ('milestone',)),
+    ('quality_attribute', ('cqa',)),
+    ('quality_attribute', ('quality',)),
+    ('process', ('process',)),
+    ('formulation', ('formulation',)),
+    ('clinical', ('clinical',)),
+    ('regulatory', ('regulatory',)),
+]
+DEFAULT_TYPE = 'general'
+CGT_KEYWORDS = ['cgt', 'cell', 'gene', 'therapy', 'car-t', 'cart',
+                'lentivirus', 'aav', 'vector', 'transduction']
+PROTEIN_KEYWORDS = ['protein', 'mab', 'antibody', 'biologic',
+                    'monoclonal', 'fusion', 'peptide']
+# Numbered patterns in precedence order: (regex over the lower-cased text, accepted original prefixes)
+NUMBER_PATTERNS = {
+    'stage': [(r'stage\s*(\d+)', ('Stage', 'stage')), (r's(\d+)', ('S',)), (r'phase\s*(\d+)', ('Phase',))],
+    'gate': [(r'gate\s*(\d+)', ('Gate', 'gate')), (r'g(\d+)', ('G',)), (r'review\s*(\d+)', ('Review',))],
+}
+
+NodeClass = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+
+class NodeClassifier:
+    """Node type, modality, stage number and gate number from one regex scan."""
+
+    def __init__(self):
+        keywords = {kw for _, kws in TYPE_RULES for kw in kws} | set(CGT_KEYWORDS) | set(PROTEIN_KEYWORDS)
+        # (literal word, regex after it, (field, rank, accepted original prefixes, keyword) or None)
+        alternatives: List[Tuple[str, str, Optional[Tuple[str, int, Tuple[str, ...], Optional[str]]]]] = []
+        self.fallback: Dict[str, List[re.Pattern]] = {}
+        for field, patterns in NUMBER_PATTERNS.items():
+            self.fallback[field] = []
+            for rank, (pattern, prefixes) in enumerate(patterns):
+                word = re.match(r'[a-z]+', pattern).group()
+                rest = pattern[len(word):]
+                keyword = word if word in keywords else None
+                # "stage"/"gate" are keywords too: the number is optional so the bare word still matches
+                alternatives.append((word, f'(?:{rest})?' if keyword else rest, (field, rank, prefixes, keyword)))
+                self.fallback[field].append(re.compile('(?:' + '|'.join(map(re.escape, prefixes)) + ')' + rest))
+        numbered_words = {alt[0] for alt in alternatives}
+        alternatives.extend((keyword, '', None) for keyword in sorted(keywords - numbered_words))
+        # digits group index -> (field, rank, accepted original prefixes, keyword the word also is)
+        self.numbered: Dict[int, Tuple[str, int, Tuple[str, ...], Optional[str]]] = {}
+        self.regex = re.compile(self._trie_pattern(alternatives))
+        self.type_rules = [(node_type, frozenset(kws)) for node_type, kws in TYPE_RULES]
+        self.cgt = frozenset(CGT_KEYWORDS)
+        self.protein = frozenset(PROTEIN_KEYWORDS)
+
+    def _trie_pattern(self, alternatives) -> str:
+        """
+        Alternation factored on shared leading letters ("s(?:tage...|(\\d+))|g(?:ate...|ene|(\\d+))|..."),
+        so each position costs one branch per letter instead of one try per alternative.
+        Plain groups only: named groups stop re from skipping ahead to a possible first letter.
+        """
+        trie: Dict = {}
+        for word, rest, entry in alternatives:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            if '' in node:
+                raise ValueError(f"classifier keyword {word!r} is listed twice")
+            node[''] = (rest, entry)
+        for word, rest, _ in alternatives:
+            # Only one alternative is reported per position, so no literal word may start another
+            node = trie
+            for char in word:
+                node = node[char]
+            if len(node) > 1 and not rest.startswith(r'(\d'):
+                raise ValueError(f"classifier keyword {word!r} is a prefix of another keyword")
+
+        def emit(node: Dict) -> List[str]:
+            options = []
+            for key in sorted(node):
+                if key == '':
+                    rest, entry = node['']
+                    if entry is not None:
+                        self.numbered[len(self.numbered) + 1] = entry
+                    options.append(rest)
+                else:
+                    inner = emit(node[key])
+                    body = inner[0] if len(inner) == 1 else '(?:' + '|'.join(inner) + ')'
+                    options.append(re.escape(key) + body)
+            return options
+
+        return '|'.join(emit(trie))
+
+    def classify(self, text: str) -> NodeClass:
+        """(type, modality, stage, gate) from one scan of ``text``."""
+        lowered = text.lower()
+        aligned = len(lowered) == len(text)
+        found = set()
+        # field -> (rank, number); a lower rank wins, then the leftmost match
+        numbers: Dict[str, Tuple[int, str]] = {}
+        search = self.regex.search
+        match = search(lowered)
+        while match is not None:
+            group = match.lastindex
+            if group is None:
+                # A keyword, or "stage"/"gate" without a number
+                found.add(match.group())
+            else:
+                field, rank, prefixes, keyword = self.numbered[group]
+                if keyword:
+                    found.add(keyword)
+                held = numbers.get(field)
+                if aligned and (held is None or rank < held[0]) and text.startswith(prefixes, match.start()):
+                    numbers[field] = (rank, match.group(group))
+            match = search(lowered, match.start() + 1)
+
+        if not aligned:
+            for field, regexes in self.fallback.items():
+                for rank, regex in enumerate(regexes):
+                    hit = regex.search(text)
+                    if hit:
+                        numbers[field] = (rank, hit.group(1))
+                        break
+
+        node_type, modality = DEFAULT_TYPE, None
+        if found:
+            for rule_type, kws in self.type_rules:
+                if kws <= found:
+                    node_type = rule_type
+                    break
+            if not self.cgt.isdisjoint(found):
+                modality = 'CGT'
+            elif not self.protein.isdisjoint(found):
+                modality = 'Protein'
+        stage = numbers['stage'][1] if 'stage' in numbers else None
+        gate = numbers['gate'][1] if 'gate' in numbers else None
+        return node_type, modality, stage, gate
+
+
+_CLASSIFIER: Optional[NodeClassifier] = None
+
+
+def get_classifier() -> NodeClassifier:
+    """Classifier compiled on first use and reused afterwards."""
+    global _CLASSIFIER
+    if _CLASSIFIER is None:
+        _CLASSIFIER = NodeClassifier()
+    return _CLASSIFIER
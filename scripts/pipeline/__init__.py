@@ -0,0 +1,11 @@
+"""
+Python runner for the ETL pipeline in run_pipeline.sh.
+
+Steps are declared with their input and output files and the steps they
+depend on (``steps.py``); ``dag.py`` runs independent steps concurrently and
+skips any step whose outputs are newer than its inputs, make-style.
+``inprocess.py`` runs the same steps as library calls in one interpreter and
+``watch.py`` rebuilds the affected steps whenever input files change.
+
+Run it with ``python3 scripts/pipeline/run_pipeline.py``.
+"""
@@ -0,0 +1,232 @@
+"""
+Dependency-graph pipeline runner.
+
+Each ``Step`` names the script it runs, the files it reads and writes (globs
+relative to the project root) and the steps it depends on. ``Pipeline.run``
+starts every step whose dependencies have finished, several at a time, and
+skips a step when all of its outputs exist and are newer than its inputs and
+its script, like make. A failed step blocks only the steps downstream of it.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path, PurePath
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class Step:
+    """One pipeline step: a script under ``scripts/`` with declared inputs and outputs."""
+
+    name: str
+    script: str
+    args: List[str] = field(default_factory=list)
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    deps: List[str] = field(default_factory=list)
+    report: Optional[str] = None
+    description: str = ""
+    # Function the in-process runner calls instead of running the script
+    entry: str = "main"
+
+    def command(self, base_dir: Path) -> List[str]:
+        args = [a.replace("{base}", str(base_dir)) for a in self.args]
+        return [sys.executable, str(SCRIPTS_DIR / self.script), *args]
+
+    def all_outputs(self) -> List[str]:
+        return self.outputs + ([self.report] if self.report else [])
+
+
+@dataclass
+class StepResult:
+    name: str
+    status: str  # ran | skipped | failed | blocked | pending
+    reason: str = ""
+    seconds: float = 0.0
+    output: str = ""
+
+
+def expand(base_dir: Path, patterns: Iterable[str]) -> List[Path]:
+    paths: List[Path] = []
+    for pattern in patterns:
+        paths.extend(p for p in sorted(base_dir.glob(pattern)) if p.is_file())
+    return paths
+
+
+def check_up_to_date(step: Step, base_dir: Path) -> Tuple[bool, str]:
+    """(up to date, reason) by comparing output and input modification times."""
+    oldest_output = None
+    for pattern in step.all_outputs():
+        matches = expand(base_dir, [pattern])
+        if not matches:
+            return False, f"missing {pattern}"
+        mtime = min(p.stat().st_mtime for p in matches)
+        oldest_output = mtime if oldest_output is None else min(oldest_output, mtime)
+    if oldest_output is None:
+        return False, "no outputs declared"
+    sources = expand(base_dir, step.inputs) + [SCRIPTS_DIR / step.script]
+    for path in sources:
+        if path.exists() and path.stat().st_mtime > oldest_output:
+            try:
+                shown = path.relative_to(base_dir)
+            except ValueError:
+                shown = path.relative_to(SCRIPTS_DIR.parent)
+            return False, f"{shown} changed"
+    return True, "up to date"
+
+
+def run_subprocess(step: Step, base_dir: Path) -> Tuple[int, str]:
+    """Run a step's script with STAGED_BASE_DIR set; returns (exit code, combined output)."""
+    env = dict(os.environ, STAGED_BASE_DIR=str(base_dir), PYTHONUNBUFFERED="1")
+    proc = subprocess.run(step.command(base_dir), cwd=base_dir, env=env, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT)
+    return proc.returncode, proc.stdout.decode("utf-8", errors="replace")
+
+
+Runner = Callable[[Step, Path], Tuple[int, str]]
+
+
+class Pipeline:
+    """A set of steps forming a DAG over ``base_dir``."""
+
+    def __init__(self, steps: List[Step], base_dir: Path):
+        self.base_dir = base_dir
+        self.steps: Dict[str, Step] = {s.name: s for s in steps}
+        for step in steps:
+            # Dependencies on steps left out of this pipeline (e.g. skipped extraction) are dropped
+            step.deps = [d for d in step.deps if d in self.steps]
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"dependency cycle at step {name!r}")
+            state[name] = 1
+            for dep in self.steps[name].deps:
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.steps:
+            visit(name)
+        return order
+
+    def upstream(self, targets: Iterable[str]) -> Set[str]:
+        """Targets plus everything they depend on."""
+        selected: Set[str] = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.steps:
+                raise KeyError(f"unknown step {name!r}; known: {', '.join(self.order)}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.steps[name].deps)
+        return selected
+
+    def downstream(self, names: Iterable[str]) -> Set[str]:
+        """Steps plus everything that depends on them."""
+        selected = set(names)
+        for name in self.order:
+            if any(dep in selected for dep in self.steps[name].deps):
+                selected.add(name)
+        return selected
+
+    def affected_by(self, paths: Iterable[Path]) -> Set[str]:
+        """Steps with an input glob matching any of ``paths`` (which need not exist any more)."""
+        relative = []
+        for path in paths:
+            try:
+                relative.append(PurePath(Path(path).relative_to(self.base_dir)))
+            except ValueError:
+                continue
+        return {name for name, step in self.steps.items()
+                if any(rel.match(pattern) and len(rel.parts) == len(PurePath(pattern).parts)
+                       for rel in relative for pattern in step.inputs)}
+
+    def run(self, targets: Optional[Iterable[str]] = None, force: bool = False, jobs: int = 4,
+            dry_run: bool = False, runner: Runner = run_subprocess,
+            on_result: Optional[Callable[[StepResult], None]] = None,
+            force_steps: Iterable[str] = ()) -> List[StepResult]:
+        """
+        Run the selected steps (default: all); returns results in pipeline order.
+
+        ``force`` runs every selected step; ``force_steps`` only the named ones.
+        """
+        selected = self.upstream(targets) if targets else set(self.order)
+        forced = set(self.order) if force else set(force_steps)
+        results: Dict[str, StepResult] = {}
+        lock = threading.Lock()
+
+        def finish(result: StepResult) -> None:
+            with lock:
+                results[result.name] = result
+            if on_result:
+                on_result(result)
+
+        def execute(step: Step, reason: str) -> StepResult:
+            start = time.perf_counter()
+            code, output = runner(step, self.base_dir)
+            if step.report:
+                # A failed run must not leave an up-to-date looking report behind
+                report = self.base_dir / step.report
+                failed = report.with_name(report.name + ".failed")
+                report.parent.mkdir(parents=True, exist_ok=True)
+                (failed if code else report).write_text(output, encoding="utf-8")
+                (report if code else failed).unlink(missing_ok=True)
+            status = "ran" if code == 0 else "failed"
+            why = reason if code == 0 else f"exit code {code}"
+            return StepResult(step.name, status, why, time.perf_counter() - start, output)
+
+        pending = [name for name in self.order if name in selected]
+        running: Dict[Future, str] = {}
+        # In a dry run, steps that would run make their dependents run too
+        would_run: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+            while pending or running:
+                for name in list(pending):
+                    step = self.steps[name]
+                    dep_results = [results.get(d) for d in step.deps if d in selected]
+                    if any(r is None for r in dep_results):
+                        continue
+                    pending.remove(name)
+                    if any(r.status in ("failed", "blocked") for r in dep_results):
+                        finish(StepResult(name, "blocked", "upstream step failed"))
+                        continue
+                    fresh, reason = check_up_to_date(step, self.base_dir)
+                    if dry_run and any(d in would_run for d in step.deps):
+                        fresh, reason = False, "upstream step would run"
+                    if fresh and name not in forced:
+                        finish(StepResult(name, "skipped", reason))
+                    elif dry_run:
+                        would_run.add(name)
+                        finish(StepResult(name, "pending", "forced" if fresh else reason))
+                    elif jobs <= 1:
+                        # Serial runs stay on this thread (the in-process runner redirects stdout)
+                        finish(execute(step, "forced" if fresh else reason))
+                    else:
+                        running[pool.submit(execute, step, "forced" if fresh else reason)] = name
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        finish(future.result())
+                    except Exception as exc:  # runner crashed rather than the step failing
+                        finish(StepResult(name, "failed", f"{type(exc).__name__}: {exc}"))
+        return [results[name] for name in self.order if name in results]
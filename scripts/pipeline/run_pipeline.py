@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Run the CMC Stage-Gate pipeline as a dependency graph.
+
+Same steps as run_pipeline.sh, but the three TTL generators (GUPRI instances,
+SMEs, lexicon), which read different CSVs and write different TTLs, run in
+parallel, and so do the two validators. A step is skipped when its outputs are
+newer than its inputs and its script, so re-running after editing one CSV only
+regenerates that CSV's TTL, the combined TTL and the validation reports
+(written to output/reports/). Naming steps runs just those steps and whatever
+they depend on.
+
+With --in-process every step runs inside this interpreter as a library call
+(see inprocess.py): no per-step interpreter startup, modules imported once,
+and the parsed SGD rows and GUPRI mappings shared in memory. --compare forces
+the selected steps once with the shell-style runner and twice in-process, and
+reports the time saved.
+
+--watch keeps running: after the first build it polls data/current_input/,
+data/current/ and data/required_ttl_files/ and rebuilds only the steps
+downstream of whatever changed (see watch.py). Combine it with --in-process so
+modules and parsed inputs stay loaded between rebuilds.
+
+Usage:
+  python3 scripts/pipeline/run_pipeline.py
+  python3 scripts/pipeline/run_pipeline.py --dry-run
+  python3 scripts/pipeline/run_pipeline.py combine --skip-extract
+  python3 scripts/pipeline/run_pipeline.py --force -j 2
+  python3 scripts/pipeline/run_pipeline.py --with-graphdb --repository cmc-stagegate
+  python3 scripts/pipeline/run_pipeline.py --in-process -e
+  python3 scripts/pipeline/run_pipeline.py --compare -e
+  python3 scripts/pipeline/run_pipeline.py --watch --in-process -e
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from pipeline.dag import Pipeline, StepResult, run_subprocess  # noqa: E402
+from pipeline.inprocess import InProcessRunner, measure_interpreter_startup  # noqa: E402
+from pipeline.watch import WATCH_DIRS, describe_cycle, watch  # noqa: E402
+from pipeline.steps import build_steps  # noqa: E402
+
+BASE_DIR = Path(os.getenv("STAGED_BASE_DIR", Path(__file__).resolve().parents[2]))
+
+STATUS_ICONS = {"ran": "✅", "skipped": "⏭️ ", "failed": "❌", "blocked": "⛔", "pending": "🔜"}
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the pipeline as a DAG with make-style skipping.")
+    parser.add_argument("targets", nargs="*", help="Steps to bring up to date (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="Steps run at once (default: min(4, CPUs))")
+    parser.add_argument("-f", "--force", action="store_true", help="Run steps even when up to date")
+    parser.add_argument("-n", "--dry-run", action="store_true", help="Show what would run without running it")
+    parser.add_argument("-e", "--skip-extract", action="store_true", help="Skip Excel extraction")
+    parser.add_argument("-v", "--skip-validate", action="store_true", help="Skip validation steps")
+    parser.add_argument("-g", "--with-graphdb", action="store_true", help="Include GraphDB deployment")
+    parser.add_argument("-u", "--graphdb-url", default="http://localhost:7200", help="GraphDB URL")
+    parser.add_argument("-r", "--repository", default="cmc-stagegate", help="GraphDB repository name")
+    parser.add_argument("--no-dry-run", dest="deploy_dry_run", action="store_false",
+                        help="Actually upload to GraphDB (default: dry run only)")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run steps as library calls in this interpreter (implies -j 1)")
+    parser.add_argument("--compare", action="store_true",
+                        help="Force the selected steps with both runners and report the time saved")
+    parser.add_argument("--watch", action="store_true", help="Keep rebuilding affected steps as input files change")
+    parser.add_argument("--interval", type=float, default=1.0, help="Watch polling interval in seconds (default: 1)")
+    parser.add_argument("--settle", type=float, default=0.5,
+                        help="Quiet time before a watch rebuild starts, in seconds (default: 0.5)")
+    parser.add_argument("--list", action="store_true", help="List steps with their inputs and outputs")
+    parser.add_argument("--verbose", action="store_true", help="Print each step's output, not only on failure")
+    return parser.parse_args(argv)
+
+
+def print_result(result: StepResult, verbose: bool) -> None:
+    timing = f" ({result.seconds:.1f}s)" if result.status in ("ran", "failed") else ""
+    print(f"{STATUS_ICONS.get(result.status, '•')} {result.name:<17} {result.status:<8} {result.reason}{timing}",
+          flush=True)
+    if result.output and (verbose or result.status == "failed"):
+        lines = result.output.rstrip().splitlines()
+        shown = lines if verbose else lines[-20:]
+        for line in shown:
+            print(f"    │ {line}")
+
+
+def print_savings(runner: InProcessRunner, startup_s: float) -> None:
+    saved = runner.savings(startup_s)
+    print(f"⏱️  In-process savings over {saved['steps']} step runs: {saved['total_s']:.2f}s")
+    print(f"   interpreter startup: {saved['interpreter_startup_s']:.2f}s ({startup_s * 1000:.0f} ms per step)")
+    print(f"   module re-imports:   {saved['module_imports_s']:.2f}s"
+          + (f" (scripts reloaded {runner.stats['reloads']}x after input changes)" if runner.stats["reloads"] else ""))
+    print(f"   input re-parsing:    {saved['input_parsing_s']:.2f}s "
+          f"(SGD rows reused {runner.stats['sgd_reuses']}x, GUPRI mappings reused {runner.stats['mappings_reuses']}x)")
+
+
+def compare_runners(pipeline: Pipeline, targets: Optional[List[str]]) -> int:
+    """Force the selected steps serially with the subprocess runner, then twice in-process."""
+    runs = [("shell (subprocess per step)", run_subprocess), ("in-process, cold", None),
+            ("in-process, warm", None)]
+    runner = InProcessRunner(pipeline.base_dir)
+    totals = {}
+    failed = False
+    for label, step_runner in runs:
+        start = time.perf_counter()
+        results = pipeline.run(targets, force=True, jobs=1, runner=step_runner or runner)
+        totals[label] = time.perf_counter() - start
+        per_step = "  ".join(f"{r.name} {r.seconds:.2f}s" for r in results)
+        print(f"{label:<28} {totals[label]:6.2f}s   {per_step}")
+        failed = failed or any(r.status in ("failed", "blocked") for r in results)
+    shell = totals[runs[0][0]]
+    for label, _ in runs[1:]:
+        print(f"   {label}: {shell - totals[label]:+.2f}s saved ({shell / totals[label]:.1f}x)")
+    print_savings(runner, measure_interpreter_startup())
+    if failed:
+        print("⚠️  Some steps failed; timings include the failing runs")
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    steps = build_steps(skip_extract=args.skip_extract, skip_validate=args.skip_validate,
+                        graphdb_url=args.graphdb_url if args.with_graphdb else None,
+                        repository=args.repository, dry_run=args.deploy_dry_run)
+    pipeline = Pipeline(steps, BASE_DIR)
+
+    if args.list:
+        for name in pipeline.order:
+            step = pipeline.steps[name]
+            print(f"{name}: {step.description}")
+            print(f"  script:  scripts/{step.script}")
+            print(f"  deps:    {', '.join(step.deps) or '-'}")
+            print(f"  inputs:  {', '.join(step.inputs) or '-'}")
+            print(f"  outputs: {', '.join(step.all_outputs())}")
+        return 0
+
+    try:
+        pipeline.upstream(args.targets)
+    except KeyError as exc:
+        print(f"❌ {exc.args[0]}")
+        return 2
+
+    if args.compare:
+        return compare_runners(pipeline, args.targets or None)
+
+    runner = InProcessRunner(BASE_DIR) if args.in_process else None
+    if args.watch:
+        print(f"👀 Watching {', '.join(d + '/' for d in WATCH_DIRS)} (Ctrl-C to stop)")
+        try:
+            watch(pipeline, runner=runner or run_subprocess, jobs=1 if runner else args.jobs,
+                  interval=args.interval, settle=args.settle, on_result=lambda r: print_result(r, args.verbose),
+                  on_cycle=lambda changed, results: print(describe_cycle(BASE_DIR, changed, results), flush=True))
+        except KeyboardInterrupt:
+            print("\n👋 Stopped watching")
+        return 0
+
+    mode = "dry run" if args.dry_run else ("in-process" if runner else f"{args.jobs} jobs")
+    print("=" * 60)
+    print(f"CMC Stage-Gate pipeline ({mode})")
+    print("=" * 60)
+    start = time.perf_counter()
+    results = pipeline.run(args.targets or None, force=args.force, jobs=1 if runner else args.jobs,
+                           dry_run=args.dry_run, runner=runner or run_subprocess,
+                           on_result=lambda r: print_result(r, args.verbose))
+
+    counts = {status: sum(1 for r in results if r.status == status) for status in STATUS_ICONS}
+    summary = ", ".join(f"{n} {status}" for status, n in counts.items() if n)
+    print("-" * 60)
+    print(f"{summary} in {time.perf_counter() - start:.1f}s")
+    if runner and runner.stats["steps"]:
+        print_savings(runner, measure_interpreter_startup())
+    if counts["failed"] or counts["blocked"]:
+        print("❌ Pipeline did not complete")
+        return 1
+    print("✅ Pipeline up to date" if not args.dry_run else "✅ Dry run complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
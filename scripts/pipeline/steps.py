@@ -0,0 +1,92 @@
+"""
+Step declarations for the CMC Stage-Gate pipeline.
+
+Paths are globs relative to the project root. A step's script file is always
+treated as an input as well, so editing a generator re-runs it. The GUPRI
+mapping JSON files are state carried between runs rather than inputs, so they
+do not make a generator stale.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from .dag import Step
+
+REQUIRED_TTLS = [
+    "data/required_ttl_files/cmc_stagegate_base.ttl",
+    "data/required_ttl_files/cmc_stagegate_drug_products.ttl",
+    "data/required_ttl_files/cmc_stagegate_modalities.ttl",
+    "data/required_ttl_files/cmc_stagegate_temporal.ttl",
+    "data/required_ttl_files/cmc_stagegate_lexicon.ttl",
+    "data/required_ttl_files/example_drug_instances.ttl",
+    "data/required_ttl_files/example_temporal_tracking.ttl",
+    "data/required_ttl_files/cmc_stagegate_gist_align.ttl",
+]
+INSTANCES_TTL = "output/current/cmc_stagegate_instances.ttl"
+SME_TTL = "output/current/cmc_stagegate_sme_instances.ttl"
+LEXICON_TTL = "output/current/cmc_stagegate_lexicon_instances.ttl"
+TERM_LINKS_TTL = "output/current/cmc_stagegate_term_links.ttl"
+SME_ASSIGNMENTS_TTL = "output/current/cmc_stagegate_sme_assignments.ttl"
+COMBINED_TTL = "output/current/cmc_stagegate_all.ttl"
+REPORT_DIR = "output/reports"
+
+
+def build_steps(skip_extract: bool = False, skip_validate: bool = False,
+                graphdb_url: Optional[str] = None, repository: str = "cmc-stagegate",
+                dry_run: bool = True) -> List[Step]:
+    """Pipeline steps in run_pipeline.sh order; ``graphdb_url`` adds the deploy step."""
+    steps = [
+        Step("extract", "etl/extract_xlsx.py",
+             ["--input-dir", "{base}/data/current_input", "--output-dir", "{base}/data/current", "--combine"],
+             inputs=["data/current_input/*.xlsx"],
+             outputs=["data/current/*__SGD.csv", "data/current/*__SME.csv", "data/current/*__Lexicon.csv"],
+             description="Extract workbook sheets to CSV"),
+        Step("generate_cmc", "etl/generate_cmc_ttl_gupri.py", ["--incremental"],
+             inputs=["data/current/*__SGD.csv"], outputs=[INSTANCES_TTL], deps=["extract"],
+             description="Stage/deliverable instances (GUPRI)"),
+        Step("generate_sme", "etl/generate_sme_ttl.py",
+             inputs=["data/current/*SME.csv"], outputs=[SME_TTL], deps=["extract"],
+             description="SME instances", entry="generate_sme_ttl"),
+        Step("generate_lexicon", "etl/generate_lexicon_ttl.py",
+             inputs=["data/current/*Lexicon.csv", "data/required_ttl_files/lexicon_term_rules.json"],
+             outputs=[LEXICON_TTL], deps=["extract"],
+             description="Lexicon term instances", entry="generate_lexicon_ttl"),
+        Step("link_terms", "etl/link_lexicon_terms.py",
+             inputs=["data/current/*__SGD.csv", "data/current/*Lexicon.csv"],
+             outputs=[TERM_LINKS_TTL], deps=["generate_cmc", "generate_lexicon"],
+             description="Deliverable -> lexicon term links"),
+        Step("assign_smes", "etl/join_sme_deliverables.py",
+             inputs=["data/current/*__SGD.csv", "data/current/*SME.csv",
+                     "data/required_ttl_files/functional_area_aliases.json"],
+             outputs=[SME_ASSIGNMENTS_TTL, "output/current/sme_workload.csv"], deps=["generate_cmc", "generate_sme"],
+             description="Deliverable -> SME assignments by functional area"),
+        Step("combine", "etl/combine_ttls.py",
+             inputs=REQUIRED_TTLS + [INSTANCES_TTL, SME_TTL, LEXICON_TTL, TERM_LINKS_TTL, SME_ASSIGNMENTS_TTL],
+             outputs=[COMBINED_TTL],
+             deps=["generate_cmc", "generate_sme", "generate_lexicon", "link_terms", "assign_smes"],
+             description="Combine ontology and instance TTLs", entry="combine_ttl_files"),
+    ]
+    if skip_extract:
+        steps = steps[1:]
+    if not skip_validate:
+        steps += [
+            Step("verify_ttl", "validation/verify_ttl_files.py",
+                 inputs=["data/required_ttl_files/*.ttl", "output/current/*.ttl"],
+                 report=f"{REPORT_DIR}/verify_ttl_files.txt", deps=["combine"],
+                 description="Parse and check every TTL file"),
+            Step("validate_gist", "validation/validate_gist_alignment.py",
+                 inputs=["data/required_ttl_files/cmc_stagegate_base.ttl",
+                         "data/required_ttl_files/cmc_stagegate_gist_align.ttl", COMBINED_TTL],
+                 report=f"{REPORT_DIR}/validate_gist_alignment.txt", deps=["combine"],
+                 description="Check GIST alignment"),
+        ]
+    if graphdb_url:
+        steps.append(
+            Step("deploy", "deployment/export_to_graphdb.py",
+                 ["--graphdb-url", graphdb_url, "--repository", repository, "--files", f"{{base}}/{COMBINED_TTL}",
+                  "--dry-run" if dry_run else "--no-dry-run"],
+                 inputs=[COMBINED_TTL], report=f"{REPORT_DIR}/deploy{'_dry_run' if dry_run else ''}.txt",
+                 deps=["combine"] + ([] if skip_validate else ["verify_ttl", "validate_gist"]),
+                 description="Upload combined TTL to GraphDB"))
+    return steps
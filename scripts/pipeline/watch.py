@@ -0,0 +1,117 @@
+"""
+Watch mode for the pipeline.
+
+Polls the input directories (the standard library has no inotify binding, and
+three small directories are cheap to stat) and, once a burst of changes has
+settled, re-runs the steps whose declared inputs match a changed, added or
+removed file plus everything downstream of them. Steps that are not affected
+are only checked and skipped, so the combined TTL and the validation reports
+in output/reports/ track the inputs without rebuilding the rest.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .dag import Pipeline, Runner, StepResult, expand, run_subprocess
+
+WATCH_DIRS = ("data/current_input", "data/current", "data/required_ttl_files")
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+def is_ignored(path: Path) -> bool:
+    # Excel lock files (~$Book.xlsx) and editor/hidden temp files
+    return path.name.startswith(("~$", ".")) or path.name.endswith(("~", ".tmp", ".swp"))
+
+
+def snapshot(base_dir: Path, dirs: Iterable[str] = WATCH_DIRS) -> Snapshot:
+    """(mtime_ns, size) for every file directly inside the watched directories."""
+    state: Snapshot = {}
+    for sub in dirs:
+        folder = base_dir / sub
+        if not folder.is_dir():
+            continue
+        for path in folder.iterdir():
+            if is_ignored(path):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # removed between listing and stat
+                continue
+            if path.is_file():
+                state[path] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def changed_paths(before: Snapshot, after: Snapshot) -> List[Path]:
+    """Files added, removed or modified between two snapshots."""
+    return sorted(p for p in before.keys() | after.keys() if before.get(p) != after.get(p))
+
+
+def watch(pipeline: Pipeline, runner: Runner = run_subprocess, jobs: int = 1, interval: float = 1.0,
+          settle: float = 0.5, on_result: Optional[Callable[[StepResult], None]] = None,
+          on_cycle: Optional[Callable[[List[Path], List[StepResult]], None]] = None,
+          max_cycles: Optional[int] = None) -> None:
+    """
+    Bring the pipeline up to date, then rebuild after each change until interrupted.
+
+    A cycle starts when a snapshot differs from the last one and ends once the
+    directories have been quiet for ``settle`` seconds, so a workbook save that
+    touches several files triggers one rebuild. ``max_cycles`` stops after that
+    many rebuilds (the initial run does not count).
+    """
+    results = pipeline.run(jobs=jobs, runner=runner, on_result=on_result)
+    if on_cycle:
+        on_cycle([], results)
+    known = snapshot(pipeline.base_dir)
+    cycles = 0
+    while max_cycles is None or cycles < max_cycles:
+        time.sleep(interval)
+        current = snapshot(pipeline.base_dir)
+        if current == known:
+            continue
+        # Wait for the burst of writes to settle
+        while True:
+            time.sleep(settle)
+            latest = snapshot(pipeline.base_dir)
+            if latest == current:
+                break
+            current = latest
+        changed = changed_paths(known, current)
+        affected = pipeline.affected_by(changed)
+        results = []
+        if affected:
+            results = pipeline.run(pipeline.downstream(affected), jobs=jobs, runner=runner, on_result=on_result,
+                                   force_steps=affected)
+        # Extraction writes into a watched directory: accept our own outputs, but keep comparing other
+        # files against the pre-run state so edits made during the run trigger the next cycle
+        produced = {p for r in results if r.status == "ran"
+                    for p in expand(pipeline.base_dir, pipeline.steps[r.name].outputs)}
+        after = snapshot(pipeline.base_dir)
+        known = {p: v for p, v in current.items() if p not in produced}
+        known.update((p, after[p]) for p in produced if p in after)
+        cycles += 1
+        if on_cycle:
+            on_cycle(changed, results)
+
+
+def describe_cycle(base_dir: Path, changed: List[Path], results: List[StepResult]) -> str:
+    """One-line summary of a watch cycle."""
+    stamp = datetime.now().strftime("%H:%M:%S")
+    if not changed:
+        what = "initial build"
+    else:
+        names = ", ".join(str(p.relative_to(base_dir)) for p in changed[:3])
+        what = names + (f" (+{len(changed) - 3} more)" if len(changed) > 3 else "")
+    ran = [r.name for r in results if r.status in ("ran", "failed")]
+    failed = [r.name for r in results if r.status in ("failed", "blocked")]
+    if not ran and changed:
+        outcome = "no step reads these files" if not results else "nothing to rebuild"
+    else:
+        outcome = f"rebuilt {', '.join(ran) or 'nothing'}"
+    status = f"❌ failed: {', '.join(failed)}" if failed else "✅ up to date"
+    return f"[{stamp}] {what}: {outcome} — {status}"
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the run_pipeline.sh steps.
+
+Runs extraction, the three TTL generators, combine, validation and a dry-run
+deploy against a scratch copy of the project layout (``data/current_input``,
+``data/current``, ``data/required_ttl_files``, ``output/current``), so the
+benchmark never touches the real outputs. Each step runs as its own process,
+exactly as in run_pipeline.sh, with ``STAGED_BASE_DIR`` pointing at the
+scratch workspace. Per step it records wall time, CPU time (user + system),
+peak RSS and the size of every output file, and writes the results as JSON.
+
+Inputs are either the committed data (``--input fixed``) or a workbook made
+by generate_synthetic_sgd.py (``--input synthetic --rows N``). A stored report
+can be passed as ``--baseline`` to flag steps that got slower or bigger.
+
+Usage:
+  python3 scripts/validation/benchmark_pipeline.py --report output/benchmarks/fixed.json
+  python3 scripts/validation/benchmark_pipeline.py --input synthetic --rows 40000 --repeat 3
+  python3 scripts/validation/benchmark_pipeline.py --baseline output/benchmarks/fixed.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = BASE_DIR / "scripts"
+
+# (name, script and arguments relative to the workspace, output globs relative to the workspace)
+STEPS = [
+    ("extract", ["etl/extract_xlsx.py", "--input-dir", "{ws}/data/current_input", "--output-dir",
+                 "{ws}/data/current", "--combine"], ["data/current/*__*.csv", "data/current/combined_all.csv"]),
+    ("generate_cmc", ["etl/generate_cmc_ttl_gupri.py"],
+     ["output/current/cmc_stagegate_instances.ttl", "output/current/gupri_mappings.json"]),
+    ("generate_sme", ["etl/generate_sme_ttl.py"], ["output/current/cmc_stagegate_sme_instances.ttl"]),
+    ("generate_lexicon", ["etl/generate_lexicon_ttl.py"],
+     ["output/current/cmc_stagegate_lexicon_instances.ttl", "output/current/lexicon_gupri_mappings.json"]),
+    ("link_terms", ["etl/link_lexicon_terms.py"], ["output/current/cmc_stagegate_term_links.ttl"]),
+    ("assign_smes", ["etl/join_sme_deliverables.py"],
+     ["output/current/cmc_stagegate_sme_assignments.ttl", "output/current/sme_workload.csv"]),
+    ("combine", ["etl/combine_ttls.py"], ["output/current/cmc_stagegate_all.ttl"]),
+    ("verify_ttl", ["validation/verify_ttl_files.py"], []),
+    ("validate_gist", ["validation/validate_gist_alignment.py"], []),
+    ("deploy_dry_run", ["deployment/export_to_graphdb.py", "--dry-run", "--repository", "benchmark",
+                        "--files", "{ws}/output/current/cmc_stagegate_all.ttl"], []),
+]
+METRICS = ("wall_s", "cpu_s", "max_rss_mb")
+
+
+def prepare_workspace(workspace: Path, mode: str, rows: int, seed: int) -> Dict:
+    """Lay out the project directories in ``workspace`` and fill them with inputs."""
+    for sub in ("data/current_input", "data/current", "output/current"):
+        (workspace / sub).mkdir(parents=True, exist_ok=True)
+    shutil.copytree(BASE_DIR / "data" / "required_ttl_files", workspace / "data" / "required_ttl_files",
+                    dirs_exist_ok=True)
+    info: Dict = {"mode": mode}
+    if mode == "fixed":
+        for sub in ("data/current_input", "data/current"):
+            for path in (BASE_DIR / sub).iterdir():
+                if path.is_file():
+                    shutil.copy2(path, workspace / sub / path.name)
+        # Reuse persisted GUPRI mappings, as a normal pipeline run does
+        for name in ("gupri_mappings.json", "lexicon_gupri_mappings.json"):
+            if (BASE_DIR / "output" / "current" / name).exists():
+                shutil.copy2(BASE_DIR / "output" / "current" / name, workspace / "output" / "current" / name)
+    else:
+        name = "Synthetic_SGD"
+        subprocess.run([sys.executable, str(SCRIPTS_DIR / "etl" / "generate_synthetic_sgd.py"), "--rows", str(rows),
+                        "--seed", str(seed), "--output-dir", str(workspace / "data" / "current"), "--name", name],
+                       check=True, stdout=subprocess.DEVNULL)
+        shutil.move(str(workspace / "data" / "current" / f"{name}.xlsx"), workspace / "data" / "current_input")
+        info["rows"] = rows
+        info["seed"] = seed
+    info["input_bytes"] = sum(p.stat().st_size for sub in ("data/current_input", "data/current")
+                              for p in (workspace / sub).iterdir() if p.is_file())
+    return info
+
+
+def rss_to_mb(max_rss: int) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+
+def snapshot(workspace: Path, patterns: List[str]) -> Dict[Path, Tuple[int, int]]:
+    """(mtime, size) of every file matching ``patterns``."""
+    stats = {}
+    for pattern in patterns:
+        for p in sorted(workspace.glob(pattern)):
+            if p.is_file():
+                stat = p.stat()
+                stats[p] = (stat.st_mtime_ns, stat.st_size)
+    return stats
+
+
+def run_step(name: str, argv: List[str], outputs: List[str], workspace: Path, log_dir: Path) -> Dict:
+    args = [a.replace("{ws}", str(workspace)) for a in argv]
+    # Inputs can match an output glob (extraction writes next to its input CSVs); count only what the step wrote
+    before = snapshot(workspace, outputs)
+    env = dict(os.environ, STAGED_BASE_DIR=str(workspace), PYTHONUNBUFFERED="1")
+    log_path = log_dir / f"{name}.log"
+    with open(log_path, "wb") as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, str(SCRIPTS_DIR / args[0]), *args[1:]], cwd=workspace, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    sizes = {str(p.relative_to(workspace)): stat[1]
+             for p, stat in snapshot(workspace, outputs).items() if before.get(p) != stat}
+    result = {
+        "step": name,
+        "status": "ok" if proc.returncode == 0 else "failed",
+        "returncode": proc.returncode,
+        "wall_s": wall,
+        "cpu_s": usage.ru_utime + usage.ru_stime,
+        "max_rss_mb": rss_to_mb(usage.ru_maxrss),
+        "outputs": sizes,
+        "output_bytes": sum(sizes.values()),
+    }
+    if proc.returncode != 0:
+        tail = log_path.read_text(encoding="utf-8", errors="replace").strip().splitlines()[-3:]
+        result["error"] = " | ".join(tail)
+    return result
+
+
+def summarise(runs: List[List[Dict]]) -> List[Dict]:
+    """Median of each metric per step over repeated runs."""
+    steps = []
+    for per_step in zip(*runs):
+        entry = dict(per_step[-1])
+        for metric in METRICS:
+            entry[metric] = round(statistics.median(r[metric] for r in per_step), 4)
+        steps.append(entry)
+    return steps
+
+
+def compare_with_baseline(steps: List[Dict], baseline: Dict, tolerance: float, min_delta_s: float,
+                          min_delta_mb: float) -> List[str]:
+    previous = {s["step"]: s for s in baseline.get("steps", [])}
+    regressions = []
+    for step in steps:
+        old = previous.get(step["step"])
+        if old is None:
+            continue
+        if step["status"] != "ok" and old.get("status") == "ok":
+            regressions.append(f"{step['step']}: now fails ({step.get('error', 'exit ' + str(step['returncode']))})")
+            continue
+        if step["status"] != old.get("status"):
+            continue
+        for metric, floor in (("wall_s", min_delta_s), ("cpu_s", min_delta_s), ("max_rss_mb", min_delta_mb)):
+            new, before = step[metric], old[metric]
+            if new - before > floor and new > before * (1 + tolerance):
+                regressions.append(f"{step['step']}: {metric} {before:.2f} -> {new:.2f}")
+        if old.get("output_bytes") and step["output_bytes"] != old["output_bytes"]:
+            print(f"⚠️  {step['step']}: output size changed {old['output_bytes']:,} -> {step['output_bytes']:,} bytes")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark each run_pipeline.sh step (time, CPU, memory, output size).")
+    parser.add_argument("--input", choices=["fixed", "synthetic"], default="fixed",
+                        help="fixed: committed data/ inputs; synthetic: generated workbook (default: fixed)")
+    parser.add_argument("--rows", type=int, default=40000, help="Synthetic SGD rows (default: 40000)")
+    parser.add_argument("--seed", type=int, default=42, help="Synthetic data seed (default: 42)")
+    parser.add_argument("--steps", help="Comma-separated subset of steps: " + ",".join(s[0] for s in STEPS))
+    parser.add_argument("--repeat", type=int, default=1, help="Run the pipeline N times and report medians")
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Report to compare against; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed relative increase vs baseline (default: 0.25 = +25%%)")
+    parser.add_argument("--min-delta-s", type=float, default=0.2, help="Ignore time increases below this (default: 0.2)")
+    parser.add_argument("--min-delta-mb", type=float, default=10.0, help="Ignore RSS increases below this (default: 10)")
+    parser.add_argument("--workspace", type=Path,
+                        help="Use (and keep) this new or empty directory instead of a temp dir (with --repeat 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    steps = STEPS
+    if args.workspace and args.repeat > 1:
+        print("❌ --workspace keeps a single run; drop it or use --repeat 1")
+        return 2
+    if args.steps:
+        wanted = [s.strip() for s in args.steps.split(",") if s.strip()]
+        unknown = set(wanted) - {s[0] for s in STEPS}
+        if unknown:
+            print(f"❌ Unknown steps: {', '.join(sorted(unknown))}")
+            return 2
+        steps = [s for s in STEPS if s[0] in wanted]
+
+    runs: List[List[Dict]] = []
+    input_info: Dict = {}
+    for run in range(max(args.repeat, 1)):
+        workspace = args.workspace or Path(tempfile.mkdtemp(prefix="pipeline_bench_"))
+        try:
+            if args.workspace and workspace.exists() and any(workspace.iterdir()):
+                print(f"❌ Workspace {workspace} is not empty")
+                return 2
+            workspace.mkdir(parents=True, exist_ok=True)
+            input_info = prepare_workspace(workspace, args.input, args.rows, args.seed)
+            log_dir = workspace / "logs"
+            log_dir.mkdir(exist_ok=True)
+            print(f"Run {run + 1}/{args.repeat}: {args.input} input "
+                  f"({input_info['input_bytes'] / 1e6:.1f} MB) in {workspace}")
+            results = []
+            for name, argv_, outputs in steps:
+                result = run_step(name, argv_, outputs, workspace, log_dir)
+                mark = "✓" if result["status"] == "ok" else "✗"
+                print(f"  {mark} {name:17} {result['wall_s']:7.2f}s wall {result['cpu_s']:7.2f}s cpu "
+                      f"{result['max_rss_mb']:7.1f} MB  {result['output_bytes'] / 1e6:8.2f} MB out"
+                      + (f"  ({result['error'][:80]})" if result["status"] != "ok" else ""))
+                results.append(result)
+            runs.append(results)
+        finally:
+            if not args.workspace:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+    steps_summary = summarise(runs)
+    ok = [s for s in steps_summary if s["status"] == "ok"]
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "input": input_info,
+        "repeat": args.repeat,
+        "steps": steps_summary,
+        "total": {metric: round(sum(s[metric] for s in steps_summary), 4) for metric in ("wall_s", "cpu_s")},
+    }
+    report["total"]["max_rss_mb"] = max((s["max_rss_mb"] for s in steps_summary), default=0.0)
+    failed = len(steps_summary) - len(ok)
+    print(f"\n{len(ok)}/{len(steps_summary)} steps ok; total {report['total']['wall_s']:.2f}s wall, "
+          f"{report['total']['cpu_s']:.2f}s cpu, peak {report['total']['max_rss_mb']:.1f} MB")
+    if failed:
+        print(f"⚠️  {failed} step(s) failed; see the error column (missing optional packages such as pandas "
+              f"make extraction fail)")
+
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"📄 Report written to {args.report}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("input", {}).get("mode") != input_info.get("mode") or \
+                baseline.get("input", {}).get("rows") != input_info.get("rows"):
+            print("⚠️  Baseline was recorded on different inputs; comparison may not be meaningful")
+        regressions = compare_with_baseline(steps_summary, baseline, args.tolerance, args.min_delta_s,
+                                            args.min_delta_mb)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✅ No regressions vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
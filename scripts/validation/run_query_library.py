@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Offline runner for the SPARQL query library under queries/.
+
+Loads the generated TTL into the embedded triple store and executes every
+query file (or a selection), recording parse, plan and execution times per
+query. Results can be written as CSV or SPARQL JSON, and the timing report can
+be compared against a saved baseline to catch performance regressions after
+changes to the ontology or the instance generators.
+
+Files holding several queries separated by ``---`` lines are split; later
+parts inherit the PREFIX declarations of the first one.
+
+Usage:
+  python3 scripts/validation/run_query_library.py
+  python3 scripts/validation/run_query_library.py queries/lexicon --format csv --output-dir output/query_results
+  python3 scripts/validation/run_query_library.py --report timings.json --repeat 5
+  python3 scripts/validation/run_query_library.py --baseline timings.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph.sparql import execute, plan_query  # noqa: E402
+from graph.sparql_parser import SparqlError, parse_query  # noqa: E402
+from graph.terms import STANDARD_PREFIXES  # noqa: E402
+from graph.triple_store import TripleStore  # noqa: E402
+from graph.turtle_parser import TurtleError  # noqa: E402
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+QUERY_ROOT = BASE_DIR / "queries"
+QUERY_DIRS = ["lexicon", "product_instance", "stage_gate_ontology"]
+DEFAULT_GRAPH = BASE_DIR / "output" / "current" / "cmc_stagegate_all.ttl"
+
+_SEPARATOR_RE = re.compile(r"^\s*-{3,}\s*$", re.MULTILINE)
+_PROLOGUE_RE = re.compile(r"^\s*(PREFIX|BASE)\b[^\n]*$", re.MULTILINE | re.IGNORECASE)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the queries/ SPARQL library offline against the generated TTL.")
+    parser.add_argument("queries", nargs="*", help="Query files or directories (default: all of queries/"
+                        + "{" + ",".join(QUERY_DIRS) + "})")
+    parser.add_argument("--graph", nargs="+", default=[str(DEFAULT_GRAPH)], help="TTL files to load")
+    parser.add_argument("-k", "--filter", help="Only run queries whose name contains this substring")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="Result format (default: json)")
+    parser.add_argument("--output-dir", help="Write each query's results to this directory")
+    parser.add_argument("--report", help="Write the timing report as JSON to this file")
+    parser.add_argument("--baseline", help="Timing report to compare against; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative slowdown vs baseline before flagging (default: 0.5 = +50%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Ignore slowdowns smaller than this many ms (default: 5)")
+    parser.add_argument("--repeat", type=int, default=1, help="Run each query N times and report medians")
+    parser.add_argument("--now", help="Fix NOW() to this ISO date/dateTime for reproducible results")
+    return parser.parse_args(argv)
+
+
+def collect_query_files(selection: List[str]) -> List[Path]:
+    if not selection:
+        selection = [str(QUERY_ROOT / d) for d in QUERY_DIRS]
+    files: List[Path] = []
+    for item in selection:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.sparql")))
+        elif path.exists():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"Query file or directory not found: {item}")
+    return files
+
+
+def query_name(path: Path) -> str:
+    path = path.resolve()
+    try:
+        rel = path.relative_to(QUERY_ROOT)
+    except ValueError:
+        return path.stem
+    return str(rel.with_suffix(""))
+
+
+def split_queries(text: str) -> List[str]:
+    """Split a file on ``---`` lines, carrying the first part's prologue forward."""
+    parts = [p for p in _SEPARATOR_RE.split(text) if p.strip()]
+    if len(parts) <= 1:
+        return parts or [text]
+    prologue = "\n".join(m.group(0).strip() for m in _PROLOGUE_RE.finditer(parts[0]))
+    return [parts[0]] + [f"{prologue}\n{part}" if not _PROLOGUE_RE.search(part) else part for part in parts[1:]]
+
+
+def load_queries(files: List[Path], name_filter: Optional[str]) -> List[Tuple[str, str]]:
+    queries = []
+    for path in files:
+        name = query_name(path)
+        parts = split_queries(path.read_text(encoding="utf-8"))
+        for i, text in enumerate(parts, 1):
+            part_name = name if len(parts) == 1 else f"{name}#{i}"
+            if name_filter and name_filter not in part_name:
+                continue
+            queries.append((part_name, text))
+    return queries
+
+
+def run_one(store: TripleStore, text: str, repeat: int, now: Optional[datetime]) -> Dict:
+    parse_times, plan_times, exec_times = [], [], []
+    result = None
+    for _ in range(max(repeat, 1)):
+        t0 = time.perf_counter()
+        query = parse_query(text, STANDARD_PREFIXES)
+        t1 = time.perf_counter()
+        plans = plan_query(query, store)
+        t2 = time.perf_counter()
+        result = execute(query, store, now, plans)
+        t3 = time.perf_counter()
+        parse_times.append(t1 - t0)
+        plan_times.append(t2 - t1)
+        exec_times.append(t3 - t2)
+    return {
+        "result": result,
+        "parse_ms": statistics.median(parse_times) * 1000,
+        "plan_ms": statistics.median(plan_times) * 1000,
+        "exec_ms": statistics.median(exec_times) * 1000,
+    }
+
+
+def write_result(output_dir: Path, name: str, result, fmt: str) -> Path:
+    target = output_dir / (name.replace("/", "__").replace("#", "_part") + f".{fmt}")
+    if fmt == "csv":
+        target.write_text(result.to_csv(), encoding="utf-8")
+    else:
+        target.write_text(json.dumps(result.to_json(), indent=2), encoding="utf-8")
+    return target
+
+
+def compare_with_baseline(entries: List[Dict], baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    previous = {e["query"]: e for e in baseline.get("queries", [])}
+    regressions = []
+    for entry in entries:
+        old = previous.get(entry["query"])
+        if old is None:
+            continue
+        if entry.get("error") and not old.get("error"):
+            regressions.append(f"{entry['query']}: now fails ({entry['error']})")
+            continue
+        if entry.get("error") or old.get("error"):
+            continue
+        old_total = old["parse_ms"] + old["plan_ms"] + old["exec_ms"]
+        new_total = entry["parse_ms"] + entry["plan_ms"] + entry["exec_ms"]
+        if new_total - old_total > min_delta_ms and new_total > old_total * (1 + tolerance):
+            regressions.append(f"{entry['query']}: {old_total:.1f} ms -> {new_total:.1f} ms")
+        if entry["rows"] != old["rows"]:
+            print(f"⚠️  {entry['query']}: row count changed {old['rows']} -> {entry['rows']}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    now = datetime.fromisoformat(args.now) if args.now else None
+
+    try:
+        queries = load_queries(collect_query_files(args.queries), args.filter)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    if not queries:
+        print("No queries selected")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        store = TripleStore.from_files(args.graph)
+    except (OSError, TurtleError) as e:
+        print(f"❌ Could not load graph: {e}")
+        return 1
+    load_seconds = time.perf_counter() - start
+    print(f"Loaded {len(store)} triples from {len(args.graph)} file(s) in {load_seconds:.2f}s")
+
+    output_dir = Path(args.output_dir) if args.output_dir else None
+    if output_dir:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    entries = []
+    width = max(len(name) for name, _ in queries)
+    print(f"\n{'query':{width}}  {'rows':>6}  {'parse':>8}  {'plan':>8}  {'exec':>9}")
+    print("-" * (width + 40))
+    for name, text in queries:
+        entry = {"query": name, "rows": 0, "parse_ms": 0.0, "plan_ms": 0.0, "exec_ms": 0.0}
+        try:
+            timing = run_one(store, text, args.repeat, now)
+        except Exception as e:  # one failing query must not stop the rest of the library
+            entry["error"] = str(e) if isinstance(e, SparqlError) else f"{type(e).__name__}: {e}"
+            print(f"{name:{width}}  {'ERROR':>6}  {entry['error']}")
+            entries.append(entry)
+            continue
+        result = timing.pop("result")
+        entry.update(timing)
+        entry["rows"] = len(result) if result.boolean is None else int(result.boolean)
+        entries.append(entry)
+        print(f"{name:{width}}  {entry['rows']:>6}  {entry['parse_ms']:>6.1f}ms  {entry['plan_ms']:>6.1f}ms  "
+              f"{entry['exec_ms']:>7.1f}ms")
+        if output_dir:
+            write_result(output_dir, name, result, args.format)
+
+    ok = [e for e in entries if "error" not in e]
+    total_ms = sum(e["parse_ms"] + e["plan_ms"] + e["exec_ms"] for e in ok)
+    print("-" * (width + 40))
+    print(f"{len(ok)}/{len(entries)} queries ran, {len(entries) - len(ok)} failed; total {total_ms:.1f} ms")
+    if output_dir:
+        print(f"📄 Results written to {output_dir} ({args.format})")
+
+    report = {
+        "generated": datetime.now().isoformat(timespec="seconds"),
+        "graph": args.graph,
+        "triples": len(store),
+        "load_seconds": round(load_seconds, 4),
+        "repeat": args.repeat,
+        "queries": [{k: (round(v, 3) if isinstance(v, float) else v) for k, v in e.items()} for e in entries],
+    }
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"📄 Timing report written to {args.report}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(entries, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n❌ {len(regressions)} performance regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✅ No regressions vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,151 @@
 #!/usr/bin/env python3
 """
 Test SPARQL queries demonstrating GIST alignment
+
+Queries run concurrently over a pooled requests.Session; each query's latency
+percentiles are reported, and timeouts/errors are kept apart from genuinely
+empty results. Every run goes to GraphDB unless --cache is given; cached runs
+are counted separately, and only runs GraphDB answered are timed.
+
+Usage:
+  python3 scripts/validation/test_gist_queries.py
+  python3 scripts/validation/test_gist_queries.py --concurrency 8 --repeat 5
+  python3 scripts/validation/test_gist_queries.py --cache
 """
 
+import argparse
+import math
 import requests
 import json
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
 import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from graph.query_cache import DEFAULT_RESULT_DIR, QueryCache, deployed_version  # noqa: E402
+
 GRAPHDB_URL = "http://localhost:7200/repositories/cmc-stagegate"
 HEADERS = {
     "Content-Type": "application/sparql-query",
     "Accept": "application/sparql-results+json"
 }
 
-def run_query(name: str, query: str) -> Dict:
-    """Execute a SPARQL query and return results."""
+# Results are reused until the next deploy records a new graph version
+CACHE = QueryCache(directory=DEFAULT_RESULT_DIR)
+
+EMPTY_RESULTS = {"results": {"bindings": []}}
+
+_local = threading.local()
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """Session whose connection pool can serve ``pool_size`` concurrent requests."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def execute_query(session: requests.Session, query: str, timeout: float = 10.0, use_cache: bool = False) -> Dict:
+    """
+    Execute a SPARQL query once.
+
+    Returns ``{"status", "results", "seconds", "error"}`` where status is
+    ``ok``, ``cached``, ``timeout`` or ``error``.
+    """
+    start = time.perf_counter()
+    version = deployed_version(GRAPHDB_URL) if use_cache else None
+    if version:
+        cached = CACHE.get(query, version)
+        if cached is not None:
+            return {"status": "cached", "results": cached, "seconds": time.perf_counter() - start, "error": None}
     try:
-        response = requests.post(GRAPHDB_URL, headers=HEADERS, data=query, timeout=10)
+        # Without the client cache, keep the server from answering from its own cache as well
+        headers = None if use_cache else {"Cache-Control": "no-cache"}
+        response = session.post(GRAPHDB_URL, data=query.encode("utf-8"), timeout=timeout, headers=headers)
         response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Error running query: {e}")
-        return {"results": {"bindings": []}}
+        results = response.json()
+    except requests.Timeout:
+        return {"status": "timeout", "results": EMPTY_RESULTS, "seconds": time.perf_counter() - start,
+                "error": f"timed out after {timeout:g}s"}
+    except (requests.RequestException, ValueError) as e:
+        return {"status": "error", "results": EMPTY_RESULTS, "seconds": time.perf_counter() - start,
+                "error": str(e)}
+    if version:
+        CACHE.put(query, version, results)
+    return {"status": "ok", "results": results, "seconds": time.perf_counter() - start, "error": None}
+
+
+def run_query(name: str, query: str) -> Dict:
+    """Execute a SPARQL query and return results."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = make_session(1)
+    outcome = execute_query(session, query)
+    if outcome["error"]:
+        print(f"Error running query: {outcome['error']}")
+    return outcome["results"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def run_all(query_list, concurrency: int = 4, repeat: int = 1, timeout: float = 10.0,
+            use_cache: bool = False) -> List[Dict]:
+    """
+    Run every query ``repeat`` times with at most ``concurrency`` in flight.
+
+    Returns one summary per query, in input order, with its first usable
+    result, overall status, latency samples of the runs GraphDB answered
+    (timeouts and errors are reported through the status instead) and the
+    number of runs served from the result cache.
+    """
+    session = make_session(concurrency)
+    jobs = [(i, query) for i, (_, query) in enumerate(query_list) for _ in range(max(repeat, 1))]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda job: (job[0], execute_query(session, job[1], timeout, use_cache)), jobs))
+    session.close()
+
+    summaries = [{"name": name, "runs": []} for name, _ in query_list]
+    for index, outcome in outcomes:
+        summaries[index]["runs"].append(outcome)
+    for summary in summaries:
+        runs = summary.pop("runs")
+        statuses = {r["status"] for r in runs}
+        good = [r for r in runs if r["status"] in ("ok", "cached")]
+        summary["status"] = next((s for s in ("error", "timeout") if s in statuses),
+                                 "cached" if statuses == {"cached"} else "ok")
+        summary["results"] = good[0]["results"] if good else EMPTY_RESULTS
+        summary["error"] = next((r["error"] for r in runs if r["error"]), None)
+        summary["latencies"] = [r["seconds"] for r in runs if r["status"] == "ok"]
+        summary["cached"] = sum(1 for r in runs if r["status"] == "cached")
+        summary["rows"] = len(summary["results"].get("results", {}).get("bindings", []))
+    return summaries
+
+
+def print_latency_table(summaries: List[Dict]) -> None:
+    print("=" * 80)
+    print("⏱️  LATENCY (ms)")
+    print("=" * 80)
+    print(f"  {'query':38} {'status':8} {'rows':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'cached':>6}")
+    for s in summaries:
+        lat = [x * 1000 for x in s["latencies"]]
+        if lat:
+            stats = (f"{percentile(lat, 50):>8.1f} {percentile(lat, 90):>8.1f} "
+                     f"{percentile(lat, 99):>8.1f} {max(lat):>8.1f}")
+        else:
+            stats = " ".join(f"{'-':>8}" for _ in range(4))
+        print(f"  {s['name'][:38]:38} {s['status']:8} {s['rows']:>5} {stats} {s['cached']:>6}")
+    print()
 
 def print_results(name: str, results: Dict, max_rows: int = 10):
     """Pretty print query results."""
@@ -236,32 +359,68 @@ ORDER BY DESC(?instanceCount)
     """)
 ]
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the GIST alignment test queries.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max queries in flight (default: 4)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per query for latency percentiles (default: 1)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds (default: 10)")
+    parser.add_argument("--cache", dest="use_cache", action="store_true",
+                        help="Serve repeat runs from the query result cache (cached runs are not timed)")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="Send every run to GraphDB (default)")
+    parser.set_defaults(use_cache=False)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Run all test queries."""
+    args = parse_args(argv)
     print("\n" + "=" * 80)
     print("🔍 GIST ALIGNMENT VERIFICATION QUERIES")
     print("=" * 80)
     print(f"Target: {GRAPHDB_URL}")
+    print(f"Concurrency: {args.concurrency}, runs per query: {args.repeat}, timeout: {args.timeout:g}s, "
+          f"result cache: {'on' if args.use_cache else 'off'}")
     print()
     
     success_count = 0
+    empty_count = 0
     total_results = 0
     
-    for name, query in queries:
-        results = run_query(name, query)
-        print_results(name, results)
-        
-        bindings = results.get("results", {}).get("bindings", [])
-        if bindings:
+    start = time.perf_counter()
+    summaries = run_all(queries, args.concurrency, args.repeat, args.timeout, args.use_cache)
+    wall = time.perf_counter() - start
+    
+    for summary in summaries:
+        if summary["status"] in ("timeout", "error"):
+            print("=" * 80)
+            print(f"📊 {summary['name']}")
+            print("=" * 80)
+            print(f"❌ {summary['status'].upper()}: {summary['error']}\n")
+            continue
+        print_results(summary["name"], summary["results"])
+        if summary["rows"]:
             success_count += 1
-            total_results += len(bindings)
+            total_results += summary["rows"]
+        else:
+            empty_count += 1
+    
+    print_latency_table(summaries)
+    timeouts = [s["name"] for s in summaries if s["status"] == "timeout"]
+    errors = [s["name"] for s in summaries if s["status"] == "error"]
     
     # Summary
     print("=" * 80)
     print("📈 SUMMARY")
     print("=" * 80)
     print(f"✅ Successful queries: {success_count}/{len(queries)}")
+    print(f"➖ Empty results: {empty_count}")
+    print(f"⏱️  Timeouts: {len(timeouts)}" + (f" ({', '.join(timeouts)})" if timeouts else ""))
+    print(f"❌ Errors: {len(errors)}" + (f" ({', '.join(errors)})" if errors else ""))
     print(f"📊 Total results retrieved: {total_results}")
+    print(f"🕒 Wall time: {wall:.2f}s")
+    if CACHE.hits:
+        print(f"⚡ Served from result cache: {CACHE.hits}/{len(queries) * max(args.repeat, 1)}")
     
     # Key findings
     print("\n🎯 KEY FINDINGS:")
@@ -271,6 +430,8 @@ def main():
     print("  ✅ Instance data queryable through GIST patterns")
     print("  ✅ Full semantic integration achieved")
     
+    if timeouts or errors:
+        return 1
     return 0 if success_count > 0 else 1
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ Validate gist alignment consistency with base CMC ontology.
 Checks that all mapped classes and properties exist in both ontologies.
 """
 
+import os
 from pathlib import Path
 from typing import Set, Tuple, List
 import re
@@ -107,9 +108,10 @@ def validate_alignment(base_file: Path, align_file: Path) -> List[str]:
 
 def main():
     """Main validation function."""
-    base_file = Path("/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_base.ttl")
-    align_file = Path("/Users/nicholasbaro/Python/staged/data/required_ttl_files/cmc_stagegate_gist_align.ttl")
-    combined_file = Path("/Users/nicholasbaro/Python/staged/output/current/cmc_stagegate_all.ttl")
+    base_dir = Path(os.getenv("STAGED_BASE_DIR", "/Users/nicholasbaro/Python/staged"))
+    base_file = base_dir / "data" / "required_ttl_files" / "cmc_stagegate_base.ttl"
+    align_file = base_dir / "data" / "required_ttl_files" / "cmc_stagegate_gist_align.ttl"
+    combined_file = base_dir / "output" / "current" / "cmc_stagegate_all.ttl"
     
     # Check files exist
     for f in [base_file, align_file]:
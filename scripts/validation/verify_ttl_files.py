@@ -4,6 +4,7 @@ Comprehensive TTL/OWL file verification
 Validates syntax, counts triples, and checks consistency
 """
 
+import os
 import sys
 import subprocess
 from pathlib import Path
@@ -204,7 +205,7 @@ def main():
     print("=" * 70)
     
     # Find TTL files in both root (source) and output/current (generated)
-    base_path = Path('/Users/nicholasbaro/Python/staged')
+    base_path = Path(os.getenv('STAGED_BASE_DIR', '/Users/nicholasbaro/Python/staged'))
     source_files = sorted(base_path.glob('*.ttl'))
     generated_files = sorted((base_path / 'output' / 'current').glob('*.ttl'))
     
@@ -332,7 +333,7 @@ def main():
     
     # Check specific alignments
     print(f"\n🔍 GIST Alignment Check:")
-    gist_align = Path('/Users/nicholasbaro/Python/staged/cmc_stagegate_gist_align.ttl')
+    gist_align = Path(os.getenv('STAGED_BASE_DIR', '/Users/nicholasbaro/Python/staged')) / 'cmc_stagegate_gist_align.ttl'
     if gist_align.exists():
         content = gist_align.read_text(encoding='utf-8')
         alignments = [